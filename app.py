@@ -1,12 +1,7 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 import io
 import urllib.parse
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import base64
 import json # <-- Diperlukan jika Anda ingin menampilkan JSON mentah
@@ -17,7 +12,8 @@ from components.auth_manager import (
     get_active_cookies_data, get_cookies_by_id, get_current_reporter_email_key,
     generate_review_key
 )
-from components.scraper import get_low_rating_reviews
+from components.pipeline import scrape_and_analyze
+from components.batch_scraper import BatchScraper, parse_batch_links, SOURCE_LINK_COL
 from components.reporter import (
     auto_report_review,
     load_report_history, # <-- Import untuk persistensi
@@ -25,8 +21,17 @@ from components.reporter import (
     load_submitted_log, # <-- Import untuk persistensi
     save_submitted_log  # <-- Import untuk persistensi
 )
-from utils.helpers import classify_report_category, generate_review_key, get_validation_details # <-- Import kunci dinamis
-from utils.constants import REPORT_CATEGORIES, CATEGORY_DEFINITIONS
+from utils.helpers import (
+    generate_review_key, # <-- Import kunci dinamis
+    annotate_reviews_dataframe, AI_CATEGORY_COL, AI_SCORE_COL, AI_TOKENS_COL,
+    AI_POLICY_COL, AI_CONTEXT_COL, AI_STAGE_COL, STAGE_LEXICON, STAGE_LEXICON_PRIOR, load_inference_service, load_lexicon_prefilter,
+    flag_near_duplicates, DUPLICATE_CLUSTER_COL, DUPLICATE_SIZE_COL,
+    ANALYSIS_COLUMNS, mask_any_category_above, mask_top2_margin_below,
+    build_search_index, search_reviews
+)
+from components.browser_pool import get_browser_pool
+from utils.shared_weights import process_memory
+from utils.constants import REPORT_CATEGORIES, CATEGORY_DEFINITIONS, SHARED_WEIGHTS_ENABLED, BROWSER_POOL_SIDEBAR_WAIT_SECONDS
 
 
 # 1. Base64 Getter Function
@@ -111,6 +116,34 @@ local_css("styles/main.css") # Muat CSS utama
 with st.sidebar:
     st.markdown("<h4 style='color: #FFD700;'>AI ELYSIUM</h4>", unsafe_allow_html=True)
     st.markdown("<p style='color: #A9E4D7; font-size: small;'>Pure Intelligence. Think Beyond. Think Elysium.</p>", unsafe_allow_html=True)
+    # Statistik worker inference bersama (dipakai oleh semua sesi/operator)
+    with st.expander("⚙️ AI Inference Worker", expanded=False):
+        worker_stats = load_inference_service().stats()
+        st.caption(
+            f"Queue depth: {worker_stats['queue_depth']} | Batches: {worker_stats['batches']} | "
+            f"Avg batch: {worker_stats['mean_batch_texts']} texts / {worker_stats['mean_batch_requests']} requests | "
+            f"Max batch: {worker_stats['max_batch_texts']} texts"
+        )
+        prefilter = load_lexicon_prefilter()
+        st.caption(
+            f"Lexicon pre-filter: {prefilter.stats['settled']} / {prefilter.stats['checked']} reviews "
+            f"settled without the model ({prefilter.hit_rate()}% encodes skipped), "
+            f"{prefilter.stats['prior']} used as a prior"
+        )
+        memory = process_memory()
+        if memory:
+            st.caption(
+                f"Process memory: RSS {memory.get('rss_mb', '?')} MB | PSS {memory.get('pss_mb', '?')} MB | "
+                f"Shared model weights: {'on' if SHARED_WEIGHTS_ENABLED else 'off'}"
+            )
+        pool_metrics = get_browser_pool().metrics()
+        st.caption(
+            f"Browser pool: {pool_metrics['idle']} idle / {pool_metrics['leased']} leased / {pool_metrics['launching']} launching | "
+            f"Lease wait avg {pool_metrics['lease_wait_seconds_mean']}s (max {round(pool_metrics['lease_wait_seconds_max'], 2)}s) | "
+            f"Launch avg {pool_metrics['launch_seconds_mean']}s over {pool_metrics['launches']} "
+            f"({pool_metrics['overflow_launches']} outside the pool) | "
+            f"Recycled: {pool_metrics['recycled_uses']} uses, {pool_metrics['recycled_memory']} memory, {pool_metrics['recycled_broken']} broken"
+        )
 
 # --- Inisialisasi Session State & Cookies + JSON Persistensi ---
 load_all_cookies() # Memuat cookies dari disk
@@ -206,19 +239,24 @@ with col_main:
     # 1. Tombol Start Scraping
     if st.button("🚀 Start Analyze", type="primary"):
         if gmaps_link:
-            with st.spinner("Collecting data low-rating reviews... please wait a few minutes."):
+            # Analisis AI berjalan di thread terpisah SELAMA scraping (batch demi batch),
+            # sehingga loop tampilan di bawah tidak pernah memanggil model.
+            with st.spinner("Collecting and analyzing low-rating reviews... please wait a few minutes."):
                 try:
-                    df, place_name = get_low_rating_reviews(gmaps_link)
+                    df, place_name, pipeline_timing = scrape_and_analyze(gmaps_link)
                 except Exception as e:
                     st.error(f"Failed to scrape: {e}")
                     df = pd.DataFrame()
                     place_name = ""
+                    pipeline_timing = None
                     
             if not df.empty:
+                df['Place'] = place_name
+
                 st.session_state.df_reviews = df
                 st.session_state.place_name = place_name
-
-                st.session_state.df_reviews['Place'] = place_name
+                st.session_state.pipeline_timing = pipeline_timing
+                st.session_state.search_index = build_search_index(df)
                 st.success(f"✅ Collected **{len(df)}** low-rating reviews from **{place_name}**")
                 
                 # Reset state terkait report saat data baru
@@ -241,11 +279,85 @@ with col_main:
         else:
             st.error("Please input a valid Google Maps link.")
 
+    # 2. Batch Scraping: banyak tempat sekaligus, dijalankan oleh proses worker di background
+    with st.expander("📦 Batch Scraping (multiple places)"):
+        batch_text = st.text_area(
+            "One Google Maps link per line (optional priority first, lower runs first: `0 https://...`)",
+            key="batch_links_input"
+        )
+        batch = st.session_state.get("batch_scraper")
+        batch_running = batch is not None and not batch.is_finished()
+
+        if st.button("🚀 Start Batch", disabled=batch_running, key="start_batch_btn"):
+            batch_jobs = parse_batch_links(batch_text)
+            if batch_jobs:
+                if batch is not None:
+                    batch.shutdown()
+                # Proses worker tidak punya sesi Streamlit: cookies user aktif dikirim eksplisit
+                batch = BatchScraper(cookies_data=get_active_cookies_data())
+                for link, priority in batch_jobs:
+                    batch.submit(link, priority=priority)
+                st.session_state.batch_scraper = batch.start()
+                batch_running = True
+            else:
+                st.error("Please input at least one Google Maps link.")
+
+        if batch is not None:
+            st.dataframe(pd.DataFrame(batch.statuses()), hide_index=True, use_container_width=True)
+            if batch_running:
+                st.caption(
+                    f"Running with {batch.max_workers} worker processes "
+                    f"(timeout {batch.timeout_seconds}s per link, {batch.max_retries} retries)."
+                )
+                st.button("🔄 Refresh Status", key="refresh_batch_btn")
+            elif st.button("📥 Load Batch Results", type="primary", key="load_batch_btn"):
+                combined = batch.combined_results()
+                if combined.empty:
+                    st.warning("No 1★ or 2★ reviews found in this batch.")
+                else:
+                    # Kolom AI belum ada: dianalisis oleh blok di bawah (sekali) lalu disimpan
+                    st.session_state.df_reviews = combined
+                    st.session_state.place_name = f"{combined[SOURCE_LINK_COL].nunique()} places (batch)"
+                    st.session_state.pipeline_timing = None
+                    st.session_state.search_index = None
+                    st.session_state.current_page = 1
+                    st.session_state.is_reporting = False
+                    st.session_state.report_index_start = 0
+                    for key in list(st.session_state.keys()):
+                        if key.startswith("choice_") or key.startswith("disabled_report_"):
+                            del st.session_state[key]
+                    st.rerun()
+
     df = st.session_state.df_reviews
+
+    # Data lama di session (sebelum kolom AI ada) dianalisis sekali lalu disimpan
+    if not df.empty and not set(ANALYSIS_COLUMNS + [DUPLICATE_CLUSTER_COL]).issubset(df.columns):
+        with st.spinner("Analyzing reviews with AI..."):
+            df = annotate_reviews_dataframe(df)
+            df = flag_near_duplicates(df)
+        st.session_state.df_reviews = df
+        st.session_state.search_index = None
+
+    # Index pencarian semantik dibangun sekali per dataset (dari embedding yang sudah di-cache)
+    if not df.empty and st.session_state.get("search_index") is None:
+        st.session_state.search_index = build_search_index(df)
     
     if not df.empty:
         st.divider()
         st.subheader(f"📊 Reviews to Report from: {st.session_state.place_name}")
+        pipeline_timing = st.session_state.get("pipeline_timing")
+        if pipeline_timing:
+            st.caption(
+                f"⏱️ Scraping + AI analysis: {pipeline_timing['end_to_end_seconds']}s end-to-end "
+                f"(estimated sequential time, not measured: {pipeline_timing['sequential_estimate_seconds']}s, "
+                f"~{pipeline_timing['estimated_saved_seconds']}s saved (estimate) over {pipeline_timing['batches']} streamed batches)"
+            )
+        n_lexicon = int((df[AI_STAGE_COL] == STAGE_LEXICON).sum())
+        n_prior = int((df[AI_STAGE_COL] == STAGE_LEXICON_PRIOR).sum())
+        st.caption(
+            f"🧩 Lexicon pre-filter decided {n_lexicon} of {len(df)} reviews ({n_lexicon / len(df) * 100:.1f}%) "
+            f"without the AI model; a weak lexicon prior agreed with the model on {n_prior} more."
+        )
 
         
 # --- PENGATURAN TIGA FILTER DALAM SATU BARIS (MENGGUNAKAN st.columns) ---
@@ -271,6 +383,44 @@ with col_main:
                 label_visibility="visible"
             )
         
+        # Filter kelompok review near-duplicate (kemungkinan review bombing)
+        n_duplicate_groups = df.loc[df[DUPLICATE_CLUSTER_COL] >= 0, DUPLICATE_CLUSTER_COL].nunique()
+        only_duplicates = st.checkbox(
+            f"Only near-duplicate groups ({n_duplicate_groups} groups found)",
+            key="filter_near_duplicates"
+        )
+
+        # Pencarian semantik (misal "rude security guard", "charged twice")
+        col_query, col_topk = st.columns([3, 1])
+        with col_query:
+            search_query = st.text_input(
+                "🔎 Semantic search in reviews",
+                key="semantic_search_query",
+                placeholder="e.g. rude security guard, charged twice"
+            )
+        with col_topk:
+            search_top_k = st.number_input("Top-k results", min_value=1, max_value=500, value=20, key="semantic_search_top_k")
+
+        # Filter berbasis skor semua kategori (mask vektorisasi atas kolom skor tersimpan, tanpa model)
+        with st.expander("🎚️ AI score filters", expanded=False):
+            col_above, col_margin = st.columns(2)
+            with col_above:
+                any_above_threshold = st.slider(
+                    "Any category score above (%)", 0.0, 100.0, 0.0, 0.5,
+                    key="filter_any_category_above",
+                    help="0 = off. Keeps reviews where at least one selected category scores above this value (empty / too-short reviews are excluded)."
+                )
+                any_above_categories = st.multiselect(
+                    "Categories to check", REPORT_CATEGORIES, key="filter_any_category_list",
+                    help="Empty = all categories."
+                )
+            with col_margin:
+                top2_margin_threshold = st.slider(
+                    "Top-2 margin below (%)", 0.0, 100.0, 100.0, 0.5,
+                    key="filter_top2_margin",
+                    help="100 = off. Keeps reviews where the best and second-best category are closer than this (ambiguous predictions)."
+                )
+
         df_filtered = df.copy()
         
         # Logika Filter Report Status
@@ -289,30 +439,33 @@ with col_main:
 
         # Logika Filter Prediksi AI
         if selected_ai_category != "All Categories":
+            # Kolom kategori AI sudah dihitung saat scraping selesai (tanpa panggilan model di sini)
+            df_filtered = df_filtered[df_filtered[AI_CATEGORY_COL] == selected_ai_category]
             
-            # Catatan: Karena 'category_ai' tidak ada di df asli (hanya dihitung saat iterasi), 
-            # kita perlu menghitung/menyimpan prediksinya terlebih dahulu untuk filtering.
-            
-            # --- Perhitungan Kategori AI (Hanya dilakukan jika filternya aktif) ---
-            # Idealnya ini dilakukan saat scraping, tapi karena tidak, kita hitung ulang.
-            
-            # Memastikan kolom 'category_ai_temp' ada untuk filtering
-            if 'category_ai_temp' not in df_filtered.columns:
-                # Menggunakan @st.cache_data untuk mempercepat jika data sama
-                @st.cache_data
-                def compute_ai_categories(df_input):
-                    df_copy = df_input.copy()
-                    categories = []
-                    for index, row in df_copy.iterrows():
-                        category_ai, _, _ = classify_report_category(row["Review Text"])
-                        categories.append(category_ai)
-                    df_copy['category_ai_temp'] = categories
-                    return df_copy
-                
-                df_filtered = compute_ai_categories(df_filtered)
-            
-            df_filtered = df_filtered[df_filtered['category_ai_temp'] == selected_ai_category]
-            
+        if any_above_threshold > 0:
+            df_filtered = df_filtered[mask_any_category_above(df_filtered, any_above_threshold, any_above_categories)]
+        if top2_margin_threshold < 100:
+            df_filtered = df_filtered[mask_top2_margin_below(df_filtered, top2_margin_threshold)]
+
+        if only_duplicates:
+            # Urutkan per kelompok agar review yang mirip tampil berdampingan
+            df_filtered = df_filtered[df_filtered[DUPLICATE_CLUSTER_COL] >= 0].sort_values(
+                DUPLICATE_CLUSTER_COL, kind="stable"
+            )
+
+        if search_query.strip():
+            # Top-k dihitung atas semua review, lalu diiris dengan filter lain (urutan = skor kemiripan)
+            search_start = time.perf_counter()
+            hit_labels, hit_scores = search_reviews(st.session_state.search_index, search_query, k=int(search_top_k))
+            search_ms = (time.perf_counter() - search_start) * 1000
+            hits = [(label, score) for label, score in zip(hit_labels, hit_scores) if label in df_filtered.index]
+            df_filtered = df_filtered.loc[[label for label, _ in hits]].copy()
+            df_filtered["Search Score"] = [score for _, score in hits]
+            st.caption(
+                f"Found {len(df_filtered)} matching reviews in {search_ms:.1f} ms "
+                f"({st.session_state.search_index.mode.replace('_', ' ')} index over {len(st.session_state.search_index)} reviews)."
+            )
+
         # Gunakan df_filtered yang baru untuk paginasi dan tampilan selanjutnya
         df = df_filtered # Ganti referensi df ke df_filtered
 
@@ -492,8 +645,7 @@ with col_main:
                     
                     # Jika belum pernah ada pilihan user, gunakan prediksi AI
                     if current_report_choice is None:
-                        category_ai, _, _ = classify_report_category(row["Review Text"])
-                        current_report_choice = category_ai
+                        current_report_choice = row[AI_CATEGORY_COL]
                         
                     
                     # Cek Anti-Double Report
@@ -614,22 +766,15 @@ with col_main:
                 review_key in st.session_state.report_history[reporter_email_key]
             )
             
-            category_ai, score, reason_tokens = classify_report_category(row["Review Text"])
-
-            validation_details = get_validation_details(
-                    review_text=row['Review Text'] or "", 
-                    category_ai=category_ai, 
-                    score=score, 
-                    key_tokens_str=reason_tokens
-                )
-    
-            policy_reason = validation_details['PolicyReason']
-            context_sentence = validation_details['ContextSentence']
-            key_concepts_str = validation_details['KeyConcepts']
+            # Hasil analisis AI diambil dari kolom yang sudah dihitung (batch)
+            category_ai = row[AI_CATEGORY_COL]
+            score = row[AI_SCORE_COL]
+            reason_tokens = row[AI_TOKENS_COL]
+            policy_reason = row[AI_POLICY_COL]
+            context_sentence = row[AI_CONTEXT_COL]
             choice_key = f"choice_{idx}"
             
             if choice_key not in st.session_state:
-                category_ai, _, _ = classify_report_category(row["Review Text"])
                 st.session_state[choice_key] = category_ai
             
             # Tampilan Review dengan Custom Container (Tidak diubah)
@@ -637,10 +782,14 @@ with col_main:
                 st.markdown(f"**👤 {row['User']}** — ⭐ **{row['Rating']}**")
                 st.markdown(f"🕒 {row['Date (Parsed)']}  |  Reviews: {row['Total Reviews']}")
                 st.markdown(f"💬 {row['Review Text'] or '*No text comment provided.*'}")
-                st.markdown(f"**🔖 AI Prediction:** `{category_ai}` ({score}% confidence)")
+                st.markdown(f"**🔖 AI Prediction:** `{category_ai}` ({score}% confidence, decided by: {row[AI_STAGE_COL]})")
                 st.markdown(f"**📜 Policy Violation Reason:** {policy_reason}")
                 st.markdown(f"**🔍 Key Concepts:** *{reason_tokens}*") # <-- Tampilan alasan
                 st.markdown(f"**📝 Contextual Sentence:** *{context_sentence}*")
+                if "Search Score" in row.index:
+                    st.markdown(f"**🔎 Search similarity:** {row['Search Score']}%")
+                if row[DUPLICATE_CLUSTER_COL] >= 0:
+                    st.markdown(f"**🧬 Near-duplicate group:** #{row[DUPLICATE_CLUSTER_COL] + 1} ({row[DUPLICATE_SIZE_COL]} similar reviews)")
 
 
                 report_choice = st.selectbox(
@@ -769,29 +918,28 @@ with col_sidebar:
         st.components.v1.iframe(embed_url, height=400)
 
         # --- Visualisasi Rating Distribution (Menggunakan Selenium) ---
+        # Selenium & Altair hanya di-import di sini (lazy) agar start aplikasi lebih cepat
+        import altair as alt
+        from selenium.webdriver.common.by import By
+
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-            driver.get(gmaps_link)
-            time.sleep(5) 
-            
-            rows = driver.find_elements(By.CSS_SELECTOR, "tr.BHOKXe")
-            distribusi = {}
-            for r in rows:
-                label = r.get_attribute("aria-label") 
-                if label:
-                    try:
-                        bintang = int(label.split()[0])
-                        jumlah = int(label.split(",")[1].split()[0])
-                        distribusi[bintang] = jumlah
-                    except Exception:
-                        continue
-            
-            driver.quit()
+            # Browser headless hangat dari pool (di-reset saat dikembalikan). Jika semua sedang dipakai
+            # (misal scraping di sesi lain), browser sementara diluncurkan agar sidebar tidak ikut menunggu.
+            with get_browser_pool().lease(timeout=BROWSER_POOL_SIDEBAR_WAIT_SECONDS, overflow=True) as driver:
+                driver.get(gmaps_link)
+                time.sleep(5) 
+                
+                rows = driver.find_elements(By.CSS_SELECTOR, "tr.BHOKXe")
+                distribusi = {}
+                for r in rows:
+                    label = r.get_attribute("aria-label") 
+                    if label:
+                        try:
+                            bintang = int(label.split()[0])
+                            jumlah = int(label.split(",")[1].split()[0])
+                            distribusi[bintang] = jumlah
+                        except Exception:
+                            continue
 
             if distribusi:
                 st.markdown("### 📊 Rating Distribution")
@@ -0,0 +1,342 @@
+# benchmarks/bench_classifier.py
+"""
+Benchmark throughput & latency untuk classifier review.
+
+Korpus sintetis (deterministik dari --seed) mencakup ketujuh REPORT_CATEGORIES dalam teks
+pendek, sedang dan panjang. Setiap mode dijalankan di subprocess tersendiri dengan direktori
+kerja sementara, sehingga cache embedding/vocab selalu mulai dari kosong dan peak RSS tidak
+tercampur antar mode.
+
+Mode:
+  - single : classify_report_category (termasuk extract_key_tokens) + get_validation_details per review
+  - batch  : classify_reviews_batch + get_validation_details_batch per potongan --batch-size review
+
+Setiap mode dijalankan dua kali atas korpus yang sama: "cold" (cache kosong) dan "warm".
+
+    python benchmarks/bench_classifier.py --per-category 30 --json bench.json
+    python benchmarks/bench_classifier.py compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import platform
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ["single", "batch"]
+LENGTHS = ["short", "medium", "long"]
+
+# --- Korpus Sintetis ---
+CATEGORY_PHRASES = {
+    "Off topic": [
+        "I am selling my used motorbike, message me if interested",
+        "does anyone know the football score from last night",
+        "check out my new music video on my channel",
+        "the weather in the city was really hot this week",
+        "my cousin just got married and the party was great",
+    ],
+    "Conflict of interest": [
+        "I am the owner and this is the best place in town",
+        "our competitor across the street is terrible, come to us instead",
+        "I work here and we give the best service",
+        "the manager offered me a free meal for a five star review",
+        "use my promo code for a discount at my other shop",
+    ],
+    "Profanity": [
+        "this fucking place is shit",
+        "what a damn crap service, total bullshit",
+        "the food tasted like shit and the staff are assholes",
+        "hell no, this is the worst fucking experience",
+        "bloody terrible, damn waste of money",
+    ],
+    "Bullying or harassment": [
+        "the cashier is ugly and stupid, everyone should mock her",
+        "that waiter is a loser, I will find him after work",
+        "the owner is a fat idiot who deserves to suffer",
+        "I know where the manager lives and I will make her regret it",
+        "the staff are pathetic clowns, go cry somewhere else",
+    ],
+    "Discrimination or hate speech": [
+        "people of that religion should not be allowed inside",
+        "they only hire foreigners, send them back to their country",
+        "women should not be working in a place like this",
+        "that ethnic group always ruins everything here",
+        "disabled people slow everyone down and should stay home",
+    ],
+    "Personal information": [
+        "call the owner directly at 0812 3456 7890",
+        "the cashier lives at Jalan Merdeka number 12",
+        "email the manager at manager.private@example.com for refunds",
+        "his ID card number is 3174 0000 1111 2222",
+        "the waitress instagram account is @private_account_123",
+    ],
+    "Harmful": [
+        "they sell drugs in the back room, ask for the special menu",
+        "you can buy fake documents and weapons here",
+        "I will burn this place down tonight",
+        "the kitchen teaches you how to make explosives",
+        "come here to gamble illegally and bet on fights",
+    ],
+}
+
+FILLER_SENTENCES = [
+    "We arrived around noon and parked near the entrance",
+    "The table was next to the window",
+    "My family ordered rice, chicken and iced tea",
+    "There were quite a lot of people waiting",
+    "The menu had many options and the prices were listed clearly",
+    "We stayed for about an hour before leaving",
+    "The music was playing in the background",
+    "Payment could be done by card or cash",
+]
+
+# Jumlah (kalimat kategori, kalimat pengisi) per panjang teks
+LENGTH_SHAPES = {"short": (1, 0), "medium": (2, 2), "long": (3, 10)}
+
+
+def build_corpus(per_category=20, seed=42):
+    """
+    Korpus review sintetis yang reproducible: per_category review untuk setiap kombinasi
+    (kategori x panjang). Returns list dict: text, category, length.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for category, phrases in CATEGORY_PHRASES.items():
+        for length in LENGTHS:
+            n_phrases, n_filler = LENGTH_SHAPES[length]
+            for _ in range(per_category):
+                sentences = rng.sample(phrases, n_phrases) + rng.choices(FILLER_SENTENCES, k=n_filler)
+                rng.shuffle(sentences)
+                corpus.append({"text": ". ".join(sentences) + ".", "category": category, "length": length})
+    rng.shuffle(corpus)
+    return corpus
+
+
+# --- Pengukuran (dijalankan di subprocess worker) ---
+def _percentiles(latencies_ms):
+    import numpy as np
+    if not latencies_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+    }
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: byte
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _EncodeCounter:
+    """Membungkus model.encode untuk menghitung jumlah panggilan model dan teks yang di-encode."""
+
+    def __init__(self, model):
+        self.calls = 0
+        self.texts = 0
+        self._encode = model.encode
+        model.encode = self
+
+    def __call__(self, sentences, *args, **kwargs):
+        self.calls += 1
+        self.texts += 1 if isinstance(sentences, str) else len(sentences)
+        return self._encode(sentences, *args, **kwargs)
+
+    def snapshot(self):
+        return self.calls, self.texts
+
+
+def _run_single(helpers, texts):
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        category, score, tokens = helpers.classify_report_category(text)
+        helpers.get_validation_details(text, category, score, tokens)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _run_batch(helpers, texts, batch_size):
+    import pandas as pd
+    latencies = []
+    for start_idx in range(0, len(texts), batch_size):
+        chunk = pd.DataFrame({"Review Text": texts[start_idx:start_idx + batch_size]})
+        start = time.perf_counter()
+        chunk = chunk.join(helpers.classify_reviews_batch(chunk))
+        helpers.get_validation_details_batch(chunk)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_worker(mode, per_category, seed, batch_size):
+    """Menjalankan satu mode benchmark di proses ini (cwd = direktori kerja sementara)."""
+    sys.path.insert(0, REPO_ROOT)
+    from utils import helpers
+
+    # Model ONNX hasil export ada di repo, bukan di direktori kerja sementara
+    if not os.path.isabs(helpers.ONNX_MODEL_DIR):
+        helpers.ONNX_MODEL_DIR = os.path.join(REPO_ROOT, helpers.ONNX_MODEL_DIR)
+
+    corpus = build_corpus(per_category, seed)
+    texts = [item["text"] for item in corpus]
+
+    start = time.perf_counter()
+    helpers.load_stop_words()
+    model = helpers._model()
+    helpers.load_definition_prototypes()
+    load_seconds = time.perf_counter() - start
+    counter = _EncodeCounter(model)
+
+    passes = {}
+    for pass_name in ["cold", "warm"]:
+        calls_before, texts_before = counter.snapshot()
+        start = time.perf_counter()
+        if mode == "single":
+            latencies = _run_single(helpers, texts)
+        else:
+            latencies = _run_batch(helpers, texts, batch_size)
+        elapsed = time.perf_counter() - start
+        calls_after, texts_after = counter.snapshot()
+
+        passes[pass_name] = {
+            "seconds": round(elapsed, 4),
+            "reviews_per_sec": round(len(texts) / elapsed, 2) if elapsed > 0 else None,
+            # single: latensi per review; batch: latensi per potongan batch
+            "latency_unit": "review" if mode == "single" else f"batch of {batch_size}",
+            **_percentiles(latencies),
+            "model_calls": calls_after - calls_before,
+            "texts_encoded": texts_after - texts_before,
+        }
+
+    return {
+        "mode": mode,
+        "n_reviews": len(texts),
+        "model_load_seconds": round(load_seconds, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "passes": passes,
+    }
+
+
+# --- Orkestrasi ---
+def run_mode(mode, args):
+    """Menjalankan satu mode di subprocess baru dengan cache kosong; mengembalikan hasil JSON worker."""
+    with tempfile.TemporaryDirectory(prefix="elysium-bench-") as workdir:
+        proc = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__), "worker", mode,
+                "--per-category", str(args.per_category),
+                "--seed", str(args.seed),
+                "--batch-size", str(args.batch_size),
+            ],
+            cwd=workdir,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if line.strip(" *")]
+        return {"mode": mode, "error": errors[-1] if errors else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _environment():
+    from utils.constants import SEMANTIC_MODEL_NAME, SEMANTIC_BACKEND
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model": SEMANTIC_MODEL_NAME,
+        "backend": SEMANTIC_BACKEND,
+    }
+
+
+def print_report(report):
+    print(f"{'mode':<8} {'pass':<5} {'rev/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls':>7} {'encoded':>8} {'RSS MB':>8}")
+    for result in report["results"]:
+        if "error" in result:
+            print(f"{result['mode']:<8} FAILED: {result['error']}")
+            continue
+        for pass_name, p in result["passes"].items():
+            print(
+                f"{result['mode']:<8} {pass_name:<5} {p['reviews_per_sec']:>9} {p['p50_ms']:>9} {p['p95_ms']:>9} "
+                f"{p['p99_ms']:>9} {p['model_calls']:>7} {p['texts_encoded']:>8} {result['peak_rss_mb']:>8}"
+            )
+
+
+def compare_reports(before_path, after_path):
+    """Membandingkan dua file JSON hasil benchmark (perubahan reviews/sec dan p95)."""
+    with open(before_path) as f:
+        before = {r["mode"]: r for r in json.load(f)["results"] if "error" not in r}
+    with open(after_path) as f:
+        after = {r["mode"]: r for r in json.load(f)["results"] if "error" not in r}
+
+    print(f"{'mode':<8} {'pass':<5} {'rev/s before':>13} {'rev/s after':>12} {'change':>8} {'p95 before':>11} {'p95 after':>10}")
+    for mode in MODES:
+        if mode not in before or mode not in after:
+            continue
+        for pass_name in ["cold", "warm"]:
+            b = before[mode]["passes"][pass_name]
+            a = after[mode]["passes"][pass_name]
+            change = (a["reviews_per_sec"] / b["reviews_per_sec"] - 1) * 100 if b["reviews_per_sec"] else 0.0
+            print(
+                f"{mode:<8} {pass_name:<5} {b['reviews_per_sec']:>13} {a['reviews_per_sec']:>12} {change:>+7.1f}% "
+                f"{b['p95_ms']:>11} {a['p95_ms']:>10}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput & latency classifier review.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "worker", "compare"])
+    parser.add_argument("args", nargs="*", help="worker: <mode>; compare: <before.json> <after.json>")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--per-category", type=int, default=20, help="Review per (kategori x panjang).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan dalam format JSON.")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        print(json.dumps(run_worker(args.args[0], args.per_category, args.seed, args.batch_size)))
+        return
+    if args.command == "compare":
+        compare_reports(*args.args[:2])
+        return
+
+    sys.path.insert(0, REPO_ROOT)
+    corpus = build_corpus(args.per_category, args.seed)
+    report = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": _environment(),
+        "corpus": {
+            "seed": args.seed,
+            "per_category": args.per_category,
+            "n_reviews": len(corpus),
+            "mean_chars": {
+                length: round(sum(len(c["text"]) for c in corpus if c["length"] == length)
+                              / max(1, sum(1 for c in corpus if c["length"] == length)), 1)
+                for length in LENGTHS
+            },
+        },
+        "batch_size": args.batch_size,
+        "results": [run_mode(mode, args) for mode in args.modes],
+    }
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/first_classification.py
+"""
+Mengukur waktu dari start proses sampai klasifikasi pertama selesai, dengan dan tanpa bundle artefak
+(embedding kategori, prototipe definisi, stopwords; lihat utils/artifact_bundle.py).
+
+Setiap skenario dijalankan di proses Python baru dengan direktori kerja sementara (cache embedding
+kosong). Bundle dibaca dari direktori repo, jadi jalankan build terlebih dulu:
+
+    python -m utils.artifact_bundle build
+    python benchmarks/first_classification.py --json first_classification.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TEXT = "the waiter ignored us for an hour and then shouted at my kids when we asked for the bill."
+
+SCENARIOS = {
+    "recompute": "0", # ELYSIUM_ARTIFACT_BUNDLE=0: encode kategori + definisi dan muat NLTK saat start
+    "bundle": "1",
+}
+
+
+def run_worker(text):
+    """Dijalankan di subprocess: import helpers lalu satu klasifikasi lengkap (kategori + validasi)."""
+    import time
+    start = time.perf_counter()
+    sys.path.insert(0, REPO_ROOT)
+    from utils import helpers
+
+    # Bundle & model ONNX ada di repo, bukan di direktori kerja sementara
+    for name in ("ARTIFACT_BUNDLE_DIR", "ONNX_MODEL_DIR"):
+        if not os.path.isabs(getattr(helpers, name)):
+            setattr(helpers, name, os.path.join(REPO_ROOT, getattr(helpers, name)))
+    imported = time.perf_counter()
+
+    helpers.load_artifact_bundle()
+    artifacts_ready = time.perf_counter()
+
+    category, score, tokens = helpers.classify_report_category(text)
+    helpers.get_validation_details(text, category, score, tokens)
+    done = time.perf_counter()
+
+    return {
+        "bundle_used": helpers._open_artifact_bundle() is not None,
+        "import_seconds": round(imported - start, 3),
+        "artifacts_seconds": round(artifacts_ready - imported, 3),
+        "first_classification_seconds": round(done - artifacts_ready, 3),
+        "time_to_first_classification_seconds": round(done - start, 3),
+    }
+
+
+def run_scenario(name, text):
+    env = dict(os.environ, ELYSIUM_ARTIFACT_BUNDLE=SCENARIOS[name])
+    with tempfile.TemporaryDirectory(prefix="elysium-startup-") as workdir:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "worker", "--text", text],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if line.strip(" *")]
+        return {"scenario": name, "error": errors[-1] if errors else "failed"}
+    return {"scenario": name, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Waktu sampai klasifikasi pertama: dengan vs tanpa bundle artefak.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "worker"])
+    parser.add_argument("--text", default=DEFAULT_TEXT)
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan dalam format JSON.")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        print(json.dumps(run_worker(args.text)))
+        return
+
+    report = [run_scenario(name, args.text) for name in SCENARIOS]
+
+    print(f"{'scenario':<10} {'bundle':>7} {'import s':>9} {'artifacts s':>12} {'classify s':>11} {'total s':>8}")
+    for item in report:
+        if "error" in item:
+            print(f"{item['scenario']:<10} FAILED: {item['error']}")
+            continue
+        print(
+            f"{item['scenario']:<10} {str(item['bundle_used']):>7} {item['import_seconds']:>9} "
+            f"{item['artifacts_seconds']:>12} {item['first_classification_seconds']:>11} "
+            f"{item['time_to_first_classification_seconds']:>8}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
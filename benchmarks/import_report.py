@@ -0,0 +1,96 @@
+# benchmarks/import_report.py
+"""
+Laporan biaya import (startup) per modul aplikasi.
+
+Setiap modul di-import di proses Python baru dengan `-X importtime`, sehingga angka yang
+dilaporkan adalah biaya cold start: total waktu import modul tersebut dan paket-paket
+terberat yang ikut ter-import.
+
+    python benchmarks/import_report.py
+    python benchmarks/import_report.py --json import_report.json --top 8
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "streamlit",
+    "utils.constants",
+    "utils.helpers",
+    "components.auth_manager",
+    "components.scraper",
+    "components.reporter",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_module(module, top=5):
+    """Meng-import satu modul di subprocess baru dan mengurai output -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent)))
+
+    errors = [line for line in proc.stderr.splitlines() if line.strip() and not line.startswith("import time:")]
+    total_us = next((cum for name, _, cum, _ in reversed(entries) if name == module), None)
+
+    # Paket top-level terberat (tanpa modul yang diukur dan sub-modulnya sendiri)
+    heaviest = {}
+    for name, _, cumulative_us, _ in entries:
+        package = name.split(".")[0]
+        if name == package and not module.startswith(package):
+            heaviest[package] = max(heaviest.get(package, 0), cumulative_us)
+
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": errors[-1] if proc.returncode != 0 and errors else None,
+        "import_ms": round(total_us / 1000, 1) if total_us is not None else None,
+        "modules_loaded": len(entries),
+        "heaviest_packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(heaviest.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan waktu import per modul (cold start).")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=5, help="Jumlah paket terberat per modul.")
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan dalam format JSON.")
+    args = parser.parse_args()
+
+    report = [measure_module(m, top=args.top) for m in args.modules]
+
+    print(f"{'module':<28} {'import ms':>10} {'modules':>8}  heaviest packages")
+    for item in report:
+        if not item["ok"]:
+            print(f"{item['module']:<28} {'FAILED':>10} {'':>8}  {item['error']}")
+            continue
+        heaviest = ", ".join(f"{k} {v}ms" for k, v in item["heaviest_packages_ms"].items())
+        print(f"{item['module']:<28} {item['import_ms']:>10} {item['modules_loaded']:>8}  {heaviest}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
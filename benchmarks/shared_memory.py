@@ -0,0 +1,115 @@
+# benchmarks/shared_memory.py
+"""
+Mengukur memori per proses saat N proses worker masing-masing memuat model dan mengklasifikasi review,
+dengan dan tanpa bobot model bersama (ELYSIUM_SHARED_WEIGHTS, lihat utils/shared_weights.py).
+
+Semua worker dibiarkan hidup bersamaan sampai memorinya diukur, sehingga PSS (RSS dengan halaman
+bersama dibagi rata) menunjukkan berapa memori yang benar-benar dipakai bersama.
+
+    python -m utils.artifact_bundle build
+    python benchmarks/shared_memory.py --workers 4 --json shared_memory.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from utils.shared_weights import process_memory  # noqa: E402
+
+DEFAULT_TEXT = "the waiter ignored us for an hour and then shouted at my kids when we asked for the bill."
+
+SCENARIOS = {
+    "private": "0", # setiap proses memuat salinan bobotnya sendiri
+    "shared": "1",
+}
+
+
+def run_worker(text):
+    """Dijalankan di subprocess: muat model + satu klasifikasi, lapor 'ready', lalu tunggu sampai diukur."""
+    from utils import helpers
+
+    helpers.load_encoder()
+    helpers.classify_report_category(text)
+    print(json.dumps({"pid": os.getpid(), "self": process_memory()}), flush=True)
+    sys.stdin.read() # ditutup oleh proses induk setelah memori semua worker diukur
+
+
+def run_scenario(name, workers, text):
+    env = dict(os.environ, ELYSIUM_SHARED_WEIGHTS=SCENARIOS[name])
+    procs = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "worker", "--text", text],
+            cwd=REPO_ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    per_process, errors = [], []
+    try:
+        for proc in procs:
+            line = proc.stdout.readline()
+            if not line:
+                errors.append(proc)
+                continue
+            # Diukur ulang setelah semua worker siap: PSS bergantung pada jumlah proses yang berbagi halaman
+            per_process.append({"pid": json.loads(line)["pid"]})
+        for item in per_process:
+            item.update(process_memory(item["pid"]))
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+        for proc in procs:
+            proc.wait()
+
+    if errors:
+        stderr = [line for line in errors[0].stderr.read().splitlines() if line.strip(" *")]
+        return {"scenario": name, "error": stderr[-1] if stderr else "failed"}
+
+    total = lambda key: round(sum(item.get(key, 0.0) for item in per_process), 1)
+    return {
+        "scenario": name,
+        "workers": workers,
+        "per_process": per_process,
+        "total_rss_mb": total("rss_mb"),
+        "total_pss_mb": total("pss_mb"),
+        "mean_rss_mb": round(total("rss_mb") / len(per_process), 1),
+        "mean_pss_mb": round(total("pss_mb") / len(per_process), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memori per proses worker: bobot model privat vs bersama (memmap).")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "worker"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--text", default=DEFAULT_TEXT)
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan dalam format JSON.")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_worker(args.text)
+        return
+
+    # Skenario "shared" butuh file bobot; worker pertama mengekspornya jika belum ada
+    report = [run_scenario(name, args.workers, args.text) for name in SCENARIOS]
+
+    print(f"{'scenario':<9} {'workers':>7} {'mean RSS MB':>12} {'mean PSS MB':>12} {'total RSS MB':>13} {'total PSS MB':>13}")
+    for item in report:
+        if "error" in item:
+            print(f"{item['scenario']:<9} FAILED: {item['error']}")
+            continue
+        print(
+            f"{item['scenario']:<9} {item['workers']:>7} {item['mean_rss_mb']:>12} {item['mean_pss_mb']:>12} "
+            f"{item['total_rss_mb']:>13} {item['total_pss_mb']:>13}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
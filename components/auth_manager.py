@@ -6,11 +6,6 @@ import pickle
 import time
 import re
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from utils.constants import COOKIES_DIR, COOKIE_EXPIRY_MINUTES, LOGIN_TIMEOUT_SECONDS
 import hashlib
 
@@ -195,6 +190,7 @@ def get_current_reporter_email_key():
 
 def check_logged_in_via_driver(driver, timeout=10):
     """Mendeteksi apakah user sudah login di Google."""
+    from selenium.webdriver.common.by import By
     start = time.time()
     while time.time() - start < timeout:
         try:
@@ -213,10 +209,18 @@ def check_logged_in_via_driver(driver, timeout=10):
 # --- Login Utama ---
 def start_manual_google_login(timeout=LOGIN_TIMEOUT_SECONDS):
     """Buka browser non-headless untuk login manual dan ambil cookies/email."""
+    # Selenium di-import saat dibutuhkan saja (lazy) agar import modul ini ringan
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from components.browser_pool import resolve_chromedriver_path
+
     options = Options()
     options.add_argument("--start-maximized")
     options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    # Browser login terlihat (non-headless) sehingga tidak diambil dari pool; binary driver tetap dari cache
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=options)
     
     new_user_id = str(int(time.time()))
 
@@ -0,0 +1,323 @@
+# components/batch_scraper.py
+
+import os
+import time
+import heapq
+import signal
+import queue
+import itertools
+import threading
+import traceback
+import multiprocessing
+
+import pandas as pd
+
+from utils.constants import (
+    BATCH_MAX_WORKERS, BATCH_JOB_TIMEOUT_SECONDS, BATCH_MAX_RETRIES, BATCH_WORKER_BROWSER_POOL_SIZE
+)
+
+# Status job yang ditampilkan di UI
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_RETRYING = "retrying"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_TIMEOUT = "timeout"
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED, JOB_TIMEOUT)
+
+SOURCE_LINK_COL = "Source Link"
+
+
+def parse_batch_links(text):
+    """
+    Satu link per baris, opsional diawali prioritas angka ("0 https://..."; kecil = lebih dulu, default 0).
+    Baris kosong dan link duplikat dilewati. Returns: list (link, priority).
+    """
+    jobs, seen = [], set()
+    for line in text.splitlines():
+        parts = line.split(None, 1)
+        if not parts:
+            continue
+        priority = 0
+        if len(parts) == 2 and parts[0].lstrip("-").isdigit():
+            priority, link = int(parts[0]), parts[1].strip()
+        else:
+            link = line.strip()
+        if link and link not in seen:
+            seen.add(link)
+            jobs.append((link, priority))
+    return jobs
+
+
+def _worker_main(task_queue, result_queue, cookies_data):
+    """
+    Proses worker: menjalankan job scraping satu per satu dengan browser hangat miliknya sendiri.
+    Tidak ada sesi Streamlit di sini, jadi cookies login dikirim eksplisit dari proses utama.
+    """
+    # Process group sendiri: chromedriver & Chrome (anak proses ini) ikut dihentikan oleh _Worker.stop(force=True)
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    from components.scraper import get_low_rating_reviews
+    from components.browser_pool import get_browser_pool, set_browser_pool_size
+
+    # Satu job sekaligus per worker: pool default (BROWSER_POOL_SIZE) akan memanaskan Chrome yang tak terpakai
+    set_browser_pool_size(BATCH_WORKER_BROWSER_POOL_SIZE)
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            get_browser_pool().close()
+            return
+        job_id, attempt, link = task
+        try:
+            # raise_errors: scraping yang gagal harus menjadi "error" (agar di-retry), bukan hasil kosong
+            df, place_name = get_low_rating_reviews(link, cookies_data=cookies_data, raise_errors=True)
+            # DataFrame dikirim sebagai list dict (picklable, tanpa index)
+            result_queue.put((job_id, attempt, "ok", df.to_dict("records"), place_name))
+        except Exception:
+            result_queue.put((job_id, attempt, "error", traceback.format_exc(limit=3), None))
+
+
+class ScrapeJob:
+    """Satu link Google Maps dalam batch beserta status, percobaan dan hasilnya."""
+
+    def __init__(self, job_id, link, priority):
+        self.job_id = job_id
+        self.link = link
+        self.priority = priority
+        self.status = JOB_QUEUED
+        self.attempts = 0
+        self.place_name = None
+        self.records = []
+        self.error = None
+        self.started_at = None
+        self.seconds = 0.0
+
+    def as_row(self):
+        return {
+            "Job": self.job_id,
+            "Priority": self.priority,
+            "Status": self.status,
+            "Attempts": self.attempts,
+            "Place": self.place_name or "",
+            "Reviews": len(self.records),
+            "Seconds": round(self.seconds, 1),
+            "Link": self.link,
+            "Error": (self.error or "").strip().splitlines()[-1] if self.error else "",
+        }
+
+
+class _Worker:
+    """Satu proses worker beserta antrean tugasnya (agar job yang timeout bisa dihentikan)."""
+
+    def __init__(self, context, result_queue, cookies_data):
+        self.task_queue = context.Queue()
+        self.process = context.Process(
+            target=_worker_main, args=(self.task_queue, result_queue, cookies_data), daemon=True
+        )
+        self.process.start()
+        self.job = None
+
+    def _signal_group(self, sig):
+        """Mengirim sinyal ke seluruh process group worker (worker + chromedriver + Chrome)."""
+        try:
+            os.killpg(self.process.pid, sig)
+            return True
+        except (AttributeError, ProcessLookupError, PermissionError):
+            return False
+
+    def stop(self, force=False):
+        if not force:
+            self.task_queue.put(None)
+            self.process.join(timeout=10)
+            return
+        if not self._signal_group(signal.SIGTERM):
+            self.process.terminate()
+        self.process.join(timeout=5)
+        # Chrome / chromedriver yang masih tersisa setelah worker berhenti
+        if hasattr(signal, "SIGKILL"):
+            self._signal_group(signal.SIGKILL)
+        self.process.join(timeout=5)
+
+
+class BatchScraper:
+    """
+    Scraping banyak tempat sekaligus: link masuk ke priority queue (prioritas kecil = lebih dulu)
+    dan dijalankan oleh `max_workers` proses worker, masing-masing dengan browser sendiri.
+
+    - Job yang melebihi `timeout_seconds` dihentikan (proses worker diganti baru).
+    - Job yang gagal / timeout diulang sampai `max_retries` kali, dengan prioritas yang sama.
+    - statuses() memberi status per job untuk UI; combined_results() menggabungkan semua hasil
+      menjadi satu DataFrame yang ditandai per tempat (kolom Place + Source Link).
+    """
+
+    def __init__(self, cookies_data=None, max_workers=BATCH_MAX_WORKERS,
+                 timeout_seconds=BATCH_JOB_TIMEOUT_SECONDS, max_retries=BATCH_MAX_RETRIES):
+        self.cookies_data = cookies_data
+        self.max_workers = max(1, int(max_workers))
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(0, int(max_retries))
+
+        self.jobs = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._result_queue = self._context.Queue()
+        self._workers = []
+        self._stop = threading.Event()
+        self._scheduler = None
+
+    # --- API Publik ---
+    def submit(self, link, priority=0):
+        """Menambahkan satu link ke antrean; mengembalikan job id."""
+        with self._lock:
+            job_id = len(self.jobs) + 1
+            self.jobs[job_id] = ScrapeJob(job_id, link, priority)
+            heapq.heappush(self._heap, (priority, next(self._sequence), job_id))
+        return job_id
+
+    def start(self):
+        """Menjalankan scheduler (thread) dan proses worker di background."""
+        if self._scheduler is None:
+            self._workers = [self._spawn_worker() for _ in range(min(self.max_workers, max(1, len(self.jobs))))]
+            self._scheduler = threading.Thread(target=self._run, name="batch-scrape-scheduler", daemon=True)
+            self._scheduler.start()
+        return self
+
+    def is_finished(self):
+        with self._lock:
+            return all(job.status in FINISHED_STATUSES for job in self.jobs.values())
+
+    def wait(self, poll_seconds=1.0):
+        while not self.is_finished():
+            time.sleep(poll_seconds)
+
+    def statuses(self):
+        """Status semua job (list dict, urut job id) untuk ditampilkan di UI."""
+        with self._lock:
+            jobs = list(self.jobs.values())
+        now = time.monotonic()
+        rows = []
+        for job in jobs:
+            row = job.as_row()
+            if job.status == JOB_RUNNING and job.started_at is not None:
+                row["Seconds"] = round(now - job.started_at, 1)
+            rows.append(row)
+        return rows
+
+    def combined_results(self):
+        """Semua review dari job yang selesai, ditandai per tempat, tanpa duplikat antar link."""
+        with self._lock:
+            frames = []
+            for job in self.jobs.values():
+                if job.status != JOB_DONE or not job.records:
+                    continue
+                frame = pd.DataFrame(job.records)
+                frame["Place"] = job.place_name
+                frame[SOURCE_LINK_COL] = job.link
+                frames.append(frame)
+        if not frames:
+            return pd.DataFrame()
+        combined = pd.concat(frames, ignore_index=True)
+        return combined.drop_duplicates(subset=["Place", "User", "Review Text"], keep="first").reset_index(drop=True)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._scheduler is not None:
+            self._scheduler.join(timeout=5)
+        for worker in self._workers:
+            worker.stop(force=worker.job is not None)
+        self._workers = []
+
+    # --- Scheduler ---
+    def _spawn_worker(self):
+        return _Worker(self._context, self._result_queue, self.cookies_data)
+
+    def _dispatch(self):
+        with self._lock:
+            for worker in self._workers:
+                if worker.job is not None or not self._heap:
+                    continue
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self.jobs[job_id]
+                job.status = JOB_RUNNING
+                job.attempts += 1
+                job.started_at = time.monotonic()
+                worker.job = job_id
+                worker.task_queue.put((job_id, job.attempts, job.link))
+
+    def _finish(self, job, ok, error=None, timed_out=False):
+        """Menandai job selesai, atau mengantrekannya lagi jika masih ada jatah retry (lock sudah dipegang)."""
+        job.seconds = time.monotonic() - job.started_at if job.started_at is not None else 0.0
+        job.started_at = None
+        if ok:
+            job.status = JOB_DONE
+            return
+        job.error = error
+        if job.attempts <= self.max_retries:
+            job.status = JOB_RETRYING
+            heapq.heappush(self._heap, (job.priority, next(self._sequence), job.job_id))
+        else:
+            job.status = JOB_TIMEOUT if timed_out else JOB_FAILED
+
+    def _collect(self):
+        try:
+            job_id, attempt, outcome, payload, place_name = self._result_queue.get(timeout=0.5)
+        except queue.Empty:
+            return
+        with self._lock:
+            job = self.jobs[job_id]
+            if job.status != JOB_RUNNING or attempt != job.attempts:
+                # Hasil terlambat dari percobaan yang sudah dianggap timeout
+                return
+            for worker in self._workers:
+                if worker.job == job_id:
+                    worker.job = None
+            if outcome == "ok":
+                job.records = payload
+                job.place_name = place_name
+                self._finish(job, ok=True)
+            else:
+                self._finish(job, ok=False, error=payload)
+
+    def _enforce_timeouts(self):
+        now = time.monotonic()
+        retired = []
+        with self._lock:
+            for worker in list(self._workers):
+                dead = not worker.process.is_alive()
+                if worker.job is None:
+                    if dead:
+                        self._workers.remove(worker)
+                        retired.append(worker)
+                    continue
+                job = self.jobs[worker.job]
+                timed_out = job.started_at is not None and now - job.started_at > self.timeout_seconds
+                if not (timed_out or dead):
+                    continue
+                self._workers.remove(worker)
+                retired.append(worker)
+                error = f"Timed out after {self.timeout_seconds}s" if timed_out else "Worker process died"
+                self._finish(job, ok=False, error=error, timed_out=timed_out)
+
+        # Stop/join dan spawn pengganti di luar lock agar statuses() (tampilan progress UI) tidak ikut menunggu.
+        # Proses worker dihentikan paksa bersama process group-nya (chromedriver & Chrome).
+        for worker in retired:
+            worker.stop(force=True)
+        replacements = [self._spawn_worker() for _ in retired]
+        if replacements:
+            with self._lock:
+                self._workers.extend(replacements)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._dispatch()
+            self._collect()
+            self._enforce_timeouts()
+            if self.is_finished():
+                break
+        for worker in self._workers:
+            if worker.job is None:
+                worker.stop()
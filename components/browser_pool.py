@@ -0,0 +1,313 @@
+# components/browser_pool.py
+
+import time
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+from components.resource_blocking import enable_network_logging, network_logging_enabled
+from utils.shared_weights import process_tree_memory_mb
+from utils.constants import (
+    BROWSER_POOL_SIZE, BROWSER_POOL_MAX_USES, BROWSER_POOL_MAX_MEMORY_MB, BROWSER_POOL_LEASE_TIMEOUT_SECONDS,
+    BROWSER_RESET_ORIGINS
+)
+
+# Timeout default WebDriver (W3C): dikembalikan saat reset agar nilai dari peminjam sebelumnya tidak terbawa
+DEFAULT_SCRIPT_TIMEOUT_SECONDS = 30
+DEFAULT_PAGE_LOAD_TIMEOUT_SECONDS = 300
+DEFAULT_IMPLICIT_WAIT_SECONDS = 0
+
+# Ukuran pool proses ini; bisa diubah dengan set_browser_pool_size() sebelum get_browser_pool() pertama
+_pool_size = BROWSER_POOL_SIZE
+
+SCRAPER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+
+@st.cache_resource
+def resolve_chromedriver_path():
+    """Path binary chromedriver, di-resolve (dan diunduh jika perlu) SEKALI per proses."""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def headless_chrome_options():
+    """Opsi Chrome headless untuk scraping (English, tanpa notifikasi, performance log jika profil blocking aktif)."""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--headless=new")
+    # Paksa Header agar terdeteksi English
+    options.add_argument(f"user-agent={SCRAPER_USER_AGENT}")
+    options.add_argument("--lang=en-US")
+    options.add_experimental_option("prefs", {
+        "intl.accept_languages": "en,en_US",
+        "profile.default_content_setting_values.notifications": 2
+    })
+    if network_logging_enabled():
+        enable_network_logging(options)
+    return options
+
+
+def launch_headless_chrome():
+    """Meluncurkan satu Chrome headless baru (driver binary dari cache resolve_chromedriver_path)."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver_path()), options=headless_chrome_options())
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+        "userAgent": SCRAPER_USER_AGENT,
+        "acceptLanguage": "en-US,en;q=0.9"
+    })
+    return driver
+
+
+class BrowserPool:
+    """
+    Pool browser headless yang tetap hangat (sudah diluncurkan) untuk seluruh proses.
+
+    - acquire()/release() atau lease(): meminjam browser; jika semua sedang dipakai dan pool penuh,
+      peminjam menunggu (waktu tunggu dicatat).
+    - Setelah dikembalikan, browser di-reset: tab ekstra ditutup, timeout script / page load / implicit
+      wait dikembalikan ke default, cookies & storage dihapus, blocking URL dilepas, lalu kembali ke about:blank.
+    - Browser didaur ulang (quit + luncurkan pengganti di background) setelah max_uses pemakaian,
+      jika memori proses browser melebihi max_memory_mb, atau jika rusak.
+    """
+
+    def __init__(self, launch_fn, size=2, max_uses=20, max_memory_mb=1500, lease_timeout=300):
+        self.launch_fn = launch_fn
+        self.size = max(0, int(size))
+        self.max_uses = max(1, int(max_uses))
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+
+        self._idle = [] # list (driver, jumlah pemakaian)
+        self._uses = {} # id(driver) -> jumlah pemakaian (browser yang sedang dipinjam)
+        self._launching = 0
+        self._leased = 0
+        self._condition = threading.Condition()
+        self.stats = {
+            "launches": 0, "launch_seconds_total": 0.0, "launch_seconds_max": 0.0, "launch_errors": 0,
+            "leases": 0, "lease_wait_seconds_total": 0.0, "lease_wait_seconds_max": 0.0,
+            "warm_hits": 0, "overflow_launches": 0, "resets": 0, "reset_seconds_total": 0.0,
+            "recycled_uses": 0, "recycled_memory": 0, "recycled_broken": 0,
+            "last_error": None,
+        }
+        self.warm()
+
+    # --- Peluncuran ---
+    def _launch(self):
+        start = time.perf_counter()
+        try:
+            driver = self.launch_fn()
+        except Exception as e:
+            with self._condition:
+                self.stats["launch_errors"] += 1
+                self.stats["last_error"] = str(e)
+            raise
+        elapsed = time.perf_counter() - start
+        with self._condition:
+            self.stats["launches"] += 1
+            self.stats["launch_seconds_total"] += elapsed
+            self.stats["launch_seconds_max"] = max(self.stats["launch_seconds_max"], elapsed)
+        return driver
+
+    def _warm_one(self):
+        try:
+            driver = self._launch()
+        except Exception:
+            driver = None
+        with self._condition:
+            self._launching -= 1
+            if driver is not None:
+                self._idle.append((driver, 0))
+            self._condition.notify_all()
+
+    def warm(self):
+        """Meluncurkan browser di background sampai pool berisi `size` browser (idle + dipinjam)."""
+        with self._condition:
+            missing = self.size - (len(self._idle) + self._leased + self._launching)
+            self._launching += max(0, missing)
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self._warm_one, name="browser-pool-warmup", daemon=True).start()
+
+    # --- Peminjaman ---
+    def acquire(self, timeout=None):
+        """
+        Meminjam browser (yang hangat jika ada). Harus dikembalikan dengan release().
+        timeout: maks. waktu tunggu browser bebas (default lease_timeout), lalu TimeoutError.
+        """
+        timeout = self.lease_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        launch_now = False
+        with self._condition:
+            while True:
+                if self._idle:
+                    driver, uses = self._idle.pop()
+                    self.stats["warm_hits"] += 1
+                    break
+                # Tanpa pool (size 0) atau pool belum penuh (termasuk yang sedang diluncurkan): luncurkan sendiri
+                if self.size == 0 or self._leased + self._launching < self.size:
+                    launch_now = True
+                    break
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser available in the pool after {timeout}s.")
+                self._condition.wait(timeout=remaining)
+            self._leased += 1
+
+        if launch_now:
+            try:
+                driver, uses = self._launch(), 0
+            except Exception:
+                with self._condition:
+                    self._leased -= 1
+                    self._condition.notify_all()
+                raise
+
+        waited = time.perf_counter() - start
+        with self._condition:
+            self._uses[id(driver)] = uses
+            self.stats["leases"] += 1
+            self.stats["lease_wait_seconds_total"] += waited
+            self.stats["lease_wait_seconds_max"] = max(self.stats["lease_wait_seconds_max"], waited)
+        return driver
+
+    def release(self, driver, broken=False):
+        """Mengembalikan browser: di-reset dan disimpan lagi, atau didaur ulang."""
+        with self._condition:
+            uses = self._uses.pop(id(driver), 0) + 1
+
+        reason = "broken" if broken else None
+        if reason is None and (self.size == 0 or uses >= self.max_uses):
+            reason = "uses"
+        if reason is None and self.max_memory_mb and self._memory_mb(driver) > self.max_memory_mb:
+            reason = "memory"
+        if reason is None:
+            try:
+                self._reset(driver)
+            except Exception:
+                reason = "broken"
+
+        with self._condition:
+            self._leased -= 1
+            if reason is None:
+                self._idle.append((driver, uses))
+            elif self.size:
+                self.stats[f"recycled_{reason}"] += 1
+            self._condition.notify_all()
+
+        if reason is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            # Pengganti diluncurkan di background agar peminjam berikutnya tetap mendapat browser hangat
+            self.warm()
+
+    @contextmanager
+    def lease(self, timeout=None, overflow=False):
+        """
+        Context manager untuk acquire()/release().
+        overflow=True: jika tidak ada browser bebas dalam `timeout`, browser sementara di luar pool
+        diluncurkan dan di-quit setelah dipakai (peminjam singkat tidak menunggu scraping yang panjang).
+        """
+        try:
+            driver = self.acquire(timeout=timeout)
+        except TimeoutError:
+            if not overflow:
+                raise
+            with self._condition:
+                self.stats["overflow_launches"] += 1
+            driver = self._launch()
+            try:
+                yield driver
+            finally:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            return
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    # --- Reset & Memori ---
+    def _reset(self, driver):
+        start = time.perf_counter()
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT_SECONDS)
+        driver.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT_SECONDS)
+        driver.implicitly_wait(DEFAULT_IMPLICIT_WAIT_SECONDS)
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in BROWSER_RESET_ORIGINS:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        try:
+            # Performance log yang belum dibaca dibuang agar tidak menumpuk di chromedriver
+            driver.get_log("performance")
+        except Exception:
+            pass
+        with self._condition:
+            self.stats["resets"] += 1
+            self.stats["reset_seconds_total"] += time.perf_counter() - start
+
+    @staticmethod
+    def _memory_mb(driver):
+        try:
+            return process_tree_memory_mb(driver.service.process.pid)
+        except Exception:
+            return 0.0
+
+    def metrics(self):
+        """Ringkasan metrik pool (rata-rata waktu tunggu lease & waktu peluncuran browser)."""
+        with self._condition:
+            stats = dict(self.stats)
+            stats.update(idle=len(self._idle), leased=self._leased, launching=self._launching, size=self.size)
+        stats["lease_wait_seconds_mean"] = round(stats["lease_wait_seconds_total"] / stats["leases"], 3) if stats["leases"] else 0.0
+        stats["launch_seconds_mean"] = round(stats["launch_seconds_total"] / stats["launches"], 3) if stats["launches"] else 0.0
+        stats["reset_seconds_mean"] = round(stats["reset_seconds_total"] / stats["resets"], 3) if stats["resets"] else 0.0
+        return stats
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+def set_browser_pool_size(size):
+    """Mengganti ukuran pool proses ini (misal worker batch); hanya berlaku sebelum pool pertama kali dibuat."""
+    global _pool_size
+    _pool_size = max(0, int(size))
+
+
+@st.cache_resource
+def get_browser_pool():
+    """Pool browser headless bersama untuk seluruh proses (scraper, distribusi rating)."""
+    return BrowserPool(
+        launch_headless_chrome,
+        size=_pool_size,
+        max_uses=BROWSER_POOL_MAX_USES,
+        max_memory_mb=BROWSER_POOL_MAX_MEMORY_MB,
+        lease_timeout=BROWSER_POOL_LEASE_TIMEOUT_SECONDS,
+    )
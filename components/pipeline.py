@@ -0,0 +1,124 @@
+# components/pipeline.py
+
+import time
+import queue
+import threading
+import pandas as pd
+
+from components.scraper import get_low_rating_reviews
+from utils.helpers import (
+    annotate_reviews_dataframe, flag_near_duplicates, AI_COLUMNS, ANALYSIS_COLUMNS,
+    load_semantic_model, load_definition_prototypes, load_stop_words
+)
+from utils.constants import STREAM_BATCH_SIZE, STREAM_QUEUE_SIZE
+
+# Penanda akhir stream untuk thread konsumen
+_END_OF_STREAM = None
+
+
+def _attach_streamlit_context(thread):
+    """Menyambungkan ScriptRunContext sesi aktif ke thread baru (agar st.cache_resource tidak memberi warning)."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(thread)
+    except Exception:
+        pass
+
+
+class _AnalysisConsumer:
+    """Thread konsumen: menganalisis batch review dari antrean selama scraping masih berjalan."""
+
+    def __init__(self, batch_queue):
+        self.batch_queue = batch_queue
+        self.frames = []
+        self.error = None
+        self.busy_seconds = 0.0
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, name="review-analysis-consumer", daemon=True)
+        _attach_streamlit_context(self.thread)
+
+    def _run(self):
+        while True:
+            batch = self.batch_queue.get()
+            if batch is _END_OF_STREAM:
+                return
+            if self.error is not None:
+                # Setelah error, antrean tetap dikosongkan agar scraper tidak tertahan
+                continue
+            start = time.perf_counter()
+            try:
+                self.frames.append(annotate_reviews_dataframe(pd.DataFrame(batch)))
+            except Exception as e:
+                self.error = e
+            self.busy_seconds += time.perf_counter() - start
+            self.batches += 1
+
+
+def scrape_and_analyze(gmaps_link, batch_size=STREAM_BATCH_SIZE, queue_size=STREAM_QUEUE_SIZE):
+    """
+    Scraping + analisis AI secara streaming: scraper mengirim batch review lewat antrean terbatas
+    (bounded queue) dan thread konsumen langsung menganalisisnya, sehingga CPU tidak menganggur
+    selama scrolling dan hasil analisis hampir siap saat scraping selesai.
+
+    Returns:
+        (df, place_name, timing) — df sudah berisi ANALYSIS_COLUMNS dan kolom near-duplicate.
+        timing membandingkan waktu end-to-end (diukur) dengan ESTIMASI jalur sekuensial: waktu scraping +
+        waktu analisis seluruh batch + tail, dijumlahkan. Jalur sekuensial tidak dijalankan, jadi
+        estimated_saved_seconds hanya perkiraan: analisis yang berjalan bersamaan dengan scraping berebut CPU
+        sehingga waktu analisisnya bisa lebih lama daripada jika dijalankan sendiri.
+    """
+    start = time.perf_counter()
+
+    # Model & resource dimuat di thread utama sebelum konsumen berjalan
+    load_stop_words()
+    load_semantic_model()
+    load_definition_prototypes()
+
+    batch_queue = queue.Queue(maxsize=queue_size)
+    consumer = _AnalysisConsumer(batch_queue)
+    consumer.thread.start()
+
+    try:
+        df, place_name = get_low_rating_reviews(gmaps_link, on_batch=batch_queue.put, batch_size=batch_size)
+    finally:
+        batch_queue.put(_END_OF_STREAM)
+        scrape_seconds = time.perf_counter() - start
+        consumer.thread.join()
+    drain_seconds = time.perf_counter() - start - scrape_seconds
+
+    tail_start = time.perf_counter()
+    if not df.empty:
+        df = _merge_streamed_analysis(df, consumer.frames if consumer.error is None else [])
+        df = flag_near_duplicates(df)
+    tail_seconds = time.perf_counter() - tail_start
+
+    end_to_end = time.perf_counter() - start
+    sequential_estimate = scrape_seconds + consumer.busy_seconds + tail_seconds
+    timing = {
+        "scrape_seconds": round(scrape_seconds, 2),
+        "analysis_seconds": round(consumer.busy_seconds, 2),
+        "wait_after_scrape_seconds": round(drain_seconds + tail_seconds, 2),
+        "end_to_end_seconds": round(end_to_end, 2),
+        "sequential_estimate_seconds": round(sequential_estimate, 2),
+        "estimated_saved_seconds": round(max(0.0, sequential_estimate - end_to_end), 2),
+        "batches": consumer.batches,
+        "consumer_error": str(consumer.error) if consumer.error is not None else None,
+    }
+    return df, place_name, timing
+
+
+def _merge_streamed_analysis(df, frames):
+    """
+    Menggabungkan hasil analisis streaming ke DataFrame final (yang sudah dideduplikasi scraper).
+    Review yang tidak ada di hasil streaming (misal konsumen gagal) dianalisis di sini.
+    """
+    if frames:
+        streamed = pd.concat(frames, ignore_index=True)
+        streamed = streamed.drop_duplicates(subset=["User", "Review Text"], keep="first")
+        df = df.merge(streamed[["User", "Review Text"] + ANALYSIS_COLUMNS], on=["User", "Review Text"], how="left")
+
+    missing = df[AI_COLUMNS[0]].isna() if AI_COLUMNS[0] in df.columns else pd.Series(True, index=df.index)
+    if missing.any():
+        df = df.drop(columns=[c for c in ANALYSIS_COLUMNS if c in df.columns])
+        df = annotate_reviews_dataframe(df)
+    return df
@@ -1,18 +1,10 @@
 import os
 import streamlit as st
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-import undetected_chromedriver as uc
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from components.auth_manager import get_cookies_by_id, apply_cookies_to_driver, check_logged_in_via_driver, generate_review_key, get_current_reporter_email_key
 from utils.helpers import classify_report_category
 from utils.constants import HISTORY_FILE, SUBMITTED_LOG_FILE, REPORT_CATEGORIES, REPORT_FILE
 import json
-from selenium.webdriver.common.action_chains import ActionChains
 import random
 
 # --- Fungsi Persistensi JSON ---
@@ -79,6 +71,13 @@ def already_reported_by_current_user(review_data, reporter_email_key):
 
 
 def auto_report_review(row, report_type=None):
+    # Selenium & undetected-chromedriver di-import saat dibutuhkan saja (lazy)
+    from selenium.webdriver.common.by import By
+    import undetected_chromedriver as uc
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.action_chains import ActionChains
+
     user_id_to_report = st.session_state.report_user_id
     user_data = get_cookies_by_id(user_id_to_report)
     
@@ -114,10 +113,10 @@ def auto_report_review(row, report_type=None):
 
     try:
         # Gunakan undetected-chromedriver
+        # Tanpa force_download: binary driver hasil patch undetected-chromedriver dipakai ulang antar report
         driver = uc.Chrome(
         options=options,
-        version_main=142,      
-        force_download=True
+        version_main=142
         )
     except Exception as e:
         st.error(f"❌ Gagal inisialisasi Undetected-Chromedriver: {e}")
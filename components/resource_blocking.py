@@ -0,0 +1,102 @@
+# components/resource_blocking.py
+
+import json
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional
+
+from utils.constants import (
+    RESOURCE_BLOCKING_PROFILE, RESOURCE_BLOCKING_PROFILES, RESOURCE_BLOCKING_RULES, RESOURCE_BLOCKING_AVG_BYTES
+)
+
+
+def network_logging_enabled(profile: str = RESOURCE_BLOCKING_PROFILE) -> bool:
+    """Performance log hanya dibutuhkan jika profil memblokir sesuatu (counter ResourceBlocker.collect)."""
+    return bool(RESOURCE_BLOCKING_PROFILES.get(profile))
+
+
+def enable_network_logging(options) -> None:
+    """Aktifkan performance log Chrome (event Network.*) agar request yang diblokir bisa dihitung."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class ResourceBlocker:
+    """
+    Profil pemblokiran resource untuk browser scraper: pola URL per jenis resource (gambar, tile peta,
+    font, analytics, media) diterapkan lewat CDP Network.setBlockedURLs.
+
+    collect() membaca performance log browser dan memperbarui counter per run: jumlah request yang
+    diblokir per jenis, perkiraan byte yang dihemat dan byte yang tetap diunduh. Chromedriver menampung
+    event log sampai dibaca, jadi scraping panjang memanggil collect() secara berkala.
+    """
+
+    def __init__(self, profile: str = RESOURCE_BLOCKING_PROFILE):
+        if profile not in RESOURCE_BLOCKING_PROFILES:
+            raise ValueError(f"Unknown resource blocking profile '{profile}'. Choose from: {', '.join(RESOURCE_BLOCKING_PROFILES)}")
+        self.profile = profile
+        self.rules = {kind: RESOURCE_BLOCKING_RULES[kind] for kind in RESOURCE_BLOCKING_PROFILES[profile]}
+        self.stats = {
+            "blocked_requests": 0,
+            "blocked_by_type": {kind: 0 for kind in self.rules},
+            "estimated_bytes_saved": 0,
+            "transferred_bytes": 0,
+        }
+        self._pending_urls = {}
+
+    @property
+    def patterns(self) -> List[str]:
+        return [pattern for patterns in self.rules.values() for pattern in patterns]
+
+    def apply(self, driver) -> None:
+        """Mengaktifkan domain Network dan memasang daftar URL yang diblokir pada sesi browser."""
+        if not self.patterns:
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+
+    def classify(self, url: str) -> Optional[str]:
+        """Jenis resource (kunci RESOURCE_BLOCKING_RULES) yang cocok dengan url, None jika tidak diblokir."""
+        for kind, patterns in self.rules.items():
+            if any(fnmatchcase(url, pattern) for pattern in patterns):
+                return kind
+        return None
+
+    def collect(self, driver) -> Dict:
+        """Membaca (dan mengosongkan) performance log browser lalu memperbarui counter."""
+        if not self.patterns:
+            # Profil "off": performance log tidak diaktifkan (lihat network_logging_enabled)
+            return self.stats
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return self.stats
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                self._pending_urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+            elif method == "Network.loadingFinished":
+                self._pending_urls.pop(params.get("requestId"), None)
+                self.stats["transferred_bytes"] += int(params.get("encodedDataLength") or 0)
+            elif method == "Network.loadingFailed":
+                url = self._pending_urls.pop(params.get("requestId"), "")
+                # setBlockedURLs menggagalkan request dengan blockedReason "inspector"
+                if params.get("blockedReason") != "inspector":
+                    continue
+                kind = self.classify(url) or "other"
+                self.stats["blocked_requests"] += 1
+                self.stats["blocked_by_type"][kind] = self.stats["blocked_by_type"].get(kind, 0) + 1
+                self.stats["estimated_bytes_saved"] += RESOURCE_BLOCKING_AVG_BYTES.get(kind, 0)
+        return self.stats
+
+    def summary(self) -> str:
+        by_type = ", ".join(f"{kind} {count}" for kind, count in self.stats["blocked_by_type"].items() if count)
+        return (
+            f"Resource blocking ({self.profile}): **{self.stats['blocked_requests']}** requests blocked"
+            f"{f' ({by_type})' if by_type else ''}, ~{self.stats['estimated_bytes_saved'] / 1024 ** 2:.1f} MB saved (estimate), "
+            f"{self.stats['transferred_bytes'] / 1024 ** 2:.1f} MB downloaded."
+        )
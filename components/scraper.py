@@ -3,25 +3,201 @@
 import streamlit as st
 import time
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import random
 import traceback
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Callable, Optional
 
 # --- Impor yang Diminta ---
 from components.auth_manager import get_active_cookies_data, apply_cookies_to_driver, check_logged_in_via_driver
+from components.resource_blocking import ResourceBlocker
+from components.browser_pool import get_browser_pool
 from utils.helpers import clean_review_text_en, parse_relative_date
-
-
-def get_low_rating_reviews(gmaps_link, max_scrolls=4000) -> Tuple[pd.DataFrame, str]:
+from utils.constants import (
+    SCRAPER_BULK_EXTRACTION, SCROLL_STEP_TIMEOUT_MS, SCROLL_END_IDLE_STEPS, SORTED_EARLY_STOP_RUN,
+    RESOURCE_BLOCKING_LOG_DRAIN_STEPS
+)
+
+# Default cookies_data: pakai cookies user aktif dari sesi Streamlit
+USE_SESSION_COOKIES = object()
+
+
+# Fungsi JS bersama: extractBlocks(start, callback) membaca semua review block BARU (indeks >= start,
+# watermark): klik semua tombol "more", tunggu sebentar agar teks lengkap dirender, lalu kirim jumlah
+# block di halaman dan data mentah block baru. Selector cadangan dievaluasi di halaman.
+_REVIEW_BLOCKS_JS_LIB = """
+const extractBlocks = (start, callback) => {
+    const all = document.getElementsByClassName('jftiEf');
+    const blocks = start < 0 ? [] : Array.from(all).slice(start);
+    let expanded = 0;
+    for (const block of blocks) {
+        const more = block.querySelector('.w8nwRe');
+        if (more) { more.click(); expanded++; }
+    }
+    const text = (block, selector) => {
+        const el = block.querySelector(selector);
+        return el ? el.innerText.trim() : null;
+    };
+    const ratingLabel = (block) => {
+        const el = block.querySelector('.kvMYJc')
+            || block.querySelector('span[aria-label*="stars"], span[class*="stars"]');
+        return el ? el.getAttribute('aria-label') : null;
+    };
+    const collect = () => callback({
+        total: all.length,
+        blocks: blocks.map((block) => ({
+            review_id: block.getAttribute('data-review-id'),
+            user: text(block, '.d4r55'),
+            rating_label: ratingLabel(block),
+            text: text(block, '.wiI7pd'),
+            date: text(block, '.rsqaWe'),
+            total_reviews: text(block, '.RfnDt'),
+        })),
+    });
+    if (expanded) { setTimeout(collect, 50); } else { collect(); }
+};
+"""
+
+# Ekstraksi saja: arguments = [start]
+_EXTRACT_REVIEW_BLOCKS_JS = _REVIEW_BLOCKS_JS_LIB + """
+extractBlocks(arguments[0] || 0, arguments[arguments.length - 1]);
+"""
+
+# Satu langkah scroll event-driven: arguments = [container, step, start, timeoutMs, nudge].
+# Scroll, lalu MutationObserver menunggu sampai block jftiEf baru muncul (atau timeout), kemudian
+# block baru langsung diekstrak (start < 0: tanpa ekstraksi). Hasil juga memuat jumlah block baru,
+# alasan selesai ('loaded' / 'pending' / 'timeout') dan apakah list sudah di dasar (akhir feed).
+_SCROLL_STEP_JS = _REVIEW_BLOCKS_JS_LIB + """
+const [container, step, start, timeoutMs, nudge] = arguments;
+const done = arguments[arguments.length - 1];
+const countBlocks = () => document.getElementsByClassName('jftiEf').length;
+const before = countBlocks();
+let finished = false;
+let timer = null;
+const finish = (reason) => {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    const atBottom = container.scrollTop + container.clientHeight >= container.scrollHeight - 2;
+    const added = countBlocks() - before;
+    extractBlocks(start, (result) => {
+        result.added = added;
+        result.reason = reason;
+        result.at_bottom = atBottom;
+        done(result);
+    });
+};
+const observer = new MutationObserver(() => { if (countBlocks() > before) { finish('loaded'); } });
+observer.observe(container, {childList: true, subtree: true});
+timer = setTimeout(() => finish('timeout'), timeoutMs);
+if (nudge) { container.scrollBy(0, -50); }
+container.scrollBy(0, step);
+// Block yang sudah ada tetapi belum diekstrak tidak perlu ditunggu
+if (start >= 0 && before > start) { finish('pending'); }
+"""
+
+
+# Jumlah review per bintang dari ringkasan rating tempat (aria-label mis. "1 stars, 1,234 reviews")
+_RATING_HISTOGRAM_JS = r"""
+const counts = {};
+for (const el of document.querySelectorAll('[aria-label]')) {
+    const match = el.getAttribute('aria-label').match(/^\s*(\d)\s+stars?,\s*([\d.,]+)\s+reviews?/i);
+    if (match) { counts[match[1]] = parseInt(match[2].replace(/[.,]/g, ''), 10); }
+}
+return counts;
+"""
+
+
+class _RoundTripCounter:
+    """Menghitung perintah WebDriver (round trip IPC ke chromedriver) selama blok `with`."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+
+    def __enter__(self):
+        original = self.driver.execute
+
+        def counted_execute(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+
+        # Semua perintah (find_element, execute_script, WebElement.text, click, ...) lewat driver.execute
+        self.driver.execute = counted_execute
+        return self
+
+    def __exit__(self, *exc):
+        del self.driver.execute
+        return False
+
+
+# Perkiraan round trip per block pada ekstraksi per-element: find_element + .text untuk d4r55, wiI7pd,
+# rsqaWe dan RfnDt, find_element + get_attribute untuk kvMYJc, lalu find_element + klik "more"
+PER_ELEMENT_ROUND_TRIPS_PER_BLOCK = 12
+
+
+def _review_dedupe_key(raw: Dict[str, Any], review_data: Dict[str, Any]) -> Tuple[str, ...]:
+    """Streaming dedupe key: the Maps review id when present, else (User, Review Text) like the final dedup."""
+    review_id = raw.get("review_id")
+    if review_id:
+        return ("id", review_id)
+    return ("text", review_data["User"], review_data["Review Text"])
+
+
+def _parse_review_block(raw: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """Converts one raw review block (from either extraction path) into a review row."""
+    review_data = {}
+
+    user = (raw.get("user") or "").strip()
+    review_data["User"] = user or f"UNKNOWN USER ({i+1})"
+
+    rating_label = raw.get("rating_label")
+    try:
+        review_data["Rating"] = float(rating_label.split()[0]) if rating_label else 0.0
+    except (ValueError, IndexError):
+        review_data["Rating"] = 0.0
+
+    review_text = (raw.get("text") or "").strip()
+    review_data["Review Text"] = clean_review_text_en(review_text) if review_text else ""
+
+    date_txt = raw.get("date")
+    if date_txt is not None:
+        review_data["Date (Raw)"] = date_txt.strip()
+        review_data["Date (Parsed)"] = parse_relative_date(date_txt.strip())
+    else:
+        review_data["Date (Raw)"] = ""
+        review_data["Date (Parsed)"] = None
+
+    review_data["Total Reviews"] = raw.get("total_reviews")
+    return review_data
+
+
+def get_low_rating_reviews(
+    gmaps_link,
+    max_scrolls=4000,
+    on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    batch_size=50,
+    cookies_data=USE_SESSION_COOKIES,
+    raise_errors=False
+) -> Tuple[pd.DataFrame, str]:
     """
     Main function to extract low-rated reviews (1 and 2 stars) from a Google Maps link.
     It attempts two methods: Lowest Rating (priority) and Default Sort (fallback).
+
+    If `on_batch` is given, extracted low-rated reviews are also passed to it in batches of
+    `batch_size` as soon as they are extracted (already deduplicated by a streaming key set), so a
+    consumer can start analysing them while scraping continues.
+
+    `cookies_data` defaults to the active user of the Streamlit session; callers without a session
+    (batch worker processes) pass the cookies dict explicitly, or None to scrape without logging in.
+
+    By default a failed scrape is reported in the UI and returned as an empty DataFrame with place
+    name "Unknown_Place_Error". With `raise_errors=True` the exception is re-raised instead, so batch
+    callers can tell a failure apart from a place without low-rated reviews.
     """
+    # Selenium is imported on first use so importing this module stays cheap
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
     
     # --- NESTED FUNCTIONS (Helper functions) ---
 
@@ -71,228 +247,281 @@ def get_low_rating_reviews(gmaps_link, max_scrolls=4000) -> Tuple[pd.DataFrame,
             st.error(f"❌ Error while attempting to sort {attempt_type}: {e}")
             return False
 
-    def _get_reviews_from_driver_and_scroll(driver: webdriver.Chrome, place_name: str, is_second_run: bool, scroll_attempt_number: int) -> List[Dict[str, Any]]:
-        """Performs scrolling on the review list, then performs extraction."""
-        
-        data = []
-        skipped_count_critical = 0 
-        
-        # --- HUMAN-SMOOTH SCROLLING PARAMS ---
-        MIN_SCROLL_STEP = 700  
-        MAX_SCROLL_STEP = 1000  
-        MIN_SLEEP = 0.03       
-        MAX_SLEEP = 0.07       
-        READING_INTERVAL = 3
-        LONG_PAUSE_MIN = 0.2  
-        LONG_PAUSE_MAX = 0.4 
-        
-        # --- Find scrollable reviews element ---
-        scrollable_div = None
-        candidates = [
-            "//div[@role='list' and @aria-label]",
-            "//div[contains(@class,'m6QErb') and contains(@class,'DxyBCb')]",
-            "//div[contains(@class,'section-scrollbox')]",
-            "//div[contains(@aria-label,'Reviews') or contains(@aria-label,'Ulasan')]"
-        ]
-        for sel in candidates:
-            try:
-                scrollable_div = driver.find_element(By.XPATH, sel)
-                if scrollable_div:
-                    break
-            except Exception:
-                continue
-
-        if scrollable_div:
-            last_scroll_pos = -1
-            same_pos_count = 0
-            total_scroll_attempts = 0
-            last_review_count = 0
-
-            # --- Logic: Reset Scroll Position ---
-            if is_second_run or scroll_attempt_number > 1:
-                try:
-                    driver.execute_script("arguments[0].scrollTop = 0", scrollable_div)
-                    time.sleep(random.uniform(0.5, 1.0))
-                except Exception as e:
-                    st.warning(f"Failed to reset scroll position: {e}")
-            # --- End Logic ---
-
-            while total_scroll_attempts < max_scrolls:
-                scroll_step = random.randint(MIN_SCROLL_STEP, MAX_SCROLL_STEP)
-                sleep_duration = random.uniform(MIN_SLEEP, MAX_SLEEP)
-
-                driver.execute_script(f"arguments[0].scrollBy(0, {scroll_step});", scrollable_div)
-                time.sleep(sleep_duration)
-
-                total_scroll_attempts += 1
-                
-                try:
-                    current_scroll_pos = driver.execute_script("return arguments[0].scrollTop", scrollable_div)
-                except Exception:
-                    current_scroll_pos = -1
-
-                if total_scroll_attempts % READING_INTERVAL == 0:
-                    long_pause = random.uniform(LONG_PAUSE_MIN, LONG_PAUSE_MAX)
-                    time.sleep(long_pause)
-
-                # Detect stuck scroll (mentok logic)
-                if current_scroll_pos == last_scroll_pos and last_scroll_pos != -1:
-                    same_pos_count += 1
-                    
-                    if same_pos_count >= 2: 
-                        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-                        time.sleep(random.uniform(0.5, 1.0)) 
-
-                        new_pos = driver.execute_script("return arguments[0].scrollTop", scrollable_div)
-                        
-                        if new_pos > last_scroll_pos:
-                            same_pos_count = 0
-                            last_scroll_pos = new_pos
-                        
-                        elif same_pos_count >= 3: 
-                            break
-                        else:
-                            driver.execute_script("arguments[0].scrollBy(0, -50);", scrollable_div) 
-                            time.sleep(0.05)
-                            driver.execute_script("arguments[0].scrollBy(0, 100);", scrollable_div)
-                            time.sleep(random.uniform(0.1,0.3)) 
-                    
-                elif current_scroll_pos != -1:
-                    same_pos_count = 0
-                    last_scroll_pos = current_scroll_pos
-
-                current_review_count = len(driver.find_elements(By.CLASS_NAME, 'jftiEf'))
-
-                if current_review_count > last_review_count:
-                    time.sleep(random.uniform(0.2, 0.5)) 
-
-                last_review_count = current_review_count
+    def _extract_blocks_bulk(driver: webdriver.Chrome, start: int) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Review blocks from index `start` onwards in ONE WebDriver round trip (see _EXTRACT_REVIEW_BLOCKS_JS).
+        Returns (total blocks on the page, raw new blocks), or None if the script fails.
+        """
+        try:
+            result = driver.execute_async_script(_EXTRACT_REVIEW_BLOCKS_JS, start)
+            return int(result["total"]), result["blocks"]
+        except Exception as e:
+            st.warning(f"Bulk extraction script failed, falling back to per-element extraction: {e}")
+            return None
 
-            # Final ensure bottom
+    def _extract_blocks_per_element(driver: webdriver.Chrome, start: int) -> Tuple[int, List[Dict[str, Any]], int]:
+        """Legacy extraction: several find_element calls (round trips) per review block from index `start` onwards."""
+        def _text(rb, class_name):
             try:
-                driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
+                return rb.find_element(By.CLASS_NAME, class_name).text.strip()
             except Exception:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                
-            time.sleep(0.5) 
-        else:
-            st.warning("Could not find scrollable element. Skipping scrolling/extraction.")
-            time.sleep(0.2) 
-
+                return None
 
-        # --- EXTRACT ALL AVAILABLE REVIEWS ---
-        blocks = driver.find_elements(By.CLASS_NAME, "jftiEf")
-        # st.info(f"Found **{len(blocks)}** review blocks to extract.") # Dihapus
-
-        for i, rb in enumerate(blocks):
-            review_data = {}
-            fail_reason = []
-            
+        all_blocks = driver.find_elements(By.CLASS_NAME, "jftiEf")
+        raw_blocks = []
+        skipped = 0
+        for i, rb in enumerate(all_blocks[start:], start=start):
             try:
                 # Expand "more"
                 try:
                     more_button = rb.find_element(By.CLASS_NAME, "w8nwRe")
                     driver.execute_script("arguments[0].click();", more_button)
-                    time.sleep(0.03) 
+                    time.sleep(0.03)
                 except Exception:
                     pass
 
-                # Extract data 
-                try:
-                    review_data["User"] = rb.find_element(By.CLASS_NAME, "d4r55").text.strip()
-                except Exception:
-                    review_data["User"] = f"UNKNOWN USER ({i+1})"
-                    fail_reason.append("Username")
-
                 try:
-                    rating_text = rb.find_element(By.CLASS_NAME, "kvMYJc").get_attribute("aria-label")
-                    review_data["Rating"] = float(rating_text.split()[0]) if rating_text else 0.0
+                    rating_label = rb.find_element(By.CLASS_NAME, "kvMYJc").get_attribute("aria-label")
                 except Exception:
                     try:
-                        rating_attr = rb.find_element(By.XPATH, ".//span[contains(@aria-label,'stars') or contains(@class,'stars')]").get_attribute("aria-label")
-                        review_data["Rating"] = float(rating_attr.split()[0]) if rating_attr else 0.0
+                        rating_label = rb.find_element(By.XPATH, ".//span[contains(@aria-label,'stars') or contains(@class,'stars')]").get_attribute("aria-label")
                     except Exception:
-                        review_data["Rating"] = 0.0
-                        fail_reason.append("Rating")
+                        rating_label = None
+
+                raw_blocks.append({
+                    "review_id": rb.get_attribute("data-review-id"),
+                    "user": _text(rb, "d4r55"),
+                    "rating_label": rating_label,
+                    "text": _text(rb, "wiI7pd"),
+                    "date": _text(rb, "rsqaWe"),
+                    "total_reviews": _text(rb, "RfnDt"),
+                })
+            except Exception as e:
+                # This block handles CRITICAL failure (review block cannot be processed at all)
+                skipped += 1
+                st.error(f"❌ Block #{i+1} **CRITICALLY skipped**. Possible XPATH 'jftiEf' change or corrupted element. Error: {e}")
+        return len(all_blocks), raw_blocks, skipped
 
-                try:
-                    review_text = rb.find_element(By.CLASS_NAME, "wiI7pd").text.strip()
-                    review_data["Review Text"] = clean_review_text_en(review_text) if review_text else ""
-                except Exception:
-                    review_data["Review Text"] = ""
-                    fail_reason.append("Review Text")
+    def _read_rating_histogram(driver: webdriver.Chrome) -> Dict[int, int]:
+        """Review count per star rating from the place's rating summary ({} if not found)."""
+        try:
+            counts = driver.execute_script(_RATING_HISTOGRAM_JS) or {}
+            return {int(stars): int(count) for stars, count in counts.items()}
+        except Exception:
+            return {}
+
+    def _log_early_stop(histogram: Dict[int, int], blocks_loaded: int, steps: int, seconds: float, retrieved: int) -> None:
+        """Logs how many scroll steps and seconds the early stop saved (estimated from the rating summary)."""
+        total_reviews = sum(histogram.values())
+        if total_reviews and blocks_loaded and steps:
+            remaining_blocks = max(0, total_reviews - blocks_loaded)
+            saved_steps = min(max_scrolls - steps, round(remaining_blocks * steps / blocks_loaded))
+            saved_seconds = saved_steps * seconds / steps
+            expected_low = histogram.get(1, 0) + histogram.get(2, 0)
+            st.info(
+                f"⏹️ Early stop: the lowest-rating feed passed 2 stars after {blocks_loaded} of {total_reviews} reviews. "
+                f"Saved ~**{saved_steps}** scroll steps / ~**{saved_seconds:.1f}s** "
+                f"({retrieved} of {expected_low} listed 1 & 2 star reviews retrieved)."
+            )
+        else:
+            st.info(
+                f"⏹️ Early stop: the lowest-rating feed passed 2 stars after {blocks_loaded} reviews "
+                f"({steps} scroll steps, up to {max_scrolls - steps} steps of the scroll budget saved)."
+            )
+
+    def _get_reviews_from_driver_and_scroll(driver: webdriver.Chrome, place_name: str, seen_keys: set, pass_label: str, sorted_lowest: bool = False) -> List[Dict[str, Any]]:
+        """
+        Scrolls the review list and extracts reviews incrementally. Each scroll step is one async script:
+        a page-side MutationObserver waits exactly until new blocks load (or SCROLL_STEP_TIMEOUT_MS passes)
+        and only the blocks loaded since the last extraction (index >= watermark) are returned.
+        The end of the feed is reached after SCROLL_END_IDLE_STEPS steps at the bottom without new blocks.
+        Reviews already in `seen_keys` (shared across passes) are skipped, so the result is deduplicated as it streams.
+
+        With `sorted_lowest` (feed sorted by lowest rating) scrolling stops as soon as a contiguous run of
+        SORTED_EARLY_STOP_RUN reviews rated above 2 stars appears: every review after it is above 2 stars too.
+        """
+        
+        data = []
+        emitted = 0
+        state = {
+            "watermark": 0, "blocks": 0, "duplicates": 0, "critical": 0, "bulk": SCRAPER_BULK_EXTRACTION,
+            "high_run": 0, "early_stop": False,
+        }
+
+        def _ingest(total: int, raw_blocks: List[Dict[str, Any]]) -> None:
+            """Moves the watermark and keeps new, unseen 1 & 2 star reviews."""
+            nonlocal emitted
+            first_index = state["watermark"]
+            # Maps hanya menambah block di akhir list; jika list di-render ulang (lebih pendek), mulai dari awal lagi
+            state["watermark"] = total if total >= first_index else 0
+            state["blocks"] += len(raw_blocks)
+
+            for i, raw in enumerate(raw_blocks, start=first_index):
+                review_data = _parse_review_block(raw, i)
+
+                # Rating-aware stop condition for the lowest-rating sort (unknown ratings neither extend nor break the run)
+                if sorted_lowest and review_data["Rating"] > 2.0:
+                    state["high_run"] += 1
+                    state["early_stop"] = state["early_stop"] or state["high_run"] >= SORTED_EARLY_STOP_RUN
+                elif review_data["Rating"] in [1.0, 2.0]:
+                    state["high_run"] = 0
 
-                try:
-                    date_txt = rb.find_element(By.CLASS_NAME, "rsqaWe").text.strip()
-                    review_data["Date (Raw)"] = date_txt
-                    review_data["Date (Parsed)"] = parse_relative_date(date_txt)
-                except Exception:
-                    review_data["Date (Raw)"] = ""
-                    review_data["Date (Parsed)"] = None
-                    fail_reason.append("Date")
+                # --- SAVE LOGIC: SAVE EVEN WITH PARTIAL FAILURES ---
+                # Only save low-rated reviews (1 or 2 stars); skip reviews with rating > 2.0
+                if review_data["Rating"] not in [1.0, 2.0]:
+                    continue
+
+                key = _review_dedupe_key(raw, review_data)
+                if key in seen_keys:
+                    state["duplicates"] += 1
+                    continue
+                seen_keys.add(key)
+                data.append({
+                    "Place": place_name,
+                    **review_data
+                })
+
+                # Stream a full batch to the consumer while extraction continues
+                if on_batch and len(data) - emitted >= batch_size:
+                    on_batch(data[emitted:])
+                    emitted = len(data)
+
+        def _consume_new_blocks() -> None:
+            """Extracts blocks past the watermark (separate round trip, used outside the scroll steps)."""
+            result = _extract_blocks_bulk(driver, state["watermark"]) if state["bulk"] else None
+            if result is None:
+                state["bulk"] = False
+                total, raw_blocks, skipped = _extract_blocks_per_element(driver, state["watermark"])
+                state["critical"] += skipped
+            else:
+                total, raw_blocks = result
+            _ingest(total, raw_blocks)
+
+        def _scroll_step(scrollable_div, nudge: bool) -> Dict[str, Any]:
+            """One event-driven scroll step (see _SCROLL_STEP_JS); new blocks are extracted in the same call."""
+            step = random.randint(MIN_SCROLL_STEP, MAX_SCROLL_STEP)
+            start = state["watermark"] if state["bulk"] else -1
+            result = driver.execute_async_script(
+                _SCROLL_STEP_JS, scrollable_div, step, start, SCROLL_STEP_TIMEOUT_MS, nudge
+            )
+            if state["bulk"]:
+                _ingest(int(result["total"]), result["blocks"])
+            elif result["total"] > state["watermark"]:
+                _consume_new_blocks()
+            return result
+        
+        # --- SCROLLING PARAMS ---
+        MIN_SCROLL_STEP = 700  
+        MAX_SCROLL_STEP = 1000  
 
+        scroll_start = time.perf_counter()
+        total_scroll_attempts = 0
+        end_of_feed = False
+
+        with _RoundTripCounter(driver) as round_trips:
+            # --- Find scrollable reviews element ---
+            scrollable_div = None
+            candidates = [
+                "//div[@role='list' and @aria-label]",
+                "//div[contains(@class,'m6QErb') and contains(@class,'DxyBCb')]",
+                "//div[contains(@class,'section-scrollbox')]",
+                "//div[contains(@aria-label,'Reviews') or contains(@aria-label,'Ulasan')]"
+            ]
+            for sel in candidates:
                 try:
-                    review_data["Total Reviews"] = rb.find_element(By.CLASS_NAME, "RfnDt").text
+                    scrollable_div = driver.find_element(By.XPATH, sel)
+                    if scrollable_div:
+                        break
                 except Exception:
-                    review_data["Total Reviews"] = None
+                    continue
 
-                # --- SAVE LOGIC: SAVE EVEN WITH PARTIAL FAILURES ---
-                
-                # 1. Only save low-rated reviews (1 or 2 stars)
-                if review_data["Rating"] in [1.0, 2.0]:
-                    data.append({
-                        "Place": place_name,
-                        **review_data
-                    })
-                    
-                    # 2. Log minor failure after data is added
-                    if fail_reason:
-                        # st.warning(...) # Dihapus
-                        pass
-                # else: Skip reviews with rating > 2.0
-                
-            except Exception as e:
-                # This block handles CRITICAL failure (review block cannot be processed at all)
-                skipped_count_critical += 1
-                st.error(f"❌ Block #{i+1} **CRITICALLY skipped**. Possible XPATH 'jftiEf' change or corrupted element. Error: {e}")
-                continue
+            # Batas waktu script: tunggu konten (timeout langkah scroll) + ekstraksi
+            driver.set_script_timeout(SCROLL_STEP_TIMEOUT_MS / 1000 + 10)
+            # Block yang sudah tampil sebelum scrolling
+            _consume_new_blocks()
+            histogram = _read_rating_histogram(driver) if sorted_lowest else {}
 
-        
-        st.info(f"Extraction attempt #{scroll_attempt_number} finished. Total 1 & 2 star reviews retrieved: **{len(data)}**. Total Critical Blocks Skipped: **{skipped_count_critical}**.")
+            if scrollable_div:
+                idle_steps = 0
+                try:
+                    while total_scroll_attempts < max_scrolls and not state["early_stop"]:
+                        # Setelah langkah tanpa konten baru, scroll sedikit ke atas dulu agar lazy-load terpicu lagi
+                        result = _scroll_step(scrollable_div, nudge=idle_steps > 0)
+                        total_scroll_attempts += 1
+                        # Performance log dikosongkan berkala agar event tidak menumpuk di chromedriver
+                        if blocker.patterns and total_scroll_attempts % RESOURCE_BLOCKING_LOG_DRAIN_STEPS == 0:
+                            blocker.collect(driver)
+
+                        # Akhir feed: beberapa langkah berturut-turut di dasar list tanpa block baru
+                        if result["reason"] == "timeout" and result["at_bottom"] and result["added"] <= 0:
+                            idle_steps += 1
+                            if idle_steps >= SCROLL_END_IDLE_STEPS:
+                                end_of_feed = True
+                                break
+                        else:
+                            idle_steps = 0
+                except Exception as e:
+                    st.warning(f"Event-driven scrolling stopped early: {e}")
+
+                # Blocks loaded after the last step
+                if not state["early_stop"]:
+                    _consume_new_blocks()
+            else:
+                st.warning("Could not find scrollable element. Extracting only the reviews already visible.")
+
+        scroll_seconds = time.perf_counter() - scroll_start
+        if on_batch and len(data) > emitted:
+            on_batch(data[emitted:])
+
+        st.info(f"{pass_label} finished. New unique 1 & 2 star reviews retrieved: **{len(data)}**. Total Critical Blocks Skipped: **{state['critical']}**.")
+        st.caption(
+            f"Extraction ({'bulk' if state['bulk'] else 'per-element'}, incremental): {state['blocks']} review blocks read once each, "
+            f"{state['duplicates']} duplicates skipped while streaming, **{round_trips.count}** WebDriver round trips in total "
+            f"(per-element extraction alone needs ~{state['blocks'] * PER_ELEMENT_ROUND_TRIPS_PER_BLOCK})."
+        )
+        per_1000 = scroll_seconds / state["blocks"] * 1000 if state["blocks"] else 0.0
+        st.caption(
+            f"Scrolling: {total_scroll_attempts} steps in {scroll_seconds:.1f}s "
+            f"(**{per_1000:.1f}s per 1,000 reviews**), end of feed {'reached' if end_of_feed else 'not reached'}."
+        )
+        if state["early_stop"]:
+            _log_early_stop(histogram, state["watermark"], total_scroll_attempts, scroll_seconds, len(data))
         return data
 
     # --- START OF MAIN FUNCTION LOGIC ---
 
-    # --- 1. WebDriver Options Configuration ---
-    options = Options()
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--log-level=3")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("--headless=new")
-    # Paksa Header agar terdeteksi English
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
-    options.add_argument("--lang=en-US") 
-    
-    prefs = {
-        "intl.accept_languages": "en,en_US",
-        "profile.default_content_setting_values.notifications": 2
-    }
-    options.add_experimental_option("prefs", prefs)
+    # --- 1. WebDriver: warm headless browser from the process-wide pool ---
+    # Resource yang tidak dibutuhkan untuk membaca teks review (gambar, tile peta, font, analytics) diblokir via CDP
+    try:
+        blocker = ResourceBlocker()
+    except ValueError as e:
+        st.warning(f"{e} Resource blocking disabled.")
+        blocker = ResourceBlocker("off")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-        "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36',
-        "acceptLanguage": "en-US,en;q=0.9"
-    })
+    pool = get_browser_pool()
+    try:
+        driver = pool.acquire()
+    except Exception as e:
+        st.error(f"❌ Failed to start a browser for scraping: {e}")
+        if raise_errors:
+            raise
+        return pd.DataFrame(), "Unknown_Place_Error"
+    pool_metrics = pool.metrics()
+    st.caption(
+        f"Browser pool: lease wait {pool_metrics['lease_wait_seconds_mean']}s avg, "
+        f"launch {pool_metrics['launch_seconds_mean']}s avg over {pool_metrics['launches']} launches, "
+        f"{pool_metrics['warm_hits']} warm leases."
+    )
+    try:
+        blocker.apply(driver)
+    except Exception as e:
+        st.warning(f"Failed to apply resource blocking profile: {e}")
     all_low_reviews = []
     place_name = "Unknown_Place"
     
     try:
         # --- 2. Cookies/Login Handling ---
-        active_user_data = get_active_cookies_data()
+        active_user_data = get_active_cookies_data() if cookies_data is USE_SESSION_COOKIES else cookies_data
         if active_user_data:
             try:
                 driver.get("https://www.google.com?hl=en")
@@ -369,29 +598,26 @@ def get_low_rating_reviews(gmaps_link, max_scrolls=4000) -> Tuple[pd.DataFrame,
         # ==========================================================
 
         if review_tab_clicked:
-            # --- METHOD 1: SORT BY LOWEST RATING (Priority) ---
+            # Kunci review yang sudah diambil (dipakai bersama oleh semua pass -> dedupe saat streaming)
+            seen_keys = set()
+
+            # --- METHOD 1: SORT BY LOWEST RATING (Priority, single incremental pass) ---
             sorted_success = _attempt_sort(driver, "lowest")
             
             if sorted_success:
-                low_reviews_method1 = []
-                for attempt in range(1, 3): 
-                    reviews = _get_reviews_from_driver_and_scroll(driver, place_name, False, attempt)
-                    low_reviews_method1.extend(reviews)
-                    
+                low_reviews_method1 = _get_reviews_from_driver_and_scroll(driver, place_name, seen_keys, "Method 1 (Lowest Rating)", sorted_lowest=True)
                 all_low_reviews.extend(low_reviews_method1)
                 st.success(f"Method 1 (Lowest Rating) finished. Total retrieved: **{len(low_reviews_method1)}** 1 & 2 star reviews.")
             else:
+                # --- METHOD 2: FALLBACK TO DEFAULT SORT (only when sorting failed, NO UI SORT) ---
                 st.warning("Sorting by Lowest Rating failed. Proceeding to Method 2.")
+                low_reviews_method2 = _get_reviews_from_driver_and_scroll(driver, place_name, seen_keys, "Method 2 (Default Sort)")
+                all_low_reviews.extend(low_reviews_method2)
+                st.success(f"Method 2 (Default Sort) finished. Total retrieved: **{len(low_reviews_method2)}** 1 & 2 star reviews.")
 
-            # --- METHOD 2: FALLBACK TO DEFAULT RATING (Always Executed, NO UI SORT) ---
-            
-            low_reviews_method2 = []
-            for attempt in range(1, 2): 
-                 reviews = _get_reviews_from_driver_and_scroll(driver, place_name, True, attempt) 
-                 low_reviews_method2.extend(reviews)
-
-            all_low_reviews.extend(low_reviews_method2)
-            st.success(f"Method 2 (Default Sort) finished. Total retrieved: **{len(low_reviews_method2)}** 1 & 2 star reviews.")
+        if blocker.patterns:
+            blocker.collect(driver)
+            st.caption(blocker.summary())
 
         # ==========================================================
         #           5. Final Processing (Dedup)
@@ -400,7 +626,7 @@ def get_low_rating_reviews(gmaps_link, max_scrolls=4000) -> Tuple[pd.DataFrame,
         df_raw = pd.DataFrame(all_low_reviews)
         
         if df_raw.empty:
-            driver.quit()
+            pool.release(driver)
             st.warning("No 1 or 2 star reviews were successfully extracted from both methods.")
             return pd.DataFrame(), place_name
 
@@ -414,14 +640,14 @@ def get_low_rating_reviews(gmaps_link, max_scrolls=4000) -> Tuple[pd.DataFrame,
         st.info(f"Total duplicate reviews removed: {initial_count - dedup_count}.")
         st.success(f"Total **unique 1 & 2 star reviews** retrieved: **{dedup_count}**.")
         
-        driver.quit()
+        pool.release(driver)
         return df_final, place_name
 
     except Exception as e:
-        try:
-            driver.quit()
-        except:
-            pass
+        # Browser dalam keadaan tidak jelas: didaur ulang oleh pool
+        pool.release(driver, broken=True)
         st.error(f"❌ CRITICAL ERROR: Error during scraping: {e}")
         st.text(traceback.format_exc())
+        if raise_errors:
+            raise
         return pd.DataFrame(), "Unknown_Place_Error"
\ No newline at end of file
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+import utils.helpers as helpers
+from utils.constants import REPORT_CATEGORIES
+
+
+def _frame(stages, scores, tokens):
+    df = pd.DataFrame({helpers.AI_STAGE_COL: stages, helpers.AI_TOKENS_COL: tokens})
+    return df.join(helpers._category_score_frame(np.array(scores, dtype=np.float32), df.index))
+
+
+def _scores(category, value):
+    row = np.zeros(len(REPORT_CATEGORIES))
+    row[REPORT_CATEGORIES.index(category)] = value
+    return row
+
+
+def test_any_category_above_excludes_short_text_rows():
+    df = _frame(
+        [helpers.STAGE_SHORT_TEXT, helpers.STAGE_MODEL, helpers.STAGE_LEXICON],
+        [_scores("Off topic", 100.0), _scores("Off topic", 80.0), _scores("Profanity", 100.0)],
+        [helpers.SHORT_TEXT_REASON, "x", "fuck"],
+    )
+
+    assert helpers.mask_any_category_above(df, 50).tolist() == [False, True, True]
+    assert helpers.mask_any_category_above(df, 50, ["Off topic"]).tolist() == [False, True, False]
+
+
+def test_any_category_above_uses_reason_when_stage_column_is_missing():
+    df = _frame(
+        [helpers.STAGE_SHORT_TEXT, helpers.STAGE_MODEL],
+        [_scores("Off topic", 100.0), _scores("Off topic", 80.0)],
+        [helpers.SHORT_TEXT_REASON, "x"],
+    ).drop(columns=[helpers.AI_STAGE_COL])
+
+    assert helpers.mask_any_category_above(df, 50).tolist() == [False, True]
@@ -0,0 +1,41 @@
+import zlib
+
+import numpy as np
+
+from utils.embedding_cache import EmbeddingCache, content_key
+
+DIM = 8
+
+
+def _vector(text):
+    return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM).astype(np.float32)
+
+
+def _encode(texts):
+    return np.stack([_vector(t) for t in texts])
+
+
+def test_eviction_of_key_ending_in_nul_keeps_other_entries_intact(tmp_path):
+    texts = [f"t{i}" for i in range(200)]
+    nul_texts = [t for t in texts if content_key(t)[-1] == 0]
+    assert nul_texts, "corpus needs at least one key ending in b'\\x00'"
+
+    cache = EmbeddingCache(str(tmp_path), DIM, max_bytes=DIM * 4 * 50, initial_rows=16)
+    # Kunci berakhiran NUL ditulis lebih dulu agar ikut terbuang saat eviction
+    for text in nul_texts + [t for t in texts if t not in nul_texts]:
+        cache.get_or_compute([text], _encode)
+    assert cache.stats["evictions"] > 0
+
+    # Setiap kunci memetakan baris yang berbeda
+    assert len(set(cache._rows.values())) == len(cache._rows)
+    for text in texts:
+        vectors, missing = cache.get_many([text])
+        if not missing:
+            np.testing.assert_allclose(vectors[0], _vector(text))
+
+    # Setelah dibuka ulang, kunci berakhiran NUL yang masih tersimpan tetap ditemukan
+    remaining = [t for t in texts if content_key(t) in cache._rows]
+    reopened = EmbeddingCache(str(tmp_path), DIM, max_bytes=DIM * 4 * 50, initial_rows=16)
+    vectors, missing = reopened.get_many(remaining)
+    assert missing == []
+    np.testing.assert_allclose(vectors, _encode(remaining))
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+import utils.helpers as helpers
+from utils.constants import LEXICON_RULES, REPORT_CATEGORIES, SEMANTIC_EMBEDDING_DIM
+from utils.lexicon import LexiconPrefilter
+
+SETTLED_TEXTS = [
+    "what a fucking joke of a place",
+    "call me at hp 0812 3456 7890 for a refund",
+    "owner is a bangsat, never again",
+]
+MODEL_TEXTS = [
+    "the food was cold and the waiter ignored us",
+    "this place is shit",  # kecocokan lemah: hanya prior
+]
+
+
+@pytest.fixture
+def cascade(monkeypatch):
+    calls = []
+    rng = np.random.default_rng(0)
+
+    def fake_encode(texts):
+        calls.append(list(texts))
+        vectors = torch.tensor(rng.standard_normal((len(texts), SEMANTIC_EMBEDDING_DIM)), dtype=torch.float32)
+        return torch.nn.functional.normalize(vectors, dim=1)
+
+    category_embeddings = torch.nn.functional.normalize(
+        torch.tensor(rng.standard_normal((len(REPORT_CATEGORIES), SEMANTIC_EMBEDDING_DIM)), dtype=torch.float32), dim=1
+    )
+    prefilter = LexiconPrefilter(LEXICON_RULES)
+    monkeypatch.setattr(helpers, "_encode_texts", fake_encode)
+    monkeypatch.setattr(helpers, "_category_embeddings", lambda: category_embeddings)
+    monkeypatch.setattr(helpers, "_tokenize_words", lambda text: text.lower().split())
+    monkeypatch.setattr(helpers, "_extract_key_tokens_batch", lambda words, idx, n_tokens=4: ["x"] * len(words))
+    monkeypatch.setattr(helpers, "load_lexicon_prefilter", lambda: prefilter)
+    return SimpleNamespace(encode_calls=calls, prefilter=prefilter)
+
+
+def test_lexicon_settled_batch_skips_encoding(cascade):
+    result = helpers.classify_reviews_batch(SETTLED_TEXTS + ["ok"])
+
+    assert cascade.encode_calls == []
+    assert result[helpers.AI_STAGE_COL].tolist() == [helpers.STAGE_LEXICON] * 3 + [helpers.STAGE_SHORT_TEXT]
+    assert result[helpers.AI_CATEGORY_COL].tolist()[:3] == ["Profanity", "Personal information", "Profanity"]
+    assert (result[helpers.AI_SCORE_COL] == 100.0).all()
+    assert cascade.prefilter.stats["settled"] == 3
+
+
+def test_mixed_batch_encodes_only_unsettled_texts(cascade):
+    result = helpers.classify_reviews_batch(SETTLED_TEXTS + MODEL_TEXTS)
+
+    assert cascade.encode_calls == [MODEL_TEXTS]
+    assert set(result[helpers.AI_STAGE_COL].iloc[3:]) <= {helpers.STAGE_MODEL, helpers.STAGE_LEXICON_PRIOR}
+    assert cascade.prefilter.stats == {
+        "checked": 5, "settled": 3, "prior": 1,
+        "by_category": {**{c: 0 for c in LEXICON_RULES}, "Profanity": 2, "Personal information": 1},
+    }
+
+
+def test_single_review_settled_without_encoding(cascade):
+    category, score, _, stage = helpers.classify_report_category(SETTLED_TEXTS[0], return_stage=True)
+
+    assert (category, score, stage) == ("Profanity", 100.0, helpers.STAGE_LEXICON)
+    assert cascade.encode_calls == []
@@ -0,0 +1,103 @@
+# utils/analysis_store.py
+
+import sqlite3
+import threading
+from datetime import datetime
+
+# Kolom hasil analisis yang disimpan per review
+# category_scores: skor semua kategori sebagai bytes float32 (BLOB)
+RESULT_FIELDS = ["category", "score", "key_tokens", "policy_reason", "context_sentence", "key_concepts", "stage", "category_scores"]
+
+# Batas parameter per query IN (...) agar aman untuk SQLite versi lama
+_CHUNK_SIZE = 500
+
+
+class AnalysisStore:
+    """
+    Penyimpanan hasil analisis AI per review (SQLite).
+
+    Kunci: (review_key dari generate_review_key, fingerprint model/versi analisis).
+    text_hash disimpan agar review yang teksnya berubah bisa dideteksi dan dihitung ulang.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Koneksi dipakai bersama oleh thread Streamlit, akses diserialisasi dengan lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS review_analysis (
+                    review_key TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    category TEXT,
+                    score REAL,
+                    key_tokens TEXT,
+                    policy_reason TEXT,
+                    context_sentence TEXT,
+                    key_concepts TEXT,
+                    stage TEXT,
+                    category_scores BLOB,
+                    updated_at TEXT,
+                    PRIMARY KEY (review_key, fingerprint)
+                )
+                """
+            )
+            # Database lama: tambahkan kolom hasil yang belum ada
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(review_analysis)")}
+            for field in RESULT_FIELDS:
+                if field not in existing:
+                    column_type = "BLOB" if field == "category_scores" else "TEXT"
+                    self._conn.execute(f"ALTER TABLE review_analysis ADD COLUMN {field} {column_type}")
+
+    def get_many(self, review_keys, fingerprint):
+        """
+        Lookup bulk untuk banyak review sekaligus (satu halaman atau seluruh DataFrame).
+
+        Returns:
+            dict review_key -> dict (text_hash + RESULT_FIELDS)
+        """
+        unique_keys = list(dict.fromkeys(review_keys))
+        found = {}
+        columns = ["review_key", "text_hash"] + RESULT_FIELDS
+        with self._lock:
+            for start in range(0, len(unique_keys), _CHUNK_SIZE):
+                chunk = unique_keys[start:start + _CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(columns)} FROM review_analysis "
+                    f"WHERE fingerprint = ? AND review_key IN ({placeholders})",
+                    [fingerprint, *chunk],
+                ).fetchall()
+                for row in rows:
+                    record = dict(zip(columns, row))
+                    found[record.pop("review_key")] = record
+        return found
+
+    def put_many(self, records, fingerprint):
+        """Menyimpan (insert/replace) banyak hasil analisis. records: list dict berisi review_key, text_hash dan RESULT_FIELDS."""
+        if not records:
+            return
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        columns = ["review_key", "fingerprint", "text_hash"] + RESULT_FIELDS + ["updated_at"]
+        values = [
+            [r["review_key"], fingerprint, r["text_hash"], *(r.get(f) for f in RESULT_FIELDS), now]
+            for r in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO review_analysis ({', '.join(columns)}) "
+                f"VALUES ({','.join('?' * len(columns))})",
+                values,
+            )
+
+    def count(self, fingerprint=None):
+        with self._lock:
+            if fingerprint is None:
+                return self._conn.execute("SELECT COUNT(*) FROM review_analysis").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM review_analysis WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()[0]
@@ -0,0 +1,135 @@
+# utils/artifact_bundle.py
+
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+BUNDLE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+
+# category_embeddings / definition_embeddings: view read-only dari satu memmap float32
+ArtifactBundle = namedtuple(
+    "ArtifactBundle",
+    ["fingerprint", "category_embeddings", "definition_embeddings", "definition_texts", "definition_offsets", "stop_words"],
+)
+
+
+def bundle_fingerprint(model_name, backend, categories, definitions):
+    """Sidik jari model + input artefak; bundle dianggap basi jika nilainya berubah."""
+    payload = json.dumps({
+        "bundle_version": BUNDLE_VERSION,
+        "model": model_name,
+        "backend": backend,
+        "categories": categories,
+        "definitions": definitions,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_bundle(bundle_dir, fingerprint, category_embeddings, definition_embeddings,
+                 definition_texts, definition_offsets, stop_words):
+    """
+    Menulis bundle artefak: satu file float32 (embedding kategori lalu embedding definisi, baris demi baris)
+    yang bisa di-memory-map, plus manifest.json (versi, fingerprint, shape, checksum, teks, stopwords).
+    Manifest ditulis terakhir (atomik) sehingga bundle setengah jadi tidak pernah dianggap valid.
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    category_embeddings = np.ascontiguousarray(category_embeddings, dtype=np.float32)
+    definition_embeddings = np.ascontiguousarray(definition_embeddings, dtype=np.float32)
+
+    embeddings_path = os.path.join(bundle_dir, EMBEDDINGS_FILE)
+    tmp_path = embeddings_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(category_embeddings.tobytes())
+        f.write(definition_embeddings.tobytes())
+    os.replace(tmp_path, embeddings_path)
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "fingerprint": fingerprint,
+        "dim": int(category_embeddings.shape[1]),
+        "n_categories": int(category_embeddings.shape[0]),
+        "n_definitions": int(definition_embeddings.shape[0]),
+        "sha256": _sha256_file(embeddings_path),
+        "definition_texts": list(definition_texts),
+        "definition_offsets": {c: list(v) for c, v in definition_offsets.items()},
+        "stop_words": sorted(stop_words),
+    }
+    manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def read_bundle(bundle_dir, fingerprint, verify_checksum=True):
+    """
+    Membuka bundle (memmap read-only). Mengembalikan None jika bundle tidak ada, versinya berbeda,
+    fingerprint tidak cocok atau checksum/ukuran file tidak sesuai.
+    """
+    manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+    embeddings_path = os.path.join(bundle_dir, EMBEDDINGS_FILE)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if manifest.get("version") != BUNDLE_VERSION or manifest.get("fingerprint") != fingerprint:
+        return None
+
+    dim, n_categories, n_definitions = manifest["dim"], manifest["n_categories"], manifest["n_definitions"]
+    expected_bytes = (n_categories + n_definitions) * dim * 4
+    if not os.path.exists(embeddings_path) or os.path.getsize(embeddings_path) != expected_bytes:
+        return None
+    if verify_checksum and _sha256_file(embeddings_path) != manifest.get("sha256"):
+        return None
+
+    matrix = np.memmap(embeddings_path, dtype=np.float32, mode="r", shape=(n_categories + n_definitions, dim))
+    return ArtifactBundle(
+        fingerprint=fingerprint,
+        category_embeddings=matrix[:n_categories],
+        definition_embeddings=matrix[n_categories:],
+        definition_texts=manifest["definition_texts"],
+        definition_offsets={c: tuple(v) for c, v in manifest["definition_offsets"].items()},
+        stop_words=frozenset(manifest["stop_words"]),
+    )
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build bundle artefak model (embedding kategori, definisi, stopwords).")
+    parser.add_argument("command", choices=["build", "check"])
+    args = parser.parse_args()
+
+    from utils import helpers
+
+    if args.command == "build":
+        start = time.perf_counter()
+        helpers.build_artifact_bundle()
+        print(f"✅ Artifact bundle written to {helpers.artifact_bundle_dir()} in {time.perf_counter() - start:.2f}s")
+        return
+
+    bundle = read_bundle(helpers.artifact_bundle_dir(), helpers.artifact_fingerprint())
+    if bundle is None:
+        print("❌ Artifact bundle missing or stale (fingerprint/checksum mismatch). Run: python -m utils.artifact_bundle build")
+    else:
+        print(f"✅ Artifact bundle OK (fingerprint {bundle.fingerprint}, {len(bundle.definition_texts)} definitions)")
+
+
+if __name__ == "__main__":
+    main()
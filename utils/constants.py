@@ -10,6 +10,82 @@ REPORT_FILE = "reported_reviews.json"
 HISTORY_FILE = "report_history_email.json" # Kunci: Email Reporter
 SUBMITTED_LOG_FILE = "submitted_log.json" # Log untuk tampilan UI (Global)
 
+# --- Konfigurasi Model Semantik & Cache Embedding ---
+SEMANTIC_MODEL_NAME = "intfloat/multilingual-e5-small"
+SEMANTIC_EMBEDDING_DIM = 384 # Dimensi embedding e5-small (cache bisa dibuka tanpa memuat model)
+# Backend inferensi: "torch" (referensi) atau "onnx" (int8, ONNX Runtime, khusus CPU)
+SEMANTIC_BACKEND = os.environ.get("ELYSIUM_SEMANTIC_BACKEND", "torch")
+ONNX_MODEL_DIR = "onnx_model" # Hasil: python -m utils.onnx_backend export
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ELYSIUM_ONNX_THREADS", "0")) # 0 = default ONNX Runtime
+EMBEDDING_CACHE_DIR = "embedding_cache"
+EMBEDDING_CACHE_MAX_MB = 256 # Batas ukuran matriks embedding di disk (eviction LRU jika terlampaui)
+EMBEDDING_CACHE_LRU_SIZE = 4096 # Jumlah vektor yang disimpan di memori
+# Format penyimpanan embedding review: "float32" (penuh) atau "int8" (kuantisasi skalar + PCA opsional,
+# butuh quantizer hasil: python -m utils.quantized_embeddings fit [--pca 128])
+EMBEDDING_STORE = os.environ.get("ELYSIUM_EMBEDDING_STORE", "float32")
+EMBEDDING_QUANTIZER_FILE = os.path.join(EMBEDDING_CACHE_DIR, "quantizer.npz")
+VOCAB_TABLE_DIR = "vocab_cache" # Tabel embedding kata untuk key tokens
+ARTIFACT_BUNDLE_DIR = "artifacts" # Bundle embedding kategori + definisi + stopwords (python -m utils.artifact_bundle build)
+ARTIFACT_BUNDLE_ENABLED = os.environ.get("ELYSIUM_ARTIFACT_BUNDLE", "1") != "0" # 0 = selalu hitung ulang saat start
+SHARED_WEIGHTS_ENABLED = os.environ.get("ELYSIUM_SHARED_WEIGHTS", "0") == "1" # 1 = bobot model (torch) di-memory-map dari bundle, dipakai bersama antar proses worker
+ANALYSIS_DB_FILE = "analysis_store.sqlite3" # Hasil analisis AI per review (kunci: review key + fingerprint model)
+INFERENCE_MAX_BATCH_SIZE = 64 # Maks. teks per micro-batch di worker inference bersama
+INFERENCE_MAX_WAIT_MS = 10 # Maks. waktu tunggu (ms) mengumpulkan request sebelum batch di-encode
+NEAR_DUPLICATE_THRESHOLD = 0.95 # Cosine minimum antar review agar dianggap near-duplicate (review bombing)
+SEARCH_ANN_THRESHOLD = 5000 # Di atas jumlah review ini, pencarian semantik memakai index IVF (ANN) alih-alih brute force
+STREAM_BATCH_SIZE = 50 # Review per batch yang dikirim scraper ke thread analisis
+STREAM_QUEUE_SIZE = 8 # Maks. batch yang menunggu di antrean (scraper menunggu jika penuh)
+
+# --- Konfigurasi Scraper ---
+SCRAPER_BULK_EXTRACTION = os.environ.get("ELYSIUM_BULK_EXTRACTION", "1") != "0" # 0 = ekstraksi lama per element (untuk perbandingan round trip)
+SCROLL_STEP_TIMEOUT_MS = 3000 # Maks. waktu tunggu review baru (MutationObserver) per langkah scroll
+SCROLL_END_IDLE_STEPS = 2 # Langkah berturut-turut di dasar list tanpa review baru = akhir feed
+SORTED_EARLY_STOP_RUN = 3 # Sort "Lowest rating": berhenti scroll setelah sekian review berturut-turut di atas 2 bintang
+
+# Profil pemblokiran resource browser scraper (CDP Network.setBlockedURLs), dipilih lewat ELYSIUM_BLOCK_PROFILE.
+# Pola memakai wildcard '*' (format CDP); request review (/maps/rpc/..., /maps/preview/review/...) tidak pernah cocok.
+RESOURCE_BLOCKING_PROFILE = os.environ.get("ELYSIUM_BLOCK_PROFILE", "safe") # "off", "safe" atau "aggressive"
+RESOURCE_BLOCKING_RULES = {
+    "images": [
+        "*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg*", "*.gif", "*.gif?*", "*.webp*",
+        "*lh3.googleusercontent.com/*", "*lh4.googleusercontent.com/*", "*lh5.googleusercontent.com/*",
+        "*lh6.googleusercontent.com/*", "*streetviewpixels-pa.googleapis.com/*",
+    ],
+    "map_tiles": ["*/maps/vt?*", "*/maps/vt/*", "*khms0.google*", "*khms1.google*", "*/kh/v=*"],
+    "fonts": ["*fonts.gstatic.com/*", "*.woff", "*.woff2", "*.ttf"],
+    "analytics": [
+        "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+        "*/gen_204*", "*play.google.com/log*", "*/csi?*",
+    ],
+    "media": ["*.mp4*", "*.webm*", "*.svg", "*.svg?*", "*.ico", "*/maps/preview/photo*"],
+}
+RESOURCE_BLOCKING_PROFILES = {
+    "off": [],
+    "safe": ["images", "map_tiles", "fonts", "analytics"],
+    "aggressive": ["images", "map_tiles", "fonts", "analytics", "media"],
+}
+# Perkiraan ukuran rata-rata (byte) per request yang diblokir, untuk estimasi bandwidth yang dihemat
+RESOURCE_BLOCKING_AVG_BYTES = {"images": 25_000, "map_tiles": 20_000, "fonts": 35_000, "analytics": 1_500, "media": 60_000}
+RESOURCE_BLOCKING_LOG_DRAIN_STEPS = 25 # Performance log dibaca (dan dikosongkan) setiap sekian langkah scroll
+
+# Pool browser headless (scraper & distribusi rating): browser tetap hangat dan dipakai ulang antar aksi
+BROWSER_POOL_SIZE = int(os.environ.get("ELYSIUM_BROWSER_POOL_SIZE", "2")) # 0 = tanpa pool (browser baru per aksi)
+BROWSER_POOL_MAX_USES = 20 # Browser didaur ulang setelah sekian kali dipinjam
+BROWSER_POOL_MAX_MEMORY_MB = 1500 # ... atau jika memori (PSS) proses browser melebihi batas ini
+BROWSER_POOL_LEASE_TIMEOUT_SECONDS = 300 # Maks. waktu menunggu browser bebas
+BROWSER_POOL_SIDEBAR_WAIT_SECONDS = 2 # Distribusi rating di sidebar: setelah ini pakai browser sementara di luar pool
+# Origin yang cookies & storage-nya dihapus saat browser dikembalikan ke pool
+BROWSER_RESET_ORIGINS = [
+    "https://www.google.com", "https://google.com", "https://maps.google.com",
+    "https://accounts.google.com", "https://consent.google.com",
+]
+
+# Batch scraping banyak tempat: setiap worker adalah proses terpisah dengan browser sendiri
+BATCH_MAX_WORKERS = int(os.environ.get("ELYSIUM_BATCH_WORKERS", "2"))
+BATCH_JOB_TIMEOUT_SECONDS = 1800 # Job (satu link) yang melebihi batas ini dihentikan
+BATCH_MAX_RETRIES = 1 # Percobaan ulang untuk job yang gagal / timeout
+BATCH_WORKER_BROWSER_POOL_SIZE = min(BROWSER_POOL_SIZE, 1) # Worker batch menjalankan satu job sekaligus: cukup satu browser hangat (0 = tanpa pool tetap dihormati)
+
 # --- Konfigurasi Timeout dan Kadaluarsa ---
 COOKIE_EXPIRY_MINUTES = 90  # 1 hours 30 Minutes
 LOGIN_TIMEOUT_SECONDS = 300  # 5 menit
@@ -91,3 +167,53 @@ CATEGORY_DEFINITIONS = {
         "Supporting harmful organizations or activities."
     ]
 }
+
+
+# --- Lexicon & Regex Pre-filter (tahap pertama sebelum model semantik) ---
+# Dua tingkat kecocokan:
+# - "terms" / "patterns" (kuat): istilah eksplisit dan pola PII yang berjangkar konteks. Satu kecocokan kuat
+#   (atau settle_min_hits kecocokan total) memutuskan review TANPA memanggil model (encode dilewati).
+# - "weak_terms" / "weak_patterns" (lemah): hanya prior LEXICON_PRIOR_POINTS pada skor model (0-100) dan
+#   token yang cocok ditampilkan lebih dulu sebagai key token.
+# "definition" / indeks kedua pada "patterns" = indeks kalimat di CATEGORY_DEFINITIONS[kategori]
+# yang dipakai sebagai alasan kebijakan. Teks review sudah di-lowercase oleh clean_review_text_en
+# (simbol seperti @ dan - sudah diganti spasi, stopword English seperti "no" sudah dihapus).
+# Istilah ambigu tidak dimasukkan: "tai" (mai tai, tai chi), "anjing" (anjing sungguhan), "kampret" (kelelawar).
+LEXICON_RULES = {
+    "Profanity": {
+        "min_hits": 1,
+        "settle_min_hits": 2,
+        "definition": 0,
+        "terms": [
+            # English
+            "fuck", "fucking", "fucked", "fucker", "motherfucker", "cunt", "asshole",
+            # Indonesia / Jawa
+            "kontol", "memek", "ngentot", "bangsat", "bajingan", "jancuk", "jancok",
+        ],
+        "weak_terms": [
+            "shit", "shitty", "bullshit", "bitch", "bastard", "dickhead", "wtf",
+            "anjir", "brengsek", "keparat", "taik",
+        ],
+    },
+    "Personal information": {
+        "min_hits": 1,
+        "patterns": [
+            # Nomor HP Indonesia (08xx / 628xx / +62 8xx) tepat setelah kata konteks hp/wa/telepon
+            (r"\b(?:hp|wa|whatsapp|telp|tlp|telepon|phone|call|sms|hubungi|kontak|contact)\b[a-z .:]{0,20}?"
+             r"(?<!\d)(?:\+?62|0)\s?8\d{1,3}(?:[\s.-]?\d{3,4}){2,3}(?!\d)", 0),
+            # Alamat rumah seseorang: rumah/tinggal/home ... jalan/jl ... nomor/number <angka>
+            # (alamat publik tempat usaha tanpa konteks rumah tidak dihitung)
+            (r"\b(?:rumah|rumahnya|tinggal|alamatnya|home|house|lives|living)\b[a-z0-9 .]{0,30}?"
+             r"\b(?:jalan|jl|jln)\.?\s+[a-z0-9 .]{2,40}?\s(?:nomor|number)\.?\s?\d+", 0),
+            # NIK / nomor KTP (16 digit, boleh dipisah per 4 digit) tepat setelah kata ktp/nik
+            (r"\b(?:ktp|nik)\b[a-z .:]{0,20}?(?<!\d)\d{4}\s?\d{4}\s?\d{4}\s?\d{4}(?!\d)", 2),
+        ],
+        "weak_patterns": [
+            # Email (mentah, atau setelah '@' dibersihkan menjadi spasi); bisa juga email publik tempat usaha
+            (r"\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b", 1),
+            (r"\b[a-z0-9._]+\s(?:gmail|yahoo|hotmail|outlook|ymail)\.com\b", 1),
+        ],
+    },
+}
+# Tambahan skor (poin, skala 0-100) untuk kategori yang hanya cocok secara lemah, sebelum argmax model
+LEXICON_PRIOR_POINTS = 3.0
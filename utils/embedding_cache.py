@@ -0,0 +1,342 @@
+# utils/embedding_cache.py
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError: # Windows: tanpa lock antar proses
+    fcntl = None
+
+
+# Kunci disimpan sebagai 16 byte mentah (V16): tipe "S16" membuang NUL di akhir, sehingga kunci yang
+# berakhiran b"\x00" terbaca berbeda dari yang disimpan
+INDEX_DTYPE = np.dtype([("key", "V16"), ("tick", "<u8")])
+EMPTY_KEY = bytes(16)
+
+
+def content_key(text, namespace=""):
+    """Kunci 16-byte (blake2b) dari isi teks. Namespace memisahkan embedding antar model/backend."""
+    payload = f"{namespace}\0{text}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+@contextmanager
+def interprocess_lock(path, exclusive=True):
+    """
+    flock pada file lock untuk penyimpanan memmap yang dipakai bersama beberapa proses
+    (worker Streamlit, benchmark). Tidak reentrant: jangan dipanggil bertingkat dalam satu proses.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_signature(path):
+    """(inode, mtime, ukuran) file; berubah jika proses lain menulis ulang file tersebut."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def resize_memmap(path, dtype, new_shape):
+    """Memperbesar file memmap di disk lalu membukanya kembali dengan shape baru."""
+    new_bytes = int(np.prod(new_shape)) * np.dtype(dtype).itemsize
+    with open(path, "ab") as f:
+        f.truncate(new_bytes)
+    return np.memmap(path, dtype=dtype, mode="r+", shape=new_shape)
+
+
+class EmbeddingCache:
+    """
+    Penyimpanan embedding di disk dengan kunci hash isi teks.
+
+    - vectors.f32 : matriks float32 (kapasitas x dimensi) yang di-memory-map.
+      Dengan quantizer (utils/quantized_embeddings.py): vectors.i8, codes int8 (kapasitas x code_dim);
+      vektor di-encode saat ditulis dan di-decode saat dibaca.
+    - index.npy   : index kunci ringkas (16 byte hash + penanda akses terakhir per baris).
+    - LRU di memori di depan memmap untuk vektor yang sering dipakai.
+    - Jika ukuran melebihi max_bytes, baris yang paling lama tidak dipakai dibuang.
+    - Aman dipakai beberapa proses: baca di bawah flock bersama, alokasi/tulis/flush di bawah flock
+      eksklusif (.lock), dan index dimuat ulang dari disk jika proses lain sudah mengubahnya.
+    """
+
+    VERSION = 2
+
+    def __init__(self, cache_dir, dim, namespace="", max_bytes=256 * 1024 * 1024, lru_size=4096, initial_rows=1024,
+                 quantizer=None):
+        self.cache_dir = cache_dir
+        self.dim = int(dim)
+        self.namespace = namespace
+        self.quantizer = quantizer
+        if quantizer is None:
+            self._storage_dtype, self._row_width = np.float32, self.dim
+        else:
+            self._storage_dtype, self._row_width = np.int8, quantizer.code_dim
+        self.row_bytes = self._row_width * np.dtype(self._storage_dtype).itemsize
+        self.max_rows = max(1, int(max_bytes) // self.row_bytes)
+        self.lru_size = lru_size
+        self.initial_rows = min(initial_rows, self.max_rows)
+
+        self._lock = threading.RLock()
+        self._lru = OrderedDict()
+        self.stats = {"hits": 0, "lru_hits": 0, "misses": 0, "evictions": 0}
+
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32" if quantizer is None else "vectors.i8")
+        self._index_path = os.path.join(cache_dir, "index.npy")
+        self._meta_path = os.path.join(cache_dir, "meta.json")
+        self._lock_path = os.path.join(cache_dir, ".lock")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._lock, interprocess_lock(self._lock_path):
+            self._open()
+
+    # --- Inisialisasi & Persistensi ---
+    def _open(self):
+        meta = None
+        if os.path.exists(self._meta_path):
+            try:
+                with open(self._meta_path, "r") as f:
+                    meta = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                meta = None
+
+        valid = (
+            meta is not None
+            and meta.get("version") == self.VERSION
+            and meta.get("dim") == self.dim
+            and meta.get("codec") == self._codec
+            and os.path.exists(self._vectors_path)
+            and os.path.exists(self._index_path)
+        )
+
+        if valid:
+            try:
+                self._index = np.load(self._index_path)
+                self._index_signature = file_signature(self._index_path)
+                capacity = len(self._index)
+                self._vectors = np.memmap(self._vectors_path, dtype=self._storage_dtype, mode="r+", shape=(capacity, self._row_width))
+            except (OSError, ValueError):
+                valid = False
+
+        if not valid:
+            # Cache baru (atau rusak / dimensi atau quantizer berbeda): mulai dari kosong
+            capacity = self.initial_rows
+            self._index = np.zeros(capacity, dtype=INDEX_DTYPE)
+            with open(self._vectors_path, "wb") as f:
+                f.truncate(capacity * self.row_bytes)
+            self._vectors = np.memmap(self._vectors_path, dtype=self._storage_dtype, mode="r+", shape=(capacity, self._row_width))
+            self._flush()
+
+        self._tick = 0
+        self._rebuild_rows()
+
+    def _rebuild_rows(self):
+        used = self._index["key"] != np.void(EMPTY_KEY)
+        self._rows = {k.tobytes(): int(r) for r, k in zip(np.flatnonzero(used), self._index["key"][used])}
+        self._free_rows = [int(r) for r in np.flatnonzero(~used)][::-1]
+        self._tick = max(self._tick, int(self._index["tick"].max()) if len(self._index) else 0)
+
+    def _refresh(self):
+        """Memuat ulang index dari disk jika proses lain sudah menulisnya (flock & self._lock sudah dipegang)."""
+        signature = file_signature(self._index_path)
+        if signature is None or signature == self._index_signature:
+            return
+        index = np.load(self._index_path)
+        # Penanda akses lokal yang belum di-flush tetap dipakai untuk baris yang kuncinya sama
+        n = min(len(index), len(self._index))
+        same = index["key"][:n] == self._index["key"][:n]
+        ticks = index["tick"][:n]
+        ticks[same] = np.maximum(ticks[same], self._index["tick"][:n][same])
+        if len(index) != self._vectors.shape[0]:
+            del self._vectors
+            self._vectors = np.memmap(self._vectors_path, dtype=self._storage_dtype, mode="r+", shape=(len(index), self._row_width))
+        self._index = index
+        self._index_signature = signature
+        self._rebuild_rows()
+
+    def _flush(self):
+        self._vectors.flush()
+        tmp_path = self._index_path + ".tmp.npy"
+        np.save(tmp_path, self._index)
+        os.replace(tmp_path, self._index_path)
+        self._index_signature = file_signature(self._index_path)
+        with open(self._meta_path, "w") as f:
+            json.dump({"version": self.VERSION, "dim": self.dim, "codec": self._codec, "capacity": len(self._index)}, f)
+
+    def flush(self):
+        """Menulis vektor dan index ke disk (index ditulis secara atomik)."""
+        with self._lock, interprocess_lock(self._lock_path):
+            self._refresh()
+            self._flush()
+
+    @property
+    def _codec(self):
+        """Penanda format baris di disk: None = float32 penuh, selain itu fingerprint quantizer."""
+        return None if self.quantizer is None else self.quantizer.fingerprint
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def size_bytes(self):
+        return len(self._rows) * self.row_bytes
+
+    def _decode(self, stored):
+        stored = np.array(stored)
+        return stored if self.quantizer is None else self.quantizer.decode(stored)
+
+    # --- Alokasi Baris & Eviction ---
+    def _grow(self, needed):
+        capacity = len(self._index)
+        new_capacity = min(self.max_rows, max(capacity * 2, capacity + needed))
+        if new_capacity <= capacity:
+            return
+        self._vectors.flush()
+        del self._vectors
+        self._vectors = resize_memmap(self._vectors_path, self._storage_dtype, (new_capacity, self._row_width))
+        self._index = np.concatenate([self._index, np.zeros(new_capacity - capacity, dtype=INDEX_DTYPE)])
+        self._free_rows = list(range(new_capacity - 1, capacity - 1, -1)) + self._free_rows
+
+    def _evict(self, needed):
+        """Membuang baris yang paling lama tidak diakses (ditambah 10% ruang cadangan)."""
+        count = min(len(self._rows), needed + self.max_rows // 10)
+        used_rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        ticks = self._index["tick"][used_rows]
+        victims = used_rows[np.argsort(ticks, kind="stable")[:count]]
+        for row in victims.tolist():
+            key = self._index["key"][row].tobytes()
+            self._rows.pop(key, None)
+            self._lru.pop(key, None)
+            self._index[row] = (EMPTY_KEY, 0)
+            self._free_rows.append(row)
+        self.stats["evictions"] += len(victims)
+
+    def _allocate(self, needed):
+        if len(self._free_rows) < needed:
+            self._grow(needed - len(self._free_rows))
+        if len(self._free_rows) < needed:
+            self._evict(needed - len(self._free_rows))
+        return [self._free_rows.pop() for _ in range(min(needed, len(self._free_rows)))]
+
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    # --- API Publik ---
+    def get_many(self, texts):
+        """
+        Mengambil embedding untuk list teks.
+
+        Returns:
+            (matriks float32 (N x dim), list posisi teks yang belum ada di cache)
+        """
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        with self._lock, interprocess_lock(self._lock_path, exclusive=False):
+            self._refresh()
+            for i, text in enumerate(texts):
+                key = content_key(text, self.namespace)
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append(i)
+                    continue
+
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    self.stats["lru_hits"] += 1
+                else:
+                    vector = self._decode(self._vectors[row])
+                    self._remember(key, vector)
+                self._tick += 1
+                self._index["tick"][row] = self._tick
+                out[i] = vector
+                self.stats["hits"] += 1
+            self.stats["misses"] += len(missing)
+        return out, missing
+
+    def put_many(self, texts, embeddings):
+        """Menyimpan embedding (N x dim) untuk list teks, lalu flush ke disk."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock, interprocess_lock(self._lock_path):
+            # Baris yang sudah diklaim proses lain harus terlihat sebelum alokasi
+            self._refresh()
+            pending = OrderedDict()
+            for text, vector in zip(texts, embeddings):
+                key = content_key(text, self.namespace)
+                if key not in self._rows:
+                    pending[key] = vector
+            if not pending:
+                return
+
+            self._store(list(pending.items()), remember=True)
+
+    def _store(self, items, remember=False):
+        """
+        Menulis list (kunci, embedding float32) ke baris baru lalu flush ke disk; mengembalikan jumlah baris.
+        Dipanggil dengan flock eksklusif dan index yang sudah di-refresh.
+        """
+        rows = self._allocate(len(items))
+        items = items[:len(rows)]
+        if not items:
+            return 0
+        vectors = np.stack([vector for _, vector in items])
+        stored = vectors if self.quantizer is None else self.quantizer.encode(vectors)
+        for row, (key, vector), stored_row in zip(rows, items, stored):
+            self._tick += 1
+            self._vectors[row] = stored_row
+            self._index[row] = (key, self._tick)
+            self._rows[key] = row
+            if remember:
+                # LRU menyimpan vektor yang sama dengan yang nanti dibaca dari disk (hasil decode)
+                self._remember(key, np.array(vector) if self.quantizer is None else self._decode(stored_row[None])[0])
+        self._flush()
+        return len(items)
+
+    def export_rows(self):
+        """(list kunci, matriks embedding float32) untuk semua baris yang tersimpan (hasil decode jika terkuantisasi)."""
+        with self._lock, interprocess_lock(self._lock_path, exclusive=False):
+            self._refresh()
+            keys = list(self._rows)
+            rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(keys))
+            return keys, self._decode(self._vectors[rows]).reshape(len(keys), self.dim)
+
+    def import_rows(self, keys, embeddings):
+        """Menyalin baris (kunci hash + embedding) dari cache lain, misal saat pindah ke format terkuantisasi."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock, interprocess_lock(self._lock_path):
+            self._refresh()
+            return self._store([(key, vector) for key, vector in zip(keys, embeddings) if key not in self._rows])
+
+    def get_or_compute(self, texts, encode_fn):
+        """
+        Mengambil embedding dari cache; teks yang belum ada di-encode dengan encode_fn
+        (SATU panggilan untuk semua teks yang hilang) lalu disimpan ke cache.
+        """
+        embeddings, missing = self.get_many(texts)
+        if missing:
+            # Teks duplikat dalam satu batch cukup di-encode sekali
+            unique_missing = list(dict.fromkeys(texts[i] for i in missing))
+            computed = np.asarray(encode_fn(unique_missing), dtype=np.float32)
+            self.put_many(unique_missing, computed)
+            lookup = dict(zip(unique_missing, computed))
+            for i in missing:
+                embeddings[i] = lookup[texts[i]]
+        return embeddings
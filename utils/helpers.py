@@ -1,58 +1,363 @@
 # utils/helpers.py
 
 import streamlit as st
+import os
 import time
 import re
-import emoji
-import nltk
-import torch # Diperlukan untuk manipulasi tensor (word embeddings)
-from nltk.corpus import stopwords
+import json
+import warnings
+import hashlib
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from sentence_transformers import SentenceTransformer, util
-from .constants import REPORT_CATEGORIES, CATEGORY_DEFINITIONS
+from .lazy import lazy_import
+from .constants import (
+    REPORT_CATEGORIES, CATEGORY_DEFINITIONS, LEXICON_RULES, LEXICON_PRIOR_POINTS, SEMANTIC_MODEL_NAME, SEMANTIC_EMBEDDING_DIM,
+    SEMANTIC_BACKEND, ONNX_MODEL_DIR, ONNX_INTRA_OP_THREADS, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_MB, EMBEDDING_CACHE_LRU_SIZE, VOCAB_TABLE_DIR,
+    EMBEDDING_STORE, EMBEDDING_QUANTIZER_FILE,
+    ARTIFACT_BUNDLE_DIR, ARTIFACT_BUNDLE_ENABLED, SHARED_WEIGHTS_ENABLED,
+    ANALYSIS_DB_FILE, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS,
+    NEAR_DUPLICATE_THRESHOLD, SEARCH_ANN_THRESHOLD
+)
+from .embedding_cache import EmbeddingCache
+from .quantized_embeddings import EmbeddingQuantizer
+from .vocab_table import VocabularyTable
+from .analysis_store import AnalysisStore
+from .inference_service import MicroBatchEncoder
+from .near_duplicates import cluster_near_duplicates
+from .lexicon import LexiconPrefilter
+from .search_index import ReviewSearchIndex
+from .artifact_bundle import ArtifactBundle, bundle_fingerprint, read_bundle, write_bundle
+from .shared_weights import WEIGHTS_FILE, export_shared_weights, attach_shared_weights
 
-# Inisialisasi NLTK (hanya sekali)
-try:
-    stop_words = set(stopwords.words("english"))
-except LookupError:
-    nltk.download("stopwords")
-    stop_words = set(stopwords.words("english"))
+# Library berat baru di-import saat pertama kali dipakai, bukan saat modul ini di-import
+# (scraper/reporter mengimpor helpers tapi tidak selalu butuh model).
+torch = lazy_import("torch") # Diperlukan untuk manipulasi tensor (word embeddings)
+util = lazy_import("sentence_transformers.util")
+emoji = lazy_import("emoji")
+
+def _compute_stop_words():
+    """Stopwords NLTK (diunduh jika belum ada)."""
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        return set(stopwords.words("english"))
+    except LookupError:
+        nltk.download("stopwords")
+        return set(stopwords.words("english"))
+
+@st.cache_resource
+def load_stop_words():
+    """Stopwords dari bundle artefak jika valid, selain itu inisialisasi NLTK (hanya sekali)."""
+    bundle = _open_artifact_bundle()
+    if bundle is not None:
+        return set(bundle.stop_words)
+    return _compute_stop_words()
 
 @st.cache_resource
+def load_encoder():
+    """
+    Memuat model Sentence Transformer (hanya dibutuhkan jika ada teks yang harus di-encode).
+    Backend dipilih lewat SEMANTIC_BACKEND: "torch" (referensi) atau "onnx" (int8 via ONNX Runtime).
+    SHARED_WEIGHTS_ENABLED (torch): bobot model di-memory-map read-only dari bundle artefak sehingga
+    beberapa proses worker memakai halaman memori bobot yang sama.
+    """
+    if SEMANTIC_BACKEND == "onnx":
+        from .onnx_backend import OnnxSentenceEncoder, export_quantized_onnx, ONNX_INT8_FILE
+        if not os.path.exists(os.path.join(ONNX_MODEL_DIR, ONNX_INT8_FILE)):
+            export_quantized_onnx(SEMANTIC_MODEL_NAME, ONNX_MODEL_DIR)
+        return OnnxSentenceEncoder(ONNX_MODEL_DIR, intra_op_threads=ONNX_INTRA_OP_THREADS)
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(SEMANTIC_MODEL_NAME, device="cpu" if SHARED_WEIGHTS_ENABLED else None)
+    if SHARED_WEIGHTS_ENABLED:
+        weights_path = shared_weights_path()
+        # Proses pertama mengekspor file bobot; proses berikutnya langsung attach ke file yang sama
+        if not attach_shared_weights(model, weights_path, artifact_fingerprint()):
+            export_shared_weights(model, weights_path, artifact_fingerprint())
+            attach_shared_weights(model, weights_path, artifact_fingerprint())
+    return model
+
 def load_semantic_model():
-    """Memuat model Sentence Transformer dan menghitung embedding hanya dari 6 nama kategori."""
-    model = SentenceTransformer("intfloat/multilingual-e5-small")
-    
-    # Menghitung embedding hanya dari 6 nama kategori (Vektor Ringkas)
-    category_embeddings = model.encode(REPORT_CATEGORIES, convert_to_tensor=True)
-    
-    return model, category_embeddings
+    """Model + embedding nama kategori (embedding kategori diambil dari bundle artefak)."""
+    return load_encoder(), _category_embeddings()
+
+def _model():
+    return load_encoder()
+
+def _category_embeddings():
+    return _artifact_tensors()[0]
+
+# Embedding dari backend berbeda (torch vs onnx int8) tidak identik, jadi cache dipisah per backend
+EMBEDDING_NAMESPACE = f"{SEMANTIC_MODEL_NAME}:{SEMANTIC_BACKEND}"
+
+def _definition_layout():
+    """Urutan teks CATEGORY_DEFINITIONS dalam matriks prototipe + offset per kategori."""
+    definition_texts = []
+    offsets = {}
+    for category in REPORT_CATEGORIES:
+        definitions = CATEGORY_DEFINITIONS.get(category, [])
+        offsets[category] = (len(definition_texts), len(definition_texts) + len(definitions))
+        definition_texts.extend(definitions)
+    return definition_texts, offsets
+
+def artifact_bundle_dir():
+    return os.path.join(ARTIFACT_BUNDLE_DIR, SEMANTIC_BACKEND)
+
+def shared_weights_path():
+    return os.path.join(artifact_bundle_dir(), WEIGHTS_FILE)
+
+def artifact_fingerprint():
+    return bundle_fingerprint(SEMANTIC_MODEL_NAME, SEMANTIC_BACKEND, REPORT_CATEGORIES, CATEGORY_DEFINITIONS)
+
+@st.cache_resource
+def _open_artifact_bundle():
+    """Bundle artefak di disk (memmap) jika versi, fingerprint dan checksum-nya cocok; None jika tidak."""
+    if not ARTIFACT_BUNDLE_ENABLED:
+        return None
+    return read_bundle(artifact_bundle_dir(), artifact_fingerprint())
+
+def _compute_artifacts():
+    """Menghitung isi bundle dengan model (embedding kategori + semua definisi dalam satu kali encode)."""
+    definition_texts, offsets = _definition_layout()
+    embeddings = np.asarray(
+        _model().encode(REPORT_CATEGORIES + definition_texts, convert_to_tensor=False), dtype=np.float32
+    )
+    return ArtifactBundle(
+        fingerprint=artifact_fingerprint(),
+        category_embeddings=embeddings[:len(REPORT_CATEGORIES)],
+        definition_embeddings=embeddings[len(REPORT_CATEGORIES):],
+        definition_texts=definition_texts,
+        definition_offsets=offsets,
+        stop_words=frozenset(_compute_stop_words()),
+    )
+
+def build_artifact_bundle():
+    """Langkah build: menghitung ulang artefak lalu menulis bundle ke artifact_bundle_dir()."""
+    bundle = _compute_artifacts()
+    write_bundle(artifact_bundle_dir(), *bundle)
+    _open_artifact_bundle.clear()
+    return bundle
+
+@st.cache_resource
+def load_artifact_bundle():
+    """
+    Bundle artefak untuk proses ini: di-memory-map dari disk jika masih valid.
+    Jika belum ada atau fingerprint model berubah, artefak dihitung ulang (dan bundle ditulis ulang).
+    """
+    bundle = _open_artifact_bundle()
+    if bundle is not None:
+        return bundle
+    if not ARTIFACT_BUNDLE_ENABLED:
+        return _compute_artifacts()
+    return build_artifact_bundle()
+
+@st.cache_resource
+def _artifact_tensors():
+    """
+    (embedding kategori, embedding definisi) sebagai tensor torch (salinan kecil dari memmap read-only).
+    Dengan SHARED_WEIGHTS_ENABLED tensor langsung menunjuk ke memmap bundle (tanpa salinan per proses).
+    """
+    bundle = load_artifact_bundle()
+    if SHARED_WEIGHTS_ENABLED and isinstance(bundle.category_embeddings, np.memmap):
+        with warnings.catch_warnings():
+            # Memmap read-only: torch memperingatkan tensor non-writable (tensor ini memang tidak pernah ditulis)
+            warnings.simplefilter("ignore", UserWarning)
+            return torch.from_numpy(bundle.category_embeddings), torch.from_numpy(bundle.definition_embeddings)
+    return torch.from_numpy(np.array(bundle.category_embeddings)), torch.from_numpy(np.array(bundle.definition_embeddings))
+
+def load_definition_prototypes():
+    """
+    Matriks prototipe SEMUA kalimat CATEGORY_DEFINITIONS (dari bundle artefak, tanpa encode ulang).
+
+    Returns:
+        (matriks embedding definisi, list teks definisi, dict kategori -> (offset awal, offset akhir))
+    """
+    bundle = load_artifact_bundle()
+    return _artifact_tensors()[1], bundle.definition_texts, bundle.definition_offsets
+
+def _open_embedding_cache(quantizer=None):
+    return EmbeddingCache(
+        EMBEDDING_CACHE_DIR if quantizer is None else os.path.join(EMBEDDING_CACHE_DIR, "int8"),
+        dim=SEMANTIC_EMBEDDING_DIM,
+        namespace=EMBEDDING_NAMESPACE,
+        max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+        lru_size=EMBEDDING_CACHE_LRU_SIZE,
+        quantizer=quantizer
+    )
+
+@st.cache_resource
+def load_embedding_quantizer():
+    """Quantizer int8 (+PCA) untuk cache embedding; None jika EMBEDDING_STORE bukan "int8" atau belum di-fit."""
+    if EMBEDDING_STORE != "int8":
+        return None
+    return EmbeddingQuantizer.load(EMBEDDING_QUANTIZER_FILE)
+
+@st.cache_resource
+def load_embedding_cache():
+    """
+    Membuka cache embedding di disk (dipakai bersama oleh semua sesi Streamlit).
+    Dengan quantizer aktif, embedding disimpan sebagai codes int8; isi cache float32 yang sudah ada
+    disalin (dikompresi) ke cache terkuantisasi saat pertama dibuka.
+    """
+    quantizer = load_embedding_quantizer()
+    cache = _open_embedding_cache(quantizer)
+    if quantizer is not None and len(cache) == 0 and os.path.exists(os.path.join(EMBEDDING_CACHE_DIR, "vectors.f32")):
+        cache.import_rows(*_open_embedding_cache().export_rows())
+    return cache
+
+def load_full_precision_embeddings():
+    """Semua embedding float32 di cache format penuh (korpus untuk fit quantizer / laporan agreement)."""
+    return _open_embedding_cache().export_rows()[1]
+
+@st.cache_resource
+def load_vocabulary_table():
+    """Membuka tabel embedding kata (kosakata) di disk untuk extract_key_tokens."""
+    return VocabularyTable(os.path.join(VOCAB_TABLE_DIR, SEMANTIC_BACKEND), dim=SEMANTIC_EMBEDDING_DIM, namespace=EMBEDDING_NAMESPACE)
+
+@st.cache_resource
+def load_analysis_store():
+    """Membuka database hasil analisis per review (SQLite, dipakai bersama semua sesi)."""
+    return AnalysisStore(ANALYSIS_DB_FILE)
+
+@st.cache_resource
+def load_inference_service():
+    """
+    Worker inference bersama untuk semua sesi: request encode dari setiap sesi dikumpulkan
+    menjadi micro-batch (lihat INFERENCE_MAX_BATCH_SIZE / INFERENCE_MAX_WAIT_MS).
+    """
+    return MicroBatchEncoder(
+        lambda texts: _encode_length_bucketed(texts).cpu().numpy(),
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    )
+
+@st.cache_resource
+def load_lexicon_prefilter():
+    """Pre-filter lexicon/regex (tahap pertama cascade, tanpa model)."""
+    return LexiconPrefilter(LEXICON_RULES)
+
+
+# Nama lama (helpers.MODEL, helpers.CATEGORY_EMBEDDINGS, ...) tetap tersedia, tapi dimuat saat diakses
+_LAZY_ATTRIBUTES = {
+    "MODEL": _model,
+    "CATEGORY_EMBEDDINGS": _category_embeddings,
+    "DEFINITION_EMBEDDINGS": lambda: load_definition_prototypes()[0],
+    "DEFINITION_TEXTS": lambda: load_definition_prototypes()[1],
+    "DEFINITION_OFFSETS": lambda: load_definition_prototypes()[2],
+    "EMBEDDING_CACHE": load_embedding_cache,
+    "VOCAB_TABLE": load_vocabulary_table,
+    "stop_words": load_stop_words,
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Kolom hasil analisis AI yang ditambahkan ke DataFrame hasil scraping
+AI_CATEGORY_COL = "AI Category"
+AI_SCORE_COL = "AI Score"
+AI_TOKENS_COL = "AI Key Tokens"
+AI_POLICY_COL = "AI Policy Reason"
+AI_CONTEXT_COL = "AI Context Sentence"
+AI_CONCEPTS_COL = "AI Key Concepts"
+AI_STAGE_COL = "AI Stage" # Tahap cascade yang memutuskan kategori (lihat STAGE_*)
+AI_COLUMNS = [AI_CATEGORY_COL, AI_SCORE_COL, AI_TOKENS_COL, AI_POLICY_COL, AI_CONTEXT_COL, AI_CONCEPTS_COL, AI_STAGE_COL]
+
+# Skor cosine (0-100, float32) untuk SETIAP kategori, urutan sama dengan REPORT_CATEGORIES
+AI_CATEGORY_SCORE_COLUMNS = [f"{AI_SCORE_COL}: {category}" for category in REPORT_CATEGORIES]
+# Semua kolom hasil analisis per review
+ANALYSIS_COLUMNS = AI_COLUMNS + AI_CATEGORY_SCORE_COLUMNS
+
+# Tahap cascade klasifikasi
+STAGE_SHORT_TEXT = "short_text" # Teks kosong/terlalu pendek -> Off topic
+SHORT_TEXT_REASON = "comments are too short or there are no comments."
+STAGE_LEXICON = "lexicon" # Diputuskan oleh pre-filter lexicon/regex (tanpa model)
+STAGE_LEXICON_PRIOR = "lexicon_prior" # Diputuskan model dengan prior dari kecocokan lexicon lemah (kategori lexicon menang)
+STAGE_MODEL = "model" # Diputuskan oleh model semantik
 
-MODEL, CATEGORY_EMBEDDINGS = load_semantic_model()
+# Naikkan jika logika analisis berubah, agar hasil lama di AnalysisStore dihitung ulang
+ANALYSIS_VERSION = 5
+
+# Pemetaan kolom DataFrame <-> kolom AnalysisStore
+_STORE_FIELDS = {
+    AI_CATEGORY_COL: "category",
+    AI_SCORE_COL: "score",
+    AI_TOKENS_COL: "key_tokens",
+    AI_POLICY_COL: "policy_reason",
+    AI_CONTEXT_COL: "context_sentence",
+    AI_CONCEPTS_COL: "key_concepts",
+    AI_STAGE_COL: "stage",
+}
+
+# Ukuran bucket panjang teks untuk encode batch (teks dengan panjang mirip masuk batch yang sama)
+ENCODE_BATCH_SIZE = 64
 
  
+def _tokenize_words(text):
+    """Pembersihan teks dasar lalu tokenisasi menjadi kata (tanpa stopwords)."""
+    cleaned_text = re.sub(r"[^a-z0-9\s]", "", (text or "").lower())
+    stop_words = load_stop_words()
+    return [w for w in cleaned_text.split() if w not in stop_words and w]
+
+
+def _encode_length_bucketed(texts, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Meng-encode banyak teks dengan SATU panggilan MODEL.encode.
+    Teks diurutkan berdasarkan panjang sehingga setiap batch berisi teks dengan panjang mirip
+    (padding minimal), lalu hasilnya dikembalikan ke urutan semula.
+    """
+    if not texts:
+        return torch.empty((0, _category_embeddings().shape[1]), device=_category_embeddings().device)
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_embeddings = _model().encode(
+        [texts[i] for i in order],
+        batch_size=batch_size,
+        convert_to_tensor=True
+    )
+
+    embeddings = torch.empty_like(sorted_embeddings)
+    embeddings[torch.tensor(order, device=sorted_embeddings.device)] = sorted_embeddings
+    return embeddings
+
+
+def _encode_texts(texts):
+    """
+    Embedding review melalui cache di disk (kunci: hash isi teks).
+    Hanya teks yang belum pernah dianalisis yang di-encode, lewat worker inference bersama.
+    """
+    embeddings = load_embedding_cache().get_or_compute(list(texts), load_inference_service().encode)
+    return torch.from_numpy(embeddings).to(_category_embeddings().device)
+
+
+def _word_embeddings(words):
+    """Embedding kata dari VOCAB_TABLE (lookup); kata baru di-encode sekali lalu disimpan permanen."""
+    vocab_table = load_vocabulary_table()
+    rows = vocab_table.rows_for(words, load_inference_service().encode)
+    return torch.from_numpy(vocab_table.vectors[rows])
+
+
 # --- FUNGSI BARU UNTUK MENGEKSTRAK ALASAN (KEY TOKENS) ---
 # @st.cache_data
 def extract_key_tokens(text, target_category, n_tokens=4):
     """
     Mengekstrak N token kunci dari teks yang paling berkontribusi pada kesamaan dengan kategori target.
     Ini bekerja dengan membandingkan embedding setiap token dengan embedding kategori target.
+    Embedding kata diambil dari VOCAB_TABLE (lookup), model hanya dipanggil untuk kata baru.
     """
     if not text:
         return "Teks kosong."
 
     # 1. Tokenisasi dan Embed Setiap Kata
-    # Lakukan pembersihan teks dasar sebelum tokenisasi
-    cleaned_text = re.sub(r"[^a-z0-9\s]", "", text.lower())
-    words = [w for w in cleaned_text.split() if w not in stop_words and w]
+    words = _tokenize_words(text)
 
     if not words:
         return "Kata kunci dibersihkan atau terlalu singkat."
 
-    # Embed setiap kata
-    # Model ini menerima list of strings dan mengembalikan tensor (Jumlah Kata) x (Dimensi Embedding)
+    # Ambil embedding setiap kata dari tabel kosakata: tensor (Jumlah Kata) x (Dimensi Embedding)
     try:
-        word_embeddings = MODEL.encode(words, convert_to_tensor=True)
+        word_embeddings = _word_embeddings(words)
     except Exception:
         return "Error saat menghitung embedding kata."
 
@@ -62,7 +367,7 @@ def extract_key_tokens(text, target_category, n_tokens=4):
     except ValueError:
         return "Kategori tidak ditemukan."
         
-    category_embedding = CATEGORY_EMBEDDINGS[category_index]
+    category_embedding = _category_embeddings()[category_index].cpu()
 
     # 3. Hitung Kesamaan Kosinus antara Setiap Kata dan Kategori
     # category_embedding perlu di-transpose untuk perkalian matriks (1D ke 2D/kolom)
@@ -79,19 +384,12 @@ def extract_key_tokens(text, target_category, n_tokens=4):
     return ", ".join(key_tokens)
 # --------------------------------------------------------
 
-# @st.cache_data
-def get_validation_details(review_text: str, category_ai: str, score: float, key_tokens_str: str) -> dict:
+def _validation_base(review_text, category_ai, score, key_tokens_str):
     """
-    Finds the specific policy reason from CATEGORY_DEFINITIONS and extracts the contextual sentence.
-    
-    Args:
-        review_text: The complete review text.
-        category_ai: The category predicted by the AI (e.g., "Profanity").
-        score: The confidence score (0-100).
-        key_tokens_str: The comma-separated string of trigger keywords (from extract_key_tokens).
+    Step 1 of get_validation_details (short-review handling and input checks).
 
     Returns:
-        Dict with 'PolicyReason', 'ContextSentence', and 'KeyConcepts' (str).
+        (result dict, list of key tokens if a context sentence and policy definition still have to be found, else None)
     """
     # Convert token string to list
     key_tokens = [token.strip() for token in key_tokens_str.split(',') if token.strip()]
@@ -107,81 +405,584 @@ def get_validation_details(review_text: str, category_ai: str, score: float, key
         result['PolicyReason'] = "**Input text is missing or too short (No Text/Short Review).**"
         result['ContextSentence'] = "*The classification is based on the absence of substantive content.*"
         result['KeyConcepts'] = "N/A"
-        return result
+        return result, None
     
     # Check for general errors/empty inputs
     if not review_text or not key_tokens or category_ai not in CATEGORY_DEFINITIONS:
-        return result
+        return result, None
 
-    # 2. Find the Most Relevant Contextual Sentence
-    # Combine all trigger tokens into a regex pattern (case-insensitive, bounded)
-    token_pattern = "|".join(r"\b" + re.escape(token) + r"\b" for token in key_tokens)
-    
-    # Split the review into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', review_text) 
-    
-    context_sentence = ""
-    for sentence in sentences:
-        if re.search(token_pattern, sentence, re.IGNORECASE):
-            # Highlight the keywords in the contextual sentence
-            context_sentence = re.sub(
-                r'(' + token_pattern + r')', 
-                r'**\1**', 
-                sentence, 
-                flags=re.IGNORECASE
-            )
-            break
-            
-    if context_sentence:
-        result['ContextSentence'] = context_sentence
-    else:
-        # If no sentence is found, use the full text and highlight tokens
-        result['ContextSentence'] = re.sub(
-            r'(' + token_pattern + r')', 
-            r'**\1**', 
-            review_text, 
-            flags=re.IGNORECASE
-        )
-        
-    # 3. Find the Most Relevant Policy Definition using Semantic Similarity
-    
-    definitions = CATEGORY_DEFINITIONS[category_ai]
-    definition_embeddings = MODEL.encode(definitions, convert_to_tensor=True)
-    query_embedding = MODEL.encode(review_text, convert_to_tensor=True)
+    return result, key_tokens
 
-    # Calculate cosine similarity
-    sim_scores = util.cos_sim(query_embedding, definition_embeddings).flatten()
-    
-    best_def_idx = sim_scores.argmax().item()
-    best_definition = definitions[best_def_idx]
+
+# Sentence splitter, compiled once for all reviews
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+
+def _highlight_pattern(key_tokens):
+    """One precompiled, case-insensitive pattern per review matching any of its key tokens (whole words)."""
+    # Longest tokens first so multi-word matches (e.g. phone numbers) are not cut by shorter tokens
+    tokens = sorted(dict.fromkeys(key_tokens), key=len, reverse=True)
+    return re.compile("(" + "|".join(r"\b" + re.escape(token) + r"\b" for token in tokens) + ")", re.IGNORECASE)
+
+
+def extract_context_sentences(texts, categories, key_token_lists, semantic_mask):
+    """
+    Batched contextual-sentence extraction (step 2 of get_validation_details).
+
+    Every review is split into sentences once. For reviews in semantic_mask with more than one sentence,
+    all sentences are encoded in ONE batch (through the embedding cache) and the sentence most similar
+    to the predicted category is chosen with a single segmented argmax. Other reviews (e.g. decided by
+    the lexicon pre-filter) use the first sentence that contains a key token.
+    Key tokens are highlighted with one precompiled pattern per review.
+
+    Returns:
+        List of highlighted context sentences (same order as texts).
+    """
+    sentences = [[s for s in SENTENCE_SPLIT_PATTERN.split(text) if s.strip()] or [text] for text in texts]
+    patterns = [_highlight_pattern(tokens) for tokens in key_token_lists]
+    chosen = [None] * len(texts)
+
+    semantic_positions = [i for i, use in enumerate(semantic_mask) if use and len(sentences[i]) > 1]
+    if semantic_positions:
+        counts = [len(sentences[i]) for i in semantic_positions]
+        flat_sentences = [s for i in semantic_positions for s in sentences[i]]
+        segment_ids = np.repeat(np.arange(len(semantic_positions)), counts)
+        segment_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        sentence_embeddings = _encode_texts(flat_sentences).cpu().numpy()
+        sentence_embeddings /= np.clip(np.linalg.norm(sentence_embeddings, axis=1, keepdims=True), 1e-12, None)
+        category_embeddings = _category_embeddings().cpu().numpy()
+        category_embeddings = category_embeddings / np.clip(np.linalg.norm(category_embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        # Cosine of every sentence against ITS review's predicted category
+        sentence_category = np.array([REPORT_CATEGORIES.index(categories[i]) for i in semantic_positions])[segment_ids]
+        sims = np.einsum("nd,nd->n", sentence_embeddings, category_embeddings[sentence_category])
+
+        # Segmented argmax: sort by (review, -similarity) and take the first row of each segment
+        order = np.lexsort((-sims, segment_ids))
+        best_rows = order[np.searchsorted(segment_ids[order], np.arange(len(semantic_positions)))]
+        for seg, best_row in enumerate(best_rows.tolist()):
+            i = semantic_positions[seg]
+            chosen[i] = sentences[i][best_row - segment_starts[seg]]
+
+    contexts = []
+    for i, text in enumerate(texts):
+        sentence = chosen[i]
+        if sentence is None:
+            sentence = next((s for s in sentences[i] if patterns[i].search(s)), None)
+            if sentence is None:
+                # If no sentence contains a token, use the full text
+                sentence = text
+        contexts.append(patterns[i].sub(r'**\1**', sentence))
+    return contexts
+
+
+# @st.cache_data
+def get_validation_details(review_text: str, category_ai: str, score: float, key_tokens_str: str, review_embedding=None) -> dict:
+    """
+    Finds the specific policy reason from CATEGORY_DEFINITIONS and extracts the contextual sentence.
+    Single-review form of get_validation_details_batch.
     
-    # Construct the policy reason
-    result['PolicyReason'] = (
-        f"Violates definition: **'{best_definition}'**."
+    Args:
+        review_text: The complete review text.
+        category_ai: The category predicted by the AI (e.g., "Profanity").
+        score: The confidence score (0-100).
+        key_tokens_str: The comma-separated string of trigger keywords (from extract_key_tokens).
+        review_embedding: Optional precomputed embedding of review_text (read from the cache otherwise).
+
+    Returns:
+        Dict with 'PolicyReason', 'ContextSentence', and 'KeyConcepts' (str).
+    """
+    row = pd.DataFrame({
+        "Review Text": [review_text],
+        AI_CATEGORY_COL: [category_ai],
+        AI_SCORE_COL: [score],
+        AI_TOKENS_COL: [key_tokens_str],
+    })
+    embeddings = None if review_embedding is None else review_embedding.reshape(1, -1)
+    details = get_validation_details_batch(row, review_embeddings=embeddings).iloc[0]
+    return {
+        "PolicyReason": details[AI_POLICY_COL],
+        "ContextSentence": details[AI_CONTEXT_COL],
+        "KeyConcepts": details[AI_CONCEPTS_COL],
+    }
+
+
+def _lexicon_definition(review_text, category_ai):
+    """Definisi kebijakan dari pre-filter lexicon jika kategori lexicon sama dengan kategori akhir model."""
+    match = load_lexicon_prefilter().match(review_text, record=False)
+    if match is None or match.category != category_ai:
+        return None
+    return CATEGORY_DEFINITIONS[category_ai][match.definition_index]
+
+
+def best_policy_definitions(review_embeddings, categories):
+    """
+    Batched policy-definition matching: one similarity matrix (reviews x all definitions),
+    columns outside each review's category are masked, then a row-wise argmax.
+
+    Returns:
+        List with the best definition text per review (None if the category has no definitions).
+    """
+    if len(categories) == 0:
+        return []
+
+    definition_embeddings, definition_texts, definition_offsets = load_definition_prototypes()
+    definition_category = torch.full((len(definition_texts),), -1, dtype=torch.long)
+    for category_idx, category in enumerate(REPORT_CATEGORIES):
+        start, end = definition_offsets[category]
+        definition_category[start:end] = category_idx
+
+    review_category = torch.tensor(
+        [REPORT_CATEGORIES.index(c) if c in REPORT_CATEGORIES else -2 for c in categories],
+        dtype=torch.long
     )
-    
-    return result
 
-def classify_report_category(review_text):
-    """Mengklasifikasikan teks review ke salah satu kategori report dan mengembalikan alasannya."""
+    sim_scores = util.cos_sim(review_embeddings, definition_embeddings).cpu()
+    sim_scores = sim_scores.masked_fill(
+        definition_category.unsqueeze(0) != review_category.unsqueeze(1), float("-inf")
+    )
+    best_idx = sim_scores.argmax(dim=1).tolist()
+    has_definition = torch.isfinite(sim_scores.max(dim=1).values).tolist()
+
+    return [definition_texts[i] if ok else None for i, ok in zip(best_idx, has_definition)]
+
+
+def get_validation_details_batch(reviews, review_embeddings=None):
+    """
+    Batched get_validation_details for a whole analysed DataFrame (needs the AI category/score/token columns).
+    Context sentences are extracted in one batch (extract_context_sentences) and policy definitions
+    for all rows are matched in one pass against the prototype matrix.
+
+    Returns:
+        DataFrame with AI_POLICY_COL, AI_CONTEXT_COL and AI_CONCEPTS_COL, same index as the input.
+    """
+    texts = [t if isinstance(t, str) else "" for t in reviews["Review Text"].tolist()]
+    categories = reviews[AI_CATEGORY_COL].tolist()
+    scores = reviews[AI_SCORE_COL].tolist()
+    tokens = reviews[AI_TOKENS_COL].tolist()
+    stages = reviews[AI_STAGE_COL].tolist() if AI_STAGE_COL in reviews.columns else [None] * len(texts)
+
+    results = []
+    policy_positions = []
+    context_positions, context_tokens, context_semantic = [], [], []
+    for pos, (text, category, score, key_tokens_str, stage) in enumerate(zip(texts, categories, scores, tokens, stages)):
+        result, key_tokens = _validation_base(text, category, score, key_tokens_str)
+        results.append(result)
+        if key_tokens is None:
+            continue
+        # Review yang kategorinya dari prior lexicon tidak perlu embedding untuk alasan kebijakan maupun kalimat konteksnya
+        # (stage tidak diketahui, misal dari get_validation_details: cek ulang ke pre-filter)
+        lexicon_definition = _lexicon_definition(text, category) if stage in (STAGE_LEXICON, STAGE_LEXICON_PRIOR, None) else None
+        if lexicon_definition:
+            result['PolicyReason'] = f"Violates definition: **'{lexicon_definition}'**."
+        else:
+            policy_positions.append(pos)
+        context_positions.append(pos)
+        context_tokens.append(key_tokens)
+        context_semantic.append(lexicon_definition is None)
+
+    # 2. Contextual sentences for all rows in one batch
+    if context_positions:
+        contexts = extract_context_sentences(
+            [texts[pos] for pos in context_positions],
+            [categories[pos] for pos in context_positions],
+            context_tokens,
+            context_semantic,
+        )
+        for pos, context in zip(context_positions, contexts):
+            results[pos]['ContextSentence'] = context
+
+    if policy_positions:
+        if review_embeddings is None:
+            embeddings = _encode_texts([texts[pos] for pos in policy_positions])
+        else:
+            embeddings = review_embeddings[policy_positions]
+        best_definitions = best_policy_definitions(embeddings, [categories[pos] for pos in policy_positions])
+        for pos, best_definition in zip(policy_positions, best_definitions):
+            if best_definition:
+                results[pos]['PolicyReason'] = f"Violates definition: **'{best_definition}'**."
+
+    return pd.DataFrame({
+        AI_POLICY_COL: [r['PolicyReason'] for r in results],
+        AI_CONTEXT_COL: [r['ContextSentence'] for r in results],
+        AI_CONCEPTS_COL: [r['KeyConcepts'] for r in results],
+    }, index=reviews.index)
+
+def classify_report_category(review_text, return_stage=False):
+    """
+    Mengklasifikasikan teks review ke salah satu kategori report dan mengembalikan alasannya.
+    Cascade: teks pendek -> pre-filter lexicon/regex (kecocokan kuat, tanpa model) -> model semantik,
+    dengan prior dari kecocokan lexicon yang lemah.
+    Dengan return_stage=True, tahap yang memutuskan (STAGE_*) ikut dikembalikan sebagai nilai ke-4.
+    """
     if not review_text or len(review_text.strip()) < 3:
         # Mengembalikan 3 nilai: Kategori, Skor, Alasan
-        return "Off topic", 100.0, "comments are too short or there are no comments."
+        result = ("Off topic", 100.0, SHORT_TEXT_REASON)
+        return result + (STAGE_SHORT_TEXT,) if return_stage else result
 
-    text_embedding = MODEL.encode(review_text, convert_to_tensor=True)
+    match = load_lexicon_prefilter().match(review_text)
+    if match is not None and match.settled:
+        result = (match.category, 100.0, ", ".join(match.tokens[:4]))
+        return result + (STAGE_LEXICON,) if return_stage else result
+
+    text_embedding = _encode_texts([review_text])[0]
     # Gunakan util.cos_sim untuk menghitung kesamaan
-    cosine_scores = util.cos_sim(text_embedding, CATEGORY_EMBEDDINGS)
-    best_idx = cosine_scores.argmax().item()
-    best_score = cosine_scores[0][best_idx].item()
+    cosine_scores = util.cos_sim(text_embedding, _category_embeddings())[0].cpu().numpy().astype(np.float64) * 100
+    _apply_lexicon_prior(cosine_scores, match)
+    best_idx = int(cosine_scores.argmax())
+    best_score = cosine_scores[best_idx]
     
     predicted_category = REPORT_CATEGORIES[best_idx]
     
     # --- Tambahkan Alasan ---
     # Panggil fungsi baru untuk mendapatkan kata-kata kunci
     reason_tokens = extract_key_tokens(review_text, predicted_category, n_tokens=4)
+    stage = STAGE_MODEL
+    if match is not None and match.category == predicted_category:
+        reason_tokens = _merge_lexicon_tokens(match, reason_tokens, n_tokens=4)
+        stage = STAGE_LEXICON_PRIOR
 
     # FUNGSI KINI MENGEMBALIKAN 3 NILAI: Kategori, Skor, Alasan (Tokens)
-    return predicted_category, round(best_score * 100, 2), reason_tokens 
+    result = (predicted_category, round(float(best_score), 2), reason_tokens)
+    return result + (stage,) if return_stage else result
+
+
+def _apply_lexicon_prior(scores, match):
+    """Menambahkan LEXICON_PRIOR_POINTS (in place, maks. 100) ke skor kategori yang cocok dengan lexicon."""
+    if match is not None:
+        idx = REPORT_CATEGORIES.index(match.category)
+        scores[..., idx] = np.minimum(scores[..., idx] + LEXICON_PRIOR_POINTS, 100.0)
+    return scores
+
+
+def _merge_lexicon_tokens(match, key_tokens_str, n_tokens=4):
+    """Token yang cocok dengan lexicon ditampilkan lebih dulu, sisanya diisi key token dari model."""
+    tokens = list(match.tokens) + [t for t in key_tokens_str.split(", ") if t and t not in match.tokens]
+    return ", ".join(tokens[:n_tokens])
+
+
+def _extract_key_tokens_batch(word_lists, category_indices, n_tokens=4):
+    """
+    Versi batch dari extract_key_tokens untuk banyak review sekaligus.
+    Semua kata unik diambil dari VOCAB_TABLE (kata baru di-encode dalam satu panggilan), lalu skor
+    kata vs kategori target diambil dengan gather + topk pada matriks (Jumlah Review) x (Jumlah Kata Terpanjang).
+    """
+    empty_message = "Kata kunci dibersihkan atau terlalu singkat."
+    if not word_lists:
+        return []
+
+    vocab = {}
+    for words in word_lists:
+        for w in words:
+            vocab.setdefault(w, len(vocab))
+
+    if not vocab:
+        return [empty_message] * len(word_lists)
+
+    word_embeddings = _word_embeddings(list(vocab))
+    # Skor setiap kata unik terhadap setiap kategori: (Jumlah Kata Unik) x (Jumlah Kategori)
+    vocab_scores = torch.matmul(word_embeddings, _category_embeddings().cpu().T)
+
+    # Matriks indeks kata per review, di-padding dengan -1
+    max_len = max(len(words) for words in word_lists)
+    index_matrix = torch.full((len(word_lists), max_len), -1, dtype=torch.long)
+    for row, words in enumerate(word_lists):
+        if words:
+            index_matrix[row, :len(words)] = torch.tensor([vocab[w] for w in words])
+
+    category_index = torch.tensor(category_indices, dtype=torch.long).unsqueeze(1)
+    word_scores = vocab_scores[index_matrix.clamp(min=0), category_index]
+    word_scores = word_scores.masked_fill(index_matrix < 0, float("-inf"))
+
+    top_indices = torch.topk(word_scores, k=min(n_tokens, max_len), dim=1).indices.tolist()
+
+    results = []
+    for words, top in zip(word_lists, top_indices):
+        if not words:
+            results.append(empty_message)
+            continue
+        key_tokens = [words[i] for i in top[:min(n_tokens, len(words))]]
+        results.append(", ".join(key_tokens))
+    return results
+
+
+def classify_reviews_batch(reviews, n_tokens=4):
+    """
+    Mengklasifikasikan banyak review sekaligus (versi batch dari classify_report_category).
+
+    Args:
+        reviews: DataFrame hasil scraping (memakai kolom 'Review Text') atau list teks.
+        n_tokens: Jumlah key tokens per review.
+
+    Returns:
+        DataFrame dengan kolom kategori, skor 0-100, key tokens, tahap cascade (AI_STAGE_COL) dan
+        skor per kategori (AI_CATEGORY_SCORE_COLUMNS, float32), dengan index yang sama seperti input.
+        Review dengan kecocokan lexicon kuat diputuskan tanpa model (skor 100, tidak di-encode);
+        kecocokan lemah hanya menambah prior LEXICON_PRIOR_POINTS pada skor kategori tersebut.
+    """
+    if isinstance(reviews, pd.DataFrame):
+        index = reviews.index
+        texts = reviews["Review Text"].tolist() if "Review Text" in reviews.columns else [""] * len(reviews)
+    else:
+        texts = list(reviews)
+        index = pd.RangeIndex(len(texts))
+
+    texts = [t if isinstance(t, str) else "" for t in texts]
+
+    # Default: teks kosong / terlalu pendek -> Off topic 100% (sama seperti classify_report_category)
+    result = pd.DataFrame({
+        AI_CATEGORY_COL: ["Off topic"] * len(texts),
+        AI_SCORE_COL: [100.0] * len(texts),
+        AI_TOKENS_COL: [SHORT_TEXT_REASON] * len(texts),
+        AI_STAGE_COL: [STAGE_SHORT_TEXT] * len(texts),
+    }, index=index)
+    category_scores = np.zeros((len(texts), len(REPORT_CATEGORIES)), dtype=np.float32)
+    category_scores[:, REPORT_CATEGORIES.index("Off topic")] = 100.0
+
+    valid_positions = [i for i, t in enumerate(texts) if len(t.strip()) >= 3]
+    if not valid_positions:
+        return result.join(_category_score_frame(category_scores, index))
+
+    # Tahap 1: pre-filter lexicon/regex. Kecocokan kuat diputuskan di sini tanpa encode,
+    # kecocokan lemah diteruskan ke model sebagai prior
+    prefilter = load_lexicon_prefilter()
+    model_positions, matches = [], []
+    for i in valid_positions:
+        match = prefilter.match(texts[i])
+        if match is not None and match.settled:
+            result.iloc[i] = [match.category, 100.0, ", ".join(match.tokens[:n_tokens]), STAGE_LEXICON]
+            category_scores[i] = 0.0
+            category_scores[i, REPORT_CATEGORIES.index(match.category)] = 100.0
+        else:
+            model_positions.append(i)
+            matches.append(match)
+
+    valid_positions = model_positions
+    if not valid_positions:
+        return result.join(_category_score_frame(category_scores, index))
+
+    valid_texts = [texts[i] for i in valid_positions]
+    embeddings = _encode_texts(valid_texts)
+
+    # Satu matriks cosine similarity: (Jumlah Review) x (Jumlah Kategori)
+    cosine_scores = util.cos_sim(embeddings, _category_embeddings()).cpu().numpy().astype(np.float64) * 100
+    for row, match in enumerate(matches):
+        _apply_lexicon_prior(cosine_scores[row], match)
+    best_idx = cosine_scores.argmax(axis=1)
+    best_scores = np.round(cosine_scores[np.arange(len(best_idx)), best_idx], 2)
+    category_scores[valid_positions] = cosine_scores.astype(np.float32)
+
+    categories = np.array(REPORT_CATEGORIES, dtype=object)[best_idx]
+    key_tokens = _extract_key_tokens_batch(
+        [_tokenize_words(t) for t in valid_texts], best_idx.tolist(), n_tokens=n_tokens
+    )
+    stages = [STAGE_MODEL] * len(valid_texts)
+    for row, match in enumerate(matches):
+        if match is not None and match.category == categories[row]:
+            key_tokens[row] = _merge_lexicon_tokens(match, key_tokens[row], n_tokens=n_tokens)
+            stages[row] = STAGE_LEXICON_PRIOR
+
+    result.iloc[valid_positions, result.columns.get_loc(AI_CATEGORY_COL)] = categories
+    result.iloc[valid_positions, result.columns.get_loc(AI_SCORE_COL)] = best_scores
+    result.iloc[valid_positions, result.columns.get_loc(AI_TOKENS_COL)] = key_tokens
+    result.iloc[valid_positions, result.columns.get_loc(AI_STAGE_COL)] = stages
+    return result.join(_category_score_frame(category_scores, index))
+
+
+def _category_score_frame(category_scores, index):
+    """Matriks skor (N x kategori) -> DataFrame kolom AI_CATEGORY_SCORE_COLUMNS bertipe float32."""
+    return pd.DataFrame(np.asarray(category_scores, dtype=np.float32), columns=AI_CATEGORY_SCORE_COLUMNS, index=index)
+
+
+def category_score_matrix(df):
+    """Matriks skor per kategori (N x len(REPORT_CATEGORIES), float32) dari kolom yang tersimpan."""
+    return df[AI_CATEGORY_SCORE_COLUMNS].to_numpy(dtype=np.float32)
+
+
+def mask_any_category_above(df, threshold, categories=None):
+    """
+    Mask boolean (vektorisasi, tanpa model): review dengan skor > threshold di salah satu kategori.
+    categories membatasi kategori yang diperiksa (default: semua).
+    Review teks pendek (STAGE_SHORT_TEXT, "Off topic" 100 tanpa penilaian model) tidak ikut.
+    """
+    scores = category_score_matrix(df)
+    if categories:
+        scores = scores[:, [REPORT_CATEGORIES.index(c) for c in categories]]
+    return (scores > threshold).any(axis=1) & ~_short_text_mask(df)
+
+
+def _short_text_mask(df):
+    """Review yang tidak dinilai karena teksnya kosong / terlalu pendek (dari kolom tahap, atau alasan untuk data lama)."""
+    if AI_STAGE_COL in df.columns:
+        return (df[AI_STAGE_COL] == STAGE_SHORT_TEXT).to_numpy()
+    if AI_TOKENS_COL in df.columns:
+        return (df[AI_TOKENS_COL] == SHORT_TEXT_REASON).to_numpy()
+    return np.zeros(len(df), dtype=bool)
+
+
+def top2_margins(df):
+    """Selisih skor kategori teratas dan kedua (0-100) per review; kecil = model ragu antara dua kategori."""
+    scores = category_score_matrix(df)
+    if scores.shape[1] < 2:
+        return np.full(len(scores), np.inf, dtype=np.float32)
+    top2 = -np.partition(-scores, 1, axis=1)[:, :2]
+    return top2[:, 0] - top2[:, 1]
+
+
+def mask_top2_margin_below(df, margin):
+    """Mask boolean (vektorisasi, tanpa model): review dengan margin top-2 < margin."""
+    return top2_margins(df) < margin
+
+
+def analysis_fingerprint(n_tokens=4):
+    """Sidik jari model + versi analysis (hasil tersimpan hanya dipakai jika fingerprint-nya sama)."""
+    payload = json.dumps({
+        "model": SEMANTIC_MODEL_NAME,
+        "backend": SEMANTIC_BACKEND,
+        "version": ANALYSIS_VERSION,
+        "n_tokens": n_tokens,
+        "categories": REPORT_CATEGORIES,
+        "definitions": CATEGORY_DEFINITIONS,
+        "lexicon": LEXICON_RULES,
+        "lexicon_prior": LEXICON_PRIOR_POINTS,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def review_text_hash(text):
+    """Hash isi teks review (untuk mendeteksi review yang teksnya berubah)."""
+    return hashlib.sha1((text if isinstance(text, str) else "").encode("utf-8")).hexdigest()
+
+
+def _analyze_reviews(df, n_tokens=4):
+    """Menghitung semua kolom ANALYSIS_COLUMNS untuk DataFrame (tanpa AnalysisStore)."""
+    analyzed = df.join(classify_reviews_batch(df, n_tokens=n_tokens))
+    return analyzed.join(get_validation_details_batch(analyzed))[ANALYSIS_COLUMNS]
+
+
+def annotate_reviews_dataframe(df, n_tokens=4, use_store=True):
+    """
+    Mengisi kolom analisis AI (kategori, skor, key tokens, alasan kebijakan, kalimat konteks)
+    untuk seluruh DataFrame dalam satu kali proses.
+
+    Hasil diambil (bulk) dari AnalysisStore berdasarkan generate_review_key + fingerprint model;
+    hanya review yang belum pernah dianalisis atau teksnya berubah yang dihitung ulang.
+    """
+    annotated = df.drop(columns=[c for c in ANALYSIS_COLUMNS if c in df.columns])
+    if annotated.empty:
+        for col in AI_COLUMNS:
+            annotated[col] = pd.Series(dtype=object)
+        for col in AI_CATEGORY_SCORE_COLUMNS:
+            annotated[col] = pd.Series(dtype=np.float32)
+        return annotated
+
+    if not use_store:
+        return annotated.join(_analyze_reviews(annotated, n_tokens=n_tokens))
+
+    store = load_analysis_store()
+    fingerprint = analysis_fingerprint(n_tokens)
+    review_keys = [generate_review_key(row) for row in annotated.to_dict("records")]
+    text_hashes = [review_text_hash(t) for t in annotated["Review Text"].tolist()]
+    stored = store.get_many(review_keys, fingerprint)
+
+    results = pd.DataFrame(index=annotated.index, columns=AI_COLUMNS, dtype=object)
+    category_scores = np.zeros((len(annotated), len(REPORT_CATEGORIES)), dtype=np.float32)
+    stale_positions = []
+    for pos, (key, text_hash) in enumerate(zip(review_keys, text_hashes)):
+        record = stored.get(key)
+        if record is None or record["text_hash"] != text_hash:
+            stale_positions.append(pos)
+            continue
+        results.iloc[pos] = [record[_STORE_FIELDS[col]] for col in AI_COLUMNS]
+        category_scores[pos] = np.frombuffer(record["category_scores"], dtype=np.float32)
+
+    if stale_positions:
+        computed = _analyze_reviews(annotated.iloc[stale_positions], n_tokens=n_tokens)
+        computed_scores = category_score_matrix(computed)
+        results.iloc[stale_positions] = computed[AI_COLUMNS].to_numpy(dtype=object)
+        category_scores[stale_positions] = computed_scores
+        store.put_many([
+            {
+                "review_key": review_keys[pos],
+                "text_hash": text_hashes[pos],
+                **{_STORE_FIELDS[col]: value for col, value in zip(AI_COLUMNS, values)},
+                "category_scores": scores.tobytes(),
+            }
+            for pos, values, scores in zip(
+                stale_positions, computed[AI_COLUMNS].itertuples(index=False, name=None), computed_scores
+            )
+        ], fingerprint)
+
+    results[AI_SCORE_COL] = results[AI_SCORE_COL].astype(float)
+    return annotated.join(results).join(_category_score_frame(category_scores, annotated.index))
+
+
+# Kolom hasil deteksi near-duplicate (dihitung per dataset, bukan per review)
+DUPLICATE_CLUSTER_COL = "Duplicate Cluster"
+DUPLICATE_SIZE_COL = "Duplicate Group Size"
+
+
+def flag_near_duplicates(df, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Menandai kelompok review yang hampir identik (misal kampanye "Conflict of interest" / review bombing).
+    Embedding diambil dari cache; pencarian pasangan memakai LSH blocking (lihat near_duplicates.py).
+
+    Menambahkan DUPLICATE_CLUSTER_COL (-1 = bukan duplikat) dan DUPLICATE_SIZE_COL.
+    """
+    flagged = df.drop(columns=[c for c in (DUPLICATE_CLUSTER_COL, DUPLICATE_SIZE_COL) if c in df.columns])
+    cluster_ids = np.full(len(flagged), -1, dtype=np.int64)
+    cluster_sizes = np.ones(len(flagged), dtype=np.int64)
+
+    texts = flagged["Review Text"].fillna("").astype(str).tolist() if not flagged.empty else []
+    # Review tanpa teks tidak ikut dikelompokkan (semua ulasan kosong akan terlihat "identik")
+    positions = [i for i, t in enumerate(texts) if len(t.strip()) >= 3]
+    if len(positions) >= 2:
+        embeddings = _encode_texts([texts[i] for i in positions]).cpu().numpy()
+        ids, sizes = cluster_near_duplicates(embeddings, threshold=threshold)
+        cluster_ids[positions] = ids
+        cluster_sizes[positions] = sizes
+
+    flagged[DUPLICATE_CLUSTER_COL] = cluster_ids
+    flagged[DUPLICATE_SIZE_COL] = cluster_sizes
+    return flagged
+
+
+def build_search_index(df):
+    """
+    Index pencarian semantik untuk review di df, dari embedding yang sudah ada di cache
+    (korpus tidak di-encode ulang). Label hasil pencarian = index DataFrame.
+    """
+    texts = df["Review Text"].fillna("").astype(str).tolist() if not df.empty else []
+    labels = [label for label, t in zip(df.index, texts) if len(t.strip()) >= 3]
+    if labels:
+        embeddings = _encode_texts([t for t in texts if len(t.strip()) >= 3]).cpu().numpy()
+    else:
+        embeddings = np.zeros((0, SEMANTIC_EMBEDDING_DIM), dtype=np.float32)
+    return ReviewSearchIndex(embeddings, labels=labels, ann_threshold=SEARCH_ANN_THRESHOLD)
+
+
+def search_reviews(index, query, k=20):
+    """
+    Top-k review yang paling mirip dengan query (misal "rude security guard").
+    Hanya query yang di-encode (satu teks, lewat worker inference).
+
+    Returns:
+        (label index DataFrame, skor similarity 0-100)
+    """
+    if not query or not query.strip() or len(index) == 0:
+        return [], []
+    query_embedding = load_inference_service().encode([query.strip()])[0]
+    labels, scores = index.search(query_embedding, k=k)
+    return labels.tolist(), np.round(scores.astype(np.float64) * 100, 2).tolist()
+
+
+def extract_key_tokens_batch(texts, target_categories, n_tokens=4):
+    """Mode bulk extract_key_tokens: key tokens untuk banyak (teks, kategori target) sekaligus."""
+    category_indices = [
+        REPORT_CATEGORIES.index(c) if c in REPORT_CATEGORIES else 0 for c in target_categories
+    ]
+    return _extract_key_tokens_batch([_tokenize_words(t) for t in texts], category_indices, n_tokens=n_tokens)
 
 
 def clean_review_text_en(text):
@@ -194,6 +995,7 @@ def clean_review_text_en(text):
     # Pertahankan karakter alfanumerik, spasi, koma, titik, tanda tanya, tanda seru, dan apostrof.
     text = re.sub(r"[^a-z0-9\s.,!?']", " ", text)
     words = text.split()
+    stop_words = load_stop_words()
     filtered_words = [w for w in words if w not in stop_words]
     return " ".join(filtered_words).strip()
 
@@ -231,12 +1033,17 @@ def parse_relative_date(text):
 def generate_review_key(row):
 # ... (Fungsi ini tetap sama) ...
     """Membuat kunci unik berdasarkan data ulasan (Composite Key)."""
-    place_key = row.get("Place", "UNKNOWN").replace(' ', '').lower()
-    user_key = row.get("User", "UNKNOWN").replace(' ', '').lower()
-    date_key = row.get("Date (Parsed)", "UNKNOWN").replace('-', '')
+    def _field(name, default):
+        # Nilai kosong (None/NaN, misal tanggal gagal diparse) diperlakukan seperti kolom yang tidak ada
+        value = row.get(name, default)
+        return value if isinstance(value, str) else default
+
+    place_key = _field("Place", "UNKNOWN").replace(' ', '').lower()
+    user_key = _field("User", "UNKNOWN").replace(' ', '').lower()
+    date_key = _field("Date (Parsed)", "UNKNOWN").replace('-', '')
     
     # Gunakan 50 karakter pertama teks ulasan (yang sudah dibersihkan dari non-alphanumeric)
-    text_snippet = re.sub(r'[^a-z0-9]', '', row.get("Review Text", "no_text")[:50].lower())
+    text_snippet = re.sub(r'[^a-z0-9]', '', _field("Review Text", "no_text")[:50].lower())
     
     # Gabungkan semua komponen menjadi satu string unik
     key = f"{place_key}_{user_key}_{date_key}_{text_snippet}"
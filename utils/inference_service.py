@@ -0,0 +1,175 @@
+# utils/inference_service.py
+
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatchEncoder:
+    """
+    Worker inference lokal (background thread + antrean request) yang dipakai bersama oleh semua sesi Streamlit.
+
+    Request encode dari banyak sesi dikumpulkan menjadi satu micro-batch sampai max_batch_size teks
+    atau sampai max_wait_ms sejak request pertama di batch tersebut, lalu di-encode dengan SATU
+    panggilan encode_fn. Request yang lebih besar dari max_batch_size dipecah menjadi chunk dan
+    digilir dengan request lain yang sedang menunggu. Setiap request mendapat Future berisi
+    matriks embedding-nya sendiri (gabungan semua chunk).
+    """
+
+    def __init__(self, encode_fn, max_batch_size=64, max_wait_ms=10, name="micro-batch-encoder"):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+
+        self._queue = queue.Queue()
+        self._active = deque() # _PendingRequest yang masih punya chunk belum di-encode (hanya diakses worker)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "chunks": 0,
+            "texts": 0,
+            "batches": 0,
+            "max_batch_texts": 0,
+            "max_batch_requests": 0,
+            "encode_seconds": 0.0,
+            "errors": 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # --- API Klien ---
+    def submit(self, texts):
+        """Mengirim list teks ke worker; mengembalikan Future -> np.ndarray float32 (N x dim), None jika texts kosong."""
+        future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result(None)
+            return future
+        self._queue.put((texts, future))
+        return future
+
+    def encode(self, texts, timeout=None):
+        """Versi blocking dari submit()."""
+        return self.submit(texts).result(timeout=timeout)
+
+    def stats(self):
+        """Statistik worker: kedalaman antrean dan ukuran batch (teks & chunk request per batch)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mean_batch_texts"] = round(stats["texts"] / batches, 2) if batches else 0.0
+        stats["mean_batch_requests"] = round(stats["chunks"] / batches, 2) if batches else 0.0
+        stats["encode_seconds"] = round(stats["encode_seconds"], 4)
+        return stats
+
+    # --- Worker ---
+    def _admit(self, item):
+        texts, future = item
+        # Request yang dibatalkan sebelum diproses tidak perlu di-encode
+        if future.set_running_or_notify_cancel():
+            self._active.append(_PendingRequest(texts, future))
+            with self._stats_lock:
+                self._stats["requests"] += 1
+
+    def _collect_requests(self):
+        """
+        Tanpa request aktif: tunggu request pertama, lalu kumpulkan request lain sampai max_batch_size teks
+        atau deadline lewat. Dengan request aktif (sisa chunk): ambil request baru yang sudah antre tanpa menunggu.
+        """
+        if not self._active:
+            self._admit(self._queue.get())
+            deadline = time.monotonic() + self.max_wait
+            while sum(r.remaining for r in self._active) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._admit(item)
+            return
+        while True:
+            try:
+                self._admit(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _plan_batch(self):
+        """
+        Jumlah teks yang diambil dari setiap request aktif untuk batch berikutnya (total <= max_batch_size).
+        Setiap request mendapat jatah rata dulu, sisa kapasitas diisi berurutan; request besar dipecah
+        menjadi chunk sehingga request kecil dari sesi lain tidak menunggu di belakangnya.
+        """
+        capacity = self.max_batch_size
+        share = max(1, capacity // len(self._active))
+        takes = []
+        for request in self._active:
+            n = min(request.remaining, share, capacity)
+            takes.append(n)
+            capacity -= n
+        for i, request in enumerate(self._active):
+            if capacity <= 0:
+                break
+            extra = min(request.remaining - takes[i], capacity)
+            takes[i] += extra
+            capacity -= extra
+        return [(request, n) for request, n in zip(self._active, takes) if n]
+
+    def _run(self):
+        while True:
+            self._collect_requests()
+            if not self._active:
+                continue
+
+            plan = self._plan_batch()
+            all_texts = [text for request, n in plan for text in request.texts[request.offset:request.offset + n]]
+            start = time.perf_counter()
+            try:
+                embeddings = np.asarray(self.encode_fn(all_texts), dtype=np.float32)
+            except Exception as e:
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+                for request, _ in plan:
+                    request.future.set_exception(e)
+                    self._active.remove(request)
+                continue
+            elapsed = time.perf_counter() - start
+
+            offset = 0
+            for request, n in plan:
+                request.chunks.append(embeddings[offset:offset + n])
+                request.offset += n
+                offset += n
+                if not request.remaining:
+                    self._active.remove(request)
+                    chunks = request.chunks
+                    request.future.set_result(chunks[0] if len(chunks) == 1 else np.concatenate(chunks))
+            # Giliran berputar agar sisa kapasitas tidak selalu jatuh ke request yang sama
+            self._active.rotate(-1)
+
+            with self._stats_lock:
+                self._stats["chunks"] += len(plan)
+                self._stats["texts"] += len(all_texts)
+                self._stats["batches"] += 1
+                self._stats["max_batch_texts"] = max(self._stats["max_batch_texts"], len(all_texts))
+                self._stats["max_batch_requests"] = max(self._stats["max_batch_requests"], len(plan))
+                self._stats["encode_seconds"] += elapsed
+
+
+class _PendingRequest:
+    """Request yang sedang di-encode per chunk: teks, Future, posisi chunk berikutnya dan hasil per chunk."""
+
+    def __init__(self, texts, future):
+        self.texts = texts
+        self.future = future
+        self.offset = 0
+        self.chunks = []
+
+    @property
+    def remaining(self):
+        return len(self.texts) - self.offset
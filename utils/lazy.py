@@ -0,0 +1,28 @@
+# utils/lazy.py
+
+import importlib
+
+
+class LazyModule:
+    """Proxy modul: modul asli baru di-import saat atributnya pertama kali diakses."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Mengembalikan proxy untuk modul `name` tanpa meng-import-nya sekarang."""
+    return LazyModule(name)
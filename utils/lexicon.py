@@ -0,0 +1,143 @@
+# utils/lexicon.py
+
+import re
+import threading
+from collections import deque, namedtuple
+
+# Hasil pre-filter: kategori yang cocok, token/kutipan yang cocok, indeks definisi kebijakan, dan apakah
+# review diputuskan di sini (settled=True, tanpa model) atau hanya menjadi prior untuk skor model
+LexiconMatch = namedtuple("LexiconMatch", ["category", "tokens", "definition_index", "settled"])
+
+
+class AhoCorasick:
+    """
+    Automaton Aho-Corasick untuk mencari banyak kata/frasa sekaligus dalam satu kali baca teks.
+    Hanya kecocokan utuh (dibatasi karakter non-alfanumerik) yang dilaporkan.
+    """
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for term in dict.fromkeys(t.lower() for t in terms if t):
+            self._add(term)
+        self._build_failure_links()
+
+    def _add(self, term):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append(term)
+
+    def _build_failure_links(self):
+        # BFS: anak langsung root selalu gagal ke root; node lain mengikuti failure link induknya
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find_all(self, text):
+        """Mengembalikan list (term, start, end) untuk setiap kemunculan kata utuh di text (lowercase)."""
+        text = text.lower()
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for term in self._output[state]:
+                start = i - len(term) + 1
+                before_ok = start == 0 or not text[start - 1].isalnum()
+                after_ok = i + 1 == len(text) or not text[i + 1].isalnum()
+                if before_ok and after_ok:
+                    matches.append((term, start, i + 1))
+        return matches
+
+
+class LexiconPrefilter:
+    """
+    Tahap pertama cascade klasifikasi: lexicon (Aho-Corasick) + regex per kategori report.
+
+    Hasilnya hanya dipakai jika tepat SATU kategori memenuhi min_hits-nya. Review diputuskan di tahap ini
+    (tanpa encode) jika ada kecocokan kuat ("terms" / "patterns") atau jumlah kecocokan mencapai
+    settle_min_hits; kecocokan lemah saja ("weak_terms" / "weak_patterns") hanya menjadi prior skor model.
+
+    rules: dict kategori -> {"terms": [...], "weak_terms": [...],
+                             "patterns": [(regex, indeks definisi), ...], "weak_patterns": [...],
+                             "definition": indeks definisi untuk terms, "min_hits": int, "settle_min_hits": int}
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._automata = {
+            (c, tier): AhoCorasick(r[key])
+            for c, r in rules.items() for tier, key in (("strong", "terms"), ("weak", "weak_terms")) if r.get(key)
+        }
+        self._patterns = {
+            (c, tier): [(re.compile(p, re.IGNORECASE), d) for p, d in r.get(key, [])]
+            for c, r in rules.items() for tier, key in (("strong", "patterns"), ("weak", "weak_patterns"))
+        }
+        self._lock = threading.Lock()
+        # settled = review diputuskan tanpa model (encode dilewati); prior = hanya kecocokan lemah
+        self.stats = {"checked": 0, "settled": 0, "prior": 0, "by_category": {c: 0 for c in rules}}
+
+    def _category_hits(self, category, text, tier):
+        """List (token, indeks definisi) yang cocok untuk satu kategori dan tingkat ("strong" / "weak")."""
+        rule = self.rules[category]
+        hits = []
+        automaton = self._automata.get((category, tier))
+        if automaton is not None:
+            hits.extend((term, rule.get("definition", 0)) for term, _, _ in automaton.find_all(text))
+        for pattern, definition_index in self._patterns[(category, tier)]:
+            hits.extend((m.group(0).strip(), definition_index) for m in pattern.finditer(text))
+        return hits
+
+    def match(self, text, record=True):
+        """
+        Mengembalikan LexiconMatch jika tepat satu kategori cocok, None jika tidak ada / ambigu.
+        record=False: tidak dihitung ke statistik hit rate (misal saat mencocokkan ulang untuk alasan kebijakan).
+        """
+        text = text if isinstance(text, str) else ""
+        candidates = []
+        for category, rule in self.rules.items():
+            strong = self._category_hits(category, text, "strong")
+            hits = strong + self._category_hits(category, text, "weak")
+            if len(hits) >= rule.get("min_hits", 1):
+                settled = bool(strong) or len(hits) >= rule.get("settle_min_hits", float("inf"))
+                candidates.append((category, hits, settled))
+
+        # Lebih dari satu kategori cocok = ambigu, biarkan model yang memutuskan
+        match = None
+        if len(candidates) == 1:
+            category, hits, settled = candidates[0]
+            tokens = list(dict.fromkeys(token for token, _ in hits))
+            match = LexiconMatch(category, tokens, hits[0][1], settled)
+
+        if record:
+            with self._lock:
+                self.stats["checked"] += 1
+                if match is not None and match.settled:
+                    self.stats["settled"] += 1
+                    self.stats["by_category"][match.category] += 1
+                elif match is not None:
+                    self.stats["prior"] += 1
+        return match
+
+    def hit_rate(self):
+        """Persentase review yang diputuskan oleh pre-filter (encode model dilewati)."""
+        with self._lock:
+            checked = self.stats["checked"]
+            return round(self.stats["settled"] / checked * 100, 2) if checked else 0.0
@@ -0,0 +1,89 @@
+# utils/near_duplicates.py
+
+import numpy as np
+
+
+def _bucket_runs(codes):
+    """Mengelompokkan indeks baris berdasarkan kode hash; hanya bucket berisi >= 2 baris yang dikembalikan."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(codes)]])
+    return [order[s:e] for s, e in zip(starts, ends) if e - s > 1]
+
+
+def _similar_pairs(embeddings, members, threshold, block_size):
+    """Pasangan (i, j) di dalam satu bucket dengan cosine >= threshold (dihitung per blok matriks)."""
+    vectors = embeddings[members]
+    rows, cols = [], []
+    for start in range(0, len(members), block_size):
+        sims = vectors[start:start + block_size] @ vectors.T
+        r, c = np.nonzero(sims >= threshold)
+        r = r + start
+        keep = r < c
+        rows.append(members[r[keep]])
+        cols.append(members[c[keep]])
+    return rows, cols
+
+
+def cluster_near_duplicates(embeddings, threshold=0.95, n_tables=12, n_bits=12, block_size=1024, seed=0):
+    """
+    Mengelompokkan review yang hampir identik berdasarkan embedding (tanpa perbandingan O(n²) penuh).
+
+    Blocking memakai LSH random-hyperplane (SimHash): setiap tabel meng-hash vektor ke n_bits bit,
+    dan hanya pasangan di bucket yang sama yang diverifikasi dengan cosine sebenarnya. Pasangan yang
+    lolos digabung menjadi komponen terhubung (satu komponen = satu kelompok near-duplicate).
+
+    Args:
+        embeddings: matriks float (N x dim), akan dinormalisasi L2.
+        threshold: cosine minimum agar dua review dianggap near-duplicate.
+
+    Returns:
+        (cluster_ids, cluster_sizes) — np.ndarray int64 sepanjang N. Review tanpa pasangan mendapat
+        cluster_id -1 dan size 1. Cluster diberi nomor 0, 1, ... dari yang terbesar.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    n = len(embeddings)
+    cluster_ids = np.full(n, -1, dtype=np.int64)
+    cluster_sizes = np.ones(n, dtype=np.int64)
+    if n < 2:
+        return cluster_ids, cluster_sizes
+
+    embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+    # Embedding kalimat cenderung menumpuk di satu arah; hash dihitung dari vektor yang sudah
+    # dipusatkan agar bucket tidak didominasi satu kode yang sama
+    centered = embeddings - embeddings.mean(axis=0, keepdims=True)
+
+    rng = np.random.default_rng(seed)
+    bit_weights = (1 << np.arange(n_bits, dtype=np.int64))
+    rows, cols = [], []
+    for _ in range(n_tables):
+        planes = rng.standard_normal((embeddings.shape[1], n_bits)).astype(np.float32)
+        codes = ((centered @ planes) > 0).astype(np.int64) @ bit_weights
+        for members in _bucket_runs(codes):
+            r, c = _similar_pairs(embeddings, members, threshold, block_size)
+            rows.extend(r)
+            cols.extend(c)
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    if len(rows) == 0:
+        return cluster_ids, cluster_sizes
+
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+
+    # Hanya komponen dengan >= 2 anggota yang menjadi cluster; nomor urut dari yang terbesar
+    duplicate_labels = np.flatnonzero(sizes > 1)
+    duplicate_labels = duplicate_labels[np.argsort(-sizes[duplicate_labels], kind="stable")]
+    relabel = np.full(len(sizes), -1, dtype=np.int64)
+    relabel[duplicate_labels] = np.arange(len(duplicate_labels))
+
+    cluster_ids = relabel[labels]
+    cluster_sizes = np.where(cluster_ids >= 0, sizes[labels], 1)
+    return cluster_ids, cluster_sizes
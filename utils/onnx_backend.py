@@ -0,0 +1,196 @@
+# utils/onnx_backend.py
+
+import os
+import json
+import time
+import inspect
+import argparse
+
+import numpy as np
+
+
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+
+def export_quantized_onnx(model_name, output_dir, opset=17):
+    """
+    Mengekspor transformer dari model Sentence Transformer ke ONNX lalu mengkuantisasi bobotnya ke int8.
+    Tokenizer ikut disimpan di output_dir agar backend ONNX tidak butuh PyTorch saat inferensi.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["contoh kalimat", "sample sentence for export"], padding=True, return_tensors="pt")
+    # Urutan input harus mengikuti urutan argumen forward() model (input dikirim secara posisional)
+    forward_args = list(inspect.signature(model.forward).parameters)
+    input_names = sorted(sample.keys(), key=forward_args.index)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(output_dir, ONNX_FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = os.path.join(output_dir, ONNX_INT8_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, "export.json"), "w") as f:
+        json.dump({"model_name": model_name, "opset": opset, "input_names": input_names}, f, indent=4)
+    return int8_path
+
+
+class OnnxSentenceEncoder:
+    """
+    Encoder kalimat berbasis ONNX Runtime (int8) dengan antarmuka encode() yang sama seperti SentenceTransformer.
+    Output: mean pooling atas token (memakai attention mask) lalu dinormalisasi L2, sama seperti pipeline e5.
+    """
+
+    def __init__(self, model_dir, intra_op_threads=0, max_seq_length=512, quantized=True):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = model_dir
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        model_file = ONNX_INT8_FILE if quantized else ONNX_FP32_FILE
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [i.name for i in self.session.get_inputs()]
+        self._dim = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self):
+        return self._dim
+
+    def _encode_batch(self, texts):
+        features = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+        )
+        feeds = {name: features[name].astype(np.int64) for name in self._input_names if name in features}
+        if "token_type_ids" in self._input_names and "token_type_ids" not in feeds:
+            feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling dengan attention mask
+        mask = features["attention_mask"].astype(np.float32)[:, :, None]
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, normalize_embeddings=True, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        if sentences:
+            embeddings = np.concatenate([
+                self._encode_batch(list(sentences[start:start + batch_size]))
+                for start in range(0, len(sentences), batch_size)
+            ]).astype(np.float32)
+        else:
+            embeddings = np.zeros((0, self._dim), dtype=np.float32)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(np.ascontiguousarray(embeddings))
+        return embeddings
+
+
+def measure_backend_agreement(texts, reference_model, candidate_model, categories, batch_size=64):
+    """
+    Membandingkan backend kandidat (ONNX) dengan backend referensi (PyTorch):
+    persentase argmax kategori yang sama, rata-rata cosine antar vektor, dan waktu encode.
+    """
+    def _normalized(model, items):
+        start = time.perf_counter()
+        vectors = np.asarray(model.encode(list(items), batch_size=batch_size, convert_to_tensor=False), dtype=np.float32)
+        elapsed = time.perf_counter() - start
+        return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None), elapsed
+
+    ref_categories, _ = _normalized(reference_model, categories)
+    cand_categories, _ = _normalized(candidate_model, categories)
+    ref_vectors, ref_seconds = _normalized(reference_model, texts)
+    cand_vectors, cand_seconds = _normalized(candidate_model, texts)
+
+    ref_argmax = (ref_vectors @ ref_categories.T).argmax(axis=1)
+    cand_argmax = (cand_vectors @ cand_categories.T).argmax(axis=1)
+
+    return {
+        "n_texts": len(texts),
+        "category_argmax_agreement": float((ref_argmax == cand_argmax).mean()) if len(texts) else None,
+        "mean_vector_cosine": float((ref_vectors * cand_vectors).sum(axis=1).mean()) if len(texts) else None,
+        "reference_seconds": round(ref_seconds, 4),
+        "candidate_seconds": round(cand_seconds, 4),
+    }
+
+
+def _load_texts(path):
+    """Membaca teks review dari file .xlsx/.csv hasil download aplikasi (kolom 'Review Text') atau .txt."""
+    if path.endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    import pandas as pd
+    df = pd.read_excel(path) if path.endswith(".xlsx") else pd.read_csv(path)
+    return [t for t in df["Review Text"].fillna("").astype(str).tolist() if len(t.strip()) >= 3]
+
+
+def main():
+    from utils.constants import (
+        SEMANTIC_MODEL_NAME, ONNX_MODEL_DIR, ONNX_INTRA_OP_THREADS, REPORT_CATEGORIES, CATEGORY_DEFINITIONS
+    )
+
+    parser = argparse.ArgumentParser(description="Export & validasi backend ONNX (int8) untuk model semantik.")
+    parser.add_argument("command", choices=["export", "agreement"])
+    parser.add_argument("--texts", help="File .xlsx/.csv/.txt berisi teks review untuk uji agreement.")
+    parser.add_argument("--output", help="Simpan laporan agreement (JSON) ke file ini.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        path = export_quantized_onnx(SEMANTIC_MODEL_NAME, ONNX_MODEL_DIR)
+        print(f"✅ ONNX int8 model saved to {path}")
+        return
+
+    from sentence_transformers import SentenceTransformer
+    texts = _load_texts(args.texts) if args.texts else [d for defs in CATEGORY_DEFINITIONS.values() for d in defs]
+    report = measure_backend_agreement(
+        texts,
+        SentenceTransformer(SEMANTIC_MODEL_NAME),
+        OnnxSentenceEncoder(ONNX_MODEL_DIR, intra_op_threads=ONNX_INTRA_OP_THREADS),
+        REPORT_CATEGORIES,
+    )
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
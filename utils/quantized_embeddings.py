@@ -0,0 +1,162 @@
+# utils/quantized_embeddings.py
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+class EmbeddingQuantizer:
+    """
+    Format ringkas untuk embedding review: PCA opsional (di-fit pada korpus) lalu kuantisasi skalar int8
+    per dimensi. Satu vektor 384-dim float32 (1536 byte) menjadi code_dim byte (mis. 384 atau 128).
+
+    x (dinormalisasi) -> z = (x - mean) @ components.T -> codes = round(z / scale) dalam [-127, 127]
+    Tanpa PCA, components adalah matriks identitas.
+    """
+
+    VERSION = 1
+
+    def __init__(self, mean, components, scale):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.dim = self.mean.shape[0]
+        self.code_dim = self.components.shape[0]
+
+    @classmethod
+    def fit(cls, vectors, pca_dim=None, clip_percentile=99.9, sample_size=50000, seed=0):
+        """Fit mean, basis PCA (jika pca_dim diisi) dan skala int8 per dimensi pada sampel korpus."""
+        vectors = _normalize(vectors)
+        if len(vectors) > sample_size:
+            vectors = vectors[np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False)]
+        mean = vectors.mean(axis=0)
+        centered = vectors - mean
+
+        if pca_dim and pca_dim < vectors.shape[1]:
+            _, _, vt = np.linalg.svd(centered, full_matrices=False)
+            components = vt[:pca_dim]
+        else:
+            components = np.eye(vectors.shape[1], dtype=np.float32)
+
+        projected = centered @ components.T
+        # Persentil (bukan maksimum) agar beberapa outlier tidak memperlebar langkah kuantisasi semua baris
+        scale = np.percentile(np.abs(projected), clip_percentile, axis=0) / 127.0
+        return cls(mean, components, np.clip(scale, 1e-8, None))
+
+    @property
+    def bytes_per_vector(self):
+        return self.code_dim
+
+    @property
+    def fingerprint(self):
+        digest = hashlib.sha256()
+        for array in (self.mean, self.components, self.scale):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:16]
+
+    def encode(self, vectors):
+        """Embedding (N x dim) -> codes int8 (N x code_dim)."""
+        projected = (_normalize(vectors) - self.mean) @ self.components.T
+        return np.clip(np.rint(projected / self.scale), -127, 127).astype(np.int8)
+
+    def decode(self, codes):
+        """Codes int8 -> rekonstruksi embedding float32 (N x dim), dinormalisasi."""
+        return _normalize(self.mean + (np.asarray(codes, dtype=np.float32) * self.scale) @ self.components)
+
+    def score(self, queries, codes):
+        """
+        Cosine aproksimasi antara query float32 (Q x dim atau dim) dan codes (N x code_dim) tanpa decode:
+        x . q = mean . q + codes @ (scale * (components @ q)). Vektor yang di-encode sudah unit-norm.
+        """
+        queries = _normalize(queries)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+        projected = (queries @ self.components.T) * self.scale
+        scores = np.asarray(codes, dtype=np.float32) @ projected.T + (queries @ self.mean)
+        return scores[:, 0] if single else scores
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, version=self.VERSION, mean=self.mean, components=self.components, scale=self.scale)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memuat quantizer dari file .npz; None jika tidak ada atau versinya berbeda."""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != cls.VERSION:
+                    return None
+                return cls(data["mean"], data["components"], data["scale"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def agreement_report(vectors, category_embeddings, quantizer):
+    """
+    Membandingkan hasil klasifikasi (argmax kategori) dari vektor float32 dengan skor yang dihitung
+    langsung dari codes int8.
+
+    Returns:
+        dict: agreement_pct, mean/max error cosine, byte per vektor dan rasio kompresi.
+    """
+    vectors = _normalize(vectors)
+    categories = _normalize(category_embeddings)
+    exact = vectors @ categories.T
+    approximate = quantizer.score(categories, quantizer.encode(vectors))
+    error = np.abs(exact - approximate)
+    return {
+        "vectors": int(len(vectors)),
+        "code_dim": int(quantizer.code_dim),
+        "agreement_pct": round(float((exact.argmax(axis=1) == approximate.argmax(axis=1)).mean() * 100), 2) if len(vectors) else 100.0,
+        "mean_abs_cosine_error": round(float(error.mean()), 5) if len(vectors) else 0.0,
+        "max_abs_cosine_error": round(float(error.max()), 5) if len(vectors) else 0.0,
+        "bytes_per_vector": int(quantizer.bytes_per_vector),
+        "compression_ratio": round(quantizer.dim * 4 / quantizer.bytes_per_vector, 2),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fit quantizer int8 (+PCA opsional) pada cache embedding review.")
+    parser.add_argument("command", choices=["fit", "report"])
+    parser.add_argument("--pca", type=int, default=0, help="Dimensi PCA (0 = tanpa reduksi).")
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan agreement dalam format JSON.")
+    args = parser.parse_args()
+
+    from utils import helpers
+
+    # Korpus = semua embedding float32 di cache review (format penuh)
+    vectors = helpers.load_full_precision_embeddings()
+    if not len(vectors):
+        print("❌ Embedding cache is empty. Analyse some reviews first.")
+        return
+
+    if args.command == "fit":
+        quantizer = EmbeddingQuantizer.fit(vectors, pca_dim=args.pca or None)
+        quantizer.save(helpers.EMBEDDING_QUANTIZER_FILE)
+        print(f"✅ Quantizer ({quantizer.code_dim} dims, fingerprint {quantizer.fingerprint}) written to {helpers.EMBEDDING_QUANTIZER_FILE}")
+    else:
+        quantizer = EmbeddingQuantizer.load(helpers.EMBEDDING_QUANTIZER_FILE)
+        if quantizer is None:
+            print("❌ No quantizer found. Run: python -m utils.quantized_embeddings fit")
+            return
+
+    report = agreement_report(vectors, helpers._category_embeddings().cpu().numpy(), quantizer)
+    print(json.dumps(report, indent=4))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# utils/search_index.py
+
+import numpy as np
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+def _spherical_kmeans(vectors, n_lists, n_iter=10, sample_size=20000, seed=0):
+    """K-means berbasis cosine (centroid dinormalisasi) yang dilatih pada sampel vektor."""
+    rng = np.random.default_rng(seed)
+    sample = vectors if len(vectors) <= sample_size else vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = (sample @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=n_lists) == 0
+        # List kosong diisi ulang dengan titik acak agar semua list tetap terpakai
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class ReviewSearchIndex:
+    """
+    Index pencarian semantik atas embedding review yang sudah dihitung (tanpa encode ulang korpus).
+
+    - N <= ann_threshold : brute force (satu matmul query x semua review).
+    - N >  ann_threshold : IVF (inverted file) — review dikelompokkan ke n_lists centroid (k-means),
+      query hanya dibandingkan dengan review di n_probe list terdekat.
+    """
+
+    def __init__(self, embeddings, labels=None, ann_threshold=5000, n_lists=None, n_probe=8, seed=0):
+        self.embeddings = _normalize(embeddings)
+        n = len(self.embeddings)
+        self.labels = np.asarray(labels if labels is not None else np.arange(n))
+        self.mode = "brute_force" if n <= ann_threshold else "ivf"
+        self.n_probe = n_probe
+
+        if self.mode == "ivf":
+            n_lists = n_lists or int(np.clip(np.sqrt(n) * 2, 16, 4096))
+            self.centroids = _spherical_kmeans(self.embeddings, n_lists, seed=seed)
+            assignment = (self.embeddings @ self.centroids.T).argmax(axis=1)
+            # Baris diurutkan per list agar setiap list adalah satu potongan kontigu
+            order = np.argsort(assignment, kind="stable")
+            self._list_rows = order
+            self._list_bounds = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def _candidates(self, query):
+        if self.mode == "brute_force":
+            return None
+        probe = np.argsort(-(self.centroids @ query))[:self.n_probe]
+        return np.concatenate([self._list_rows[self._list_bounds[i]:self._list_bounds[i + 1]] for i in probe])
+
+    def search(self, query_embedding, k=10):
+        """
+        Top-k review paling mirip dengan query.
+
+        Returns:
+            (labels, scores) — label baris (mis. index DataFrame) dan cosine similarity, terurut menurun.
+        """
+        if len(self.embeddings) == 0 or k <= 0:
+            return self.labels[:0], np.zeros(0, dtype=np.float32)
+        query = _normalize(query_embedding).reshape(-1)
+
+        rows = self._candidates(query)
+        scores = self.embeddings @ query if rows is None else self.embeddings[rows] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        positions = top if rows is None else rows[top]
+        return self.labels[positions], scores[top]
@@ -0,0 +1,105 @@
+# utils/shared_weights.py
+
+import os
+
+WEIGHTS_FILE = "model_weights.pt"
+
+
+def export_shared_weights(model, path, fingerprint):
+    """
+    Menyimpan state_dict model (beserta fingerprint) ke satu file yang nantinya di-memory-map oleh setiap proses.
+    Ditulis ke file sementara lalu di-rename (atomik), jadi beberapa worker yang mengekspor bersamaan aman.
+    """
+    import torch
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    state_dict = {name: tensor.detach().cpu().contiguous() for name, tensor in model.state_dict().items()}
+    torch.save({"fingerprint": fingerprint, "state_dict": state_dict}, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def attach_shared_weights(model, path, fingerprint):
+    """
+    Mengganti parameter model dengan tensor yang di-memory-map read-only dari file bobot bersama.
+
+    Halaman memori bobot menjadi page cache file yang dipakai bersama oleh semua proses yang memetakan
+    file yang sama (bukan salinan privat per proses). Mengembalikan False jika file tidak ada / basi.
+    """
+    import torch
+
+    if not os.path.exists(path):
+        return False
+    try:
+        payload = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    except Exception:
+        return False
+    if payload.get("fingerprint") != fingerprint:
+        return False
+
+    # assign=True: parameter model menunjuk langsung ke storage memmap (tanpa copy ke memori privat)
+    model.load_state_dict(payload["state_dict"], assign=True)
+    model.eval()
+    for parameter in model.parameters():
+        parameter.requires_grad_(False)
+    return True
+
+
+def process_memory(pid=None):
+    """
+    Pemakaian memori satu proses (MB) dari /proc/<pid>/smaps_rollup (Linux):
+    rss, pss (RSS dengan halaman bersama dibagi rata antar proses), shared dan private.
+    Di luar Linux hanya rss yang tersedia (via psutil, jika terpasang).
+    """
+    pid = pid or os.getpid()
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Shared_Clean": "shared_clean_mb",
+              "Private_Clean": "private_clean_mb", "Private_Dirty": "private_dirty_mb", "Anonymous": "anonymous_mb"}
+    try:
+        report = {}
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    report[fields[key]] = round(int(value.split()[0]) / 1024, 1)
+        return report
+    except OSError:
+        pass
+    try:
+        import psutil
+        return {"rss_mb": round(psutil.Process(pid).memory_info().rss / 1024 ** 2, 1)}
+    except Exception:
+        return {}
+
+
+def process_tree_pids(pid):
+    """pid beserta semua proses turunannya (Linux: /proc/<pid>/task/*/children; psutil jika terpasang)."""
+    try:
+        import psutil
+        process = psutil.Process(pid)
+        return [pid] + [child.pid for child in process.children(recursive=True)]
+    except ImportError:
+        pass
+    except Exception:
+        return [pid]
+
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children", "r") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def process_tree_memory_mb(pid, key="pss_mb"):
+    """Total memori (default PSS, fallback RSS) sebuah proses dan semua turunannya, dalam MB."""
+    total = 0.0
+    for child in process_tree_pids(pid):
+        memory = process_memory(child)
+        total += memory.get(key, memory.get("rss_mb", 0.0))
+    return round(total, 1)
@@ -0,0 +1,157 @@
+# utils/vocab_table.py
+
+import os
+import json
+import threading
+
+import numpy as np
+
+from .embedding_cache import resize_memmap, interprocess_lock
+
+
+class VocabularyTable:
+    """
+    Tabel kosakata persisten: kata -> baris pada matriks embedding yang di-memory-map.
+
+    - words.txt   : satu kata per baris, urutan = nomor baris matriks.
+    - vectors.f32 : matriks float32 (kapasitas x dimensi), tumbuh secara bertahap.
+    Kata baru di-encode sekali (dalam satu batch) lalu ditambahkan di akhir tabel.
+    Beberapa proses boleh memakai tabel yang sama: penambahan kata dilakukan di bawah flock eksklusif
+    (.lock) setelah membaca kata yang ditambahkan proses lain, sehingga nomor baris tidak pernah bentrok.
+    """
+
+    VERSION = 1
+
+    def __init__(self, table_dir, dim, namespace="", initial_rows=4096):
+        self.table_dir = table_dir
+        self.dim = int(dim)
+        self.namespace = namespace
+        self.initial_rows = initial_rows
+
+        self._lock = threading.RLock()
+        self.stats = {"lookups": 0, "new_words": 0}
+
+        self._words_path = os.path.join(table_dir, "words.txt")
+        self._vectors_path = os.path.join(table_dir, "vectors.f32")
+        self._meta_path = os.path.join(table_dir, "meta.json")
+        self._lock_path = os.path.join(table_dir, ".lock")
+
+        os.makedirs(table_dir, exist_ok=True)
+        with self._lock, interprocess_lock(self._lock_path):
+            self._open()
+
+    def _open(self):
+        meta = None
+        if os.path.exists(self._meta_path):
+            try:
+                with open(self._meta_path, "r") as f:
+                    meta = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                meta = None
+
+        valid = (
+            meta is not None
+            and meta.get("version") == self.VERSION
+            and meta.get("dim") == self.dim
+            and meta.get("namespace") == self.namespace
+            and os.path.exists(self._vectors_path)
+            and os.path.exists(self._words_path)
+        )
+
+        if valid:
+            capacity = os.path.getsize(self._vectors_path) // (self.dim * 4)
+            with open(self._words_path, "rb") as f:
+                data = f.read()
+            words = data.decode("utf-8").splitlines()
+            # Kata yang tercatat tanpa vektor (misal proses terhenti) diabaikan
+            words = words[:capacity]
+            words_bytes = len(data)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        else:
+            # Tabel baru (atau model/dimensi berbeda): mulai dari kosong
+            capacity = self.initial_rows
+            words = []
+            words_bytes = 0
+            with open(self._vectors_path, "wb") as f:
+                f.truncate(capacity * self.dim * 4)
+            with open(self._words_path, "w", encoding="utf-8"):
+                pass
+            with open(self._meta_path, "w") as f:
+                json.dump({"version": self.VERSION, "dim": self.dim, "namespace": self.namespace}, f)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+        self._words = words
+        self._words_bytes = words_bytes
+        self._rows = {w: i for i, w in enumerate(words)}
+
+    def _sync(self):
+        """Membaca kata yang ditambahkan proses lain sejak pembacaan terakhir (flock sudah dipegang)."""
+        size = os.path.getsize(self._words_path)
+        if size == self._words_bytes:
+            return
+        capacity = os.path.getsize(self._vectors_path) // (self.dim * 4)
+        if capacity != self._vectors.shape[0]:
+            self._vectors.flush()
+            del self._vectors
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        with open(self._words_path, "rb") as f:
+            f.seek(self._words_bytes)
+            data = f.read()
+        start = len(self._words)
+        new_words = data.decode("utf-8").splitlines()[:max(0, capacity - start)]
+        for offset, w in enumerate(new_words):
+            self._rows.setdefault(w, start + offset)
+        self._words.extend(new_words)
+        self._words_bytes += len(data)
+
+    def __len__(self):
+        return len(self._words)
+
+    @property
+    def vectors(self):
+        """Matriks embedding untuk semua kata yang sudah ada di tabel (view memmap)."""
+        return self._vectors[:len(self._words)]
+
+    def _append(self, new_words, embeddings):
+        start = len(self._words)
+        end = start + len(new_words)
+        capacity = self._vectors.shape[0]
+        if end > capacity:
+            new_capacity = max(capacity * 2, end)
+            self._vectors.flush()
+            del self._vectors
+            self._vectors = resize_memmap(self._vectors_path, np.float32, (new_capacity, self.dim))
+
+        self._vectors[start:end] = embeddings
+        self._vectors.flush()
+        # Kata ditulis SETELAH vektornya tersimpan agar tabel selalu konsisten
+        data = "".join(w + "\n" for w in new_words).encode("utf-8")
+        with open(self._words_path, "ab") as f:
+            f.write(data)
+        self._words_bytes += len(data)
+
+        for offset, w in enumerate(new_words):
+            self._rows[w] = start + offset
+        self._words.extend(new_words)
+        self.stats["new_words"] += len(new_words)
+
+    def rows_for(self, words, encode_fn):
+        """
+        Mengembalikan nomor baris (np.ndarray int64) untuk setiap kata.
+        Kata yang belum ada di tabel di-encode dengan encode_fn (satu panggilan) lalu ditambahkan.
+        """
+        with self._lock, interprocess_lock(self._lock_path, exclusive=False):
+            self._sync()
+            self.stats["lookups"] += len(words)
+            new_words = list(dict.fromkeys(w for w in words if w not in self._rows))
+        if new_words:
+            # Encode di luar lock agar request dari sesi lain bisa digabung dalam satu micro-batch
+            embeddings = np.asarray(encode_fn(new_words), dtype=np.float32)
+            with self._lock, interprocess_lock(self._lock_path):
+                # Kata yang sudah ditambahkan oleh thread / proses lain selama encode dilewati
+                self._sync()
+                keep = [i for i, w in enumerate(new_words) if w not in self._rows]
+                if keep:
+                    self._append([new_words[i] for i in keep], embeddings[keep])
+        with self._lock:
+            return np.fromiter((self._rows[w] for w in words), dtype=np.int64, count=len(words))